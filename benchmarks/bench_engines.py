@@ -0,0 +1,124 @@
+"""
+Benchmark that compares the extraction engines on the test fixtures and on
+synthetic modules.
+
+Usage:
+    python benchmarks/bench_engines.py [lines]
+
+The engines are:
+  * `scan` : `PyExtract` without its index, i.e., one regex search of the
+    source code per query.
+  * `regex` : `PyExtract`, which answers queries using a `ModuleIndex`.
+  * `ast` : `AstExtract`.
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mydocstring import extract
+
+
+class ScanExtract(extract.PyExtract):
+    """
+    `PyExtract` without an index.
+    """
+
+    def lookup(self):
+        return None
+
+
+engines = {'scan': ScanExtract,
+           'regex': extract.PyExtract,
+           'ast': extract.AstExtract}
+
+
+def synthetic_module(lines=10000):
+    """
+    Generates a module that contains about `lines` lines of code and returns
+    the source code and the queries for all of its docstrings.
+    """
+    out = ['"""', 'Synthetic module.', '"""', '']
+    queries = ['']
+    cls = 0
+    while len(out) < lines:
+        name = 'Class%d' % cls
+        out += ['class %s(object):' % name,
+                '    """',
+                '    Docstring for %s.' % name,
+                '    """',
+                '']
+        queries.append(name)
+        for method in range(10):
+            out += ['    def method%d(self, arg1, arg2=None):' % method,
+                    '        """',
+                    '        Summary of the method.',
+                    '',
+                    '        Args:',
+                    '            arg1: The first argument.',
+                    '            arg2: The second argument.',
+                    '',
+                    '        Returns:',
+                    '            The sum of the arguments.',
+                    '        """',
+                    '        return arg1 + arg2',
+                    '']
+            queries.append('%s.method%d' % (name, method))
+        out += ['def function%d(arg1: int, arg2: int = 1) -> int:' % cls,
+                '    """',
+                '    Summary of the function.',
+                '    """',
+                '    return arg1 + arg2',
+                '']
+        queries.append('function%d' % cls)
+        cls += 1
+    return '\n'.join(out), queries
+
+
+def fixture_queries(txt):
+    """
+    Returns the queries for all of the docstrings in `txt`.
+    """
+    queries = []
+    for cls, function, dtype in extract.ModuleIndex(txt).entries:
+        if dtype == 'method':
+            queries.append('%s.%s' % (cls, function))
+        else:
+            queries.append(cls or function)
+    return queries
+
+
+def run(engine, txt, queries):
+    """
+    Extracts all queries using a new extractor.
+    """
+    extractor = engines[engine](txt)
+    for query in queries:
+        extractor.extract(query)
+
+
+def bench(label, txt, queries, repeat=3, number=1):
+    print('%s (%d lines, %d queries)' % (label, txt.count('\n'),
+                                         len(queries)))
+    for engine in engines:
+        time = min(timeit.repeat(lambda: run(engine, txt, queries),
+                                 repeat=repeat, number=number)) / number
+        print('  %-6s %10.3f ms  %8.3f ms/query' %
+              (engine, 1e3 * time, 1e3 * time / len(queries)))
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    fixture = os.path.join(os.path.dirname(__file__), '..', 'mydocstring',
+                           'fixtures', 'example.py')
+    txt = open(fixture).read()
+    bench('fixtures/example.py', txt, fixture_queries(txt), number=20)
+
+    txt, queries = synthetic_module(lines)
+    bench('synthetic', txt, queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark that parses many small Google-style docstrings.
+
+Usage:
+    python benchmarks/bench_parse.py [count]
+
+Reports the time taken to construct `count` parsers (defaults to 100000), to
+construct and parse `count` docstrings, and to parse `count` docstrings using a
+single `Parser`.
+
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mydocstring import parse
+
+
+def docstrings(count):
+    """
+    Returns `count` small docstrings.
+    """
+    out = []
+    for i in range(count):
+        out.append('\n'.join([
+            'Summary of function %d.' % i,
+            '',
+            'Args:',
+            '    arg1 (int): The first argument.',
+            '    arg2: The second argument.',
+            '',
+            'Returns:',
+            '    The sum of the arguments.',
+            '']))
+    return out
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('%-22s %8.3f s %8.2f us/docstring' % (label, elapsed,
+                                                1e6 * elapsed / count))
+
+
+def main(count=100000):
+    data = docstrings(count)
+
+    def construct():
+        for docstring in data:
+            parse.GoogleDocString(docstring)
+
+    def construct_and_parse():
+        for docstring in data:
+            parse.GoogleDocString(docstring).parse()
+
+    def parse_many():
+        for _ in parse.Parser().parse_many(data):
+            pass
+
+    timed('construct', count, construct)
+    timed('construct and parse', count, construct_and_parse)
+    timed('Parser.parse_many', count, parse_many)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
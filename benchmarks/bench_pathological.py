@@ -0,0 +1,125 @@
+"""
+Stress benchmark that times the extraction engines on pathological inputs, and
+tracks how the time grows with the size of the input.
+
+Usage:
+    python benchmarks/bench_pathological.py [size] [max_growth]
+
+Each input is generated twice, with `size` and `4 * size` repetitions of its
+pathological pattern. The growth is the ratio of the two times, i.e., about 4
+for an engine that is linear and about 16 for an engine that is quadratic. The
+benchmark exits with a non-zero status if the growth of any of the linear
+engines (`regex`, `tokenize` and `ast`) exceeds `max_growth` (defaults to 8)
+for any of the inputs.
+
+The inputs are:
+  * `calls` : a function without a docstring that is called many times. The
+    regular expressions search forward from each call for a docstring.
+  * `strings` : many triple-quoted strings that are not docstrings.
+  * `calls_strings` : both of the above.
+  * `docstrings` : many functions with docstrings.
+  * `signature` : a function with a signature that spans many lines.
+  * `blank` : many blank lines after a function.
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mydocstring import extract
+
+
+class ScanExtract(extract.PyExtract):
+    """
+    `PyExtract` without an index.
+    """
+
+    def lookup(self):
+        return None
+
+
+engines = {'scan': ScanExtract,
+           'regex': extract.PyExtract,
+           'ast': extract.AstExtract,
+           'tokenize': extract.TokenizeExtract}
+
+linear = ['ast', 'regex', 'tokenize']
+
+target = 'def target(a):\n    """Docstring."""\n    pass\n'
+nodoc = 'def target(a):\n    pass\n'
+
+
+def calls(n):
+    return nodoc + ''.join('target(%d)\n' % i for i in range(n))
+
+
+def strings(n):
+    return ''.join('x%d = """\nstring %d\n"""\n' % (i, i)
+                   for i in range(n)) + target
+
+
+def calls_strings(n):
+    return nodoc + ''.join('target(%d)\nx = """\n"""\n' % i for i in range(n))
+
+
+def docstrings(n):
+    return ''.join('def f%d(a):\n    """Docstring %d."""\n    pass\n\n' % (i, i)
+                   for i in range(n)) + target
+
+
+def signature(n):
+    return ('def target(\n' + ''.join('        a%d=(1, 2),\n' % i
+                                      for i in range(n)) +
+            '        ):\n    """Docstring."""\n    pass\n')
+
+
+def blank(n):
+    return target + '\n' * n + 'def other():\n    pass\n'
+
+
+inputs = [calls, strings, calls_strings, docstrings, signature, blank]
+
+
+def run(engine, txt, number=3):
+    """
+    Returns the best time in seconds out of `number` runs of extracting
+    `target` from `txt`.
+    """
+    def query():
+        try:
+            engine(txt).extract('target')
+        except NameError:
+            pass
+    return min(timeit.repeat(query, number=1, repeat=number))
+
+
+def main(size=500, max_growth=8.0):
+    failed = []
+    print('%-14s %-9s %10s %10s %7s' % ('input', 'engine', 'n (ms)',
+                                        '4n (ms)', 'growth'))
+    for gen in inputs:
+        small = gen(size)
+        large = gen(4 * size)
+        for name in sorted(engines):
+            t1 = run(engines[name], small)
+            t2 = run(engines[name], large)
+            growth = t2 / max(t1, 1e-9)
+            flag = ''
+            if name in linear and growth > max_growth:
+                failed.append((gen.__name__, name))
+                flag = ' !'
+            print('%-14s %-9s %10.2f %10.2f %7.1f%s' % (
+                gen.__name__, name, 1e3 * t1, 1e3 * t2, growth, flag))
+    for gen, name in failed:
+        print('error: engine `%s` grows superlinearly for input `%s`' % (name,
+                                                                       gen))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    size = int(args[0]) if args else 500
+    max_growth = float(args[1]) if len(args) > 1 else 8.0
+    sys.exit(main(size, max_growth))
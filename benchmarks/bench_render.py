@@ -0,0 +1,98 @@
+"""
+Benchmark that renders many docstrings as Markdown using the default template.
+
+Usage:
+    python benchmarks/bench_render.py [count]
+
+Reports the time taken to render `count` docstrings (defaults to 1000):
+  * `mako, compile per call` : The template is compiled for each docstring (as
+    in previous versions).
+  * `mako, cached` : The template is compiled once (see
+    `render.TemplateCache`).
+  * `builtin` : The built-in renderer (see `render.Markdown`).
+
+It also reports the time taken to compile the template once, from source and
+from a module stored in `module_directory` by a previous compilation, which is
+what a new process that uses the same cache directory pays.
+
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mako.template import Template
+from mydocstring import extract, parse, render
+
+
+def source(count):
+    """
+    Returns the source code of a module that contains `count` functions.
+    """
+    out = []
+    for i in range(count):
+        out.append('\n'.join([
+            'def function%d(arg1, arg2=None):' % i,
+            '    """',
+            '    Summary of function %d.' % i,
+            '',
+            '    Args:',
+            '        arg1 (int): The first argument.',
+            '        arg2 (str, optional): The second argument.',
+            '',
+            '    Returns:',
+            '        The sum of the arguments.',
+            '    """',
+            '    return arg1 + arg2',
+            '', '']))
+    return '\n'.join(out)
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    if count:
+        print('%-26s %8.3f s %8.2f us/docstring' % (label, elapsed,
+                                                    1e6 * elapsed / count))
+    else:
+        print('%-26s %8.3f s' % (label, elapsed))
+
+
+def main(count=1000):
+    docstrings = extract.PyExtract(source(count)).extract_all()
+    symbols = []
+    for name in sorted(docstrings):
+        parser = parse.GoogleDocString(docstrings[name]['docstring'])
+        parser.parse(mark_code_blocks=True)
+        symbols.append((docstrings[name], parser.data))
+
+    def render_all(get_template):
+        for header, sections in symbols:
+            get_template().render(header=header, sections=sections,
+                                  headers=[], h1='#', h2='##', h3='###')
+
+    cached = render.TemplateCache(builtin=False)
+    builtin = render.TemplateCache()
+    timed('mako, compile per call', count,
+          lambda: render_all(
+              lambda: Template(filename=render.default_template)))
+    timed('mako, cached', count,
+          lambda: render_all(lambda: cached.get()))
+    timed('builtin', count, lambda: render_all(lambda: builtin.get()))
+
+    directory = tempfile.mkdtemp()
+    try:
+        timed('compile from source', 0,
+              lambda: render.TemplateCache(directory, builtin=False).get())
+        timed('compile from directory', 0,
+              lambda: render.TemplateCache(directory, builtin=False).get())
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
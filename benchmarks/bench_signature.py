@@ -0,0 +1,155 @@
+"""
+Benchmark that compares `parse.parse_signature` with its previous
+implementation on the signatures in the pybind fixture.
+
+Usage:
+    python benchmarks/bench_signature.py [repeat]
+
+Each signature in the fixture is parsed `repeat` times (defaults to 10000), as
+for a module with many overloads that share signatures. The implementations
+are:
+  * `legacy` : the previous implementation (see `legacy_parse_signature`).
+  * `uncached` : `parse_signature` without its cache.
+  * `cached` : `parse_signature`.
+  * `batch` : `parse_signatures`.
+
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mydocstring import parse
+
+fixture = os.path.join(os.path.dirname(__file__), '..', 'mydocstring',
+                       'fixtures', 'example_pybind.py')
+
+
+def legacy_parse_signature(args):
+    """
+    The previous, character-by-character, implementation of
+    `parse_signature`.
+    """
+                       # \(                               - ( pattern
+                       #   ([\w\W]*?)                     - captures characters and special characters
+                       #             \)                   - ) pattern
+                       #               \s*                - zero or more spaces
+                       #                  (?:             - non capture block starts
+                       #                     ->           - -> pattern
+                       #                       \s*        - zero or more spaces
+                       #                          (\w+)   - captures characters
+                       #                               )  - non capture block ends
+                       #                                ? - zero or one previous pattern
+    match = re.findall(r'\(([\w\W]*?)\)\s*(?:->\s*(\w+))?', args)
+    if not match:
+        raise ValueError('The string `%s` is not a signature.' % args)
+    match = match[0]
+
+    args_out = {'args': {}, 'return_annotation': ''}
+
+    if len(match) > 1:
+        args_out['return_annotation'] = match[1]
+
+    # Split the function input string
+    counts = {"p": 0, "l": 0, "b": 0, ":": 0}
+    marker = 0
+    txt = match[0]
+    for i, c in enumerate(txt):
+
+        # Count brackets, parentheses and inequality symbols
+        if c == "(":  # parentheses
+            counts["p"] += 1
+        elif c == ")":
+            counts["p"] -= 1
+        elif c == "<":  # greater than or less than symbols
+            counts["l"] += 1
+        elif c == ">":
+            counts["l"] -= 1
+        elif c == "[":  # greater than or less than symbols
+            counts["b"] += 1
+        elif c == "]":
+            counts["b"] -= 1
+        elif c == ":":
+            counts[":"] += 1
+
+        # Splitting
+        if c == ',' and counts["p"] == 0 and counts["l"] == 0 and counts[
+                "b"] == 0:
+            # PEP 484 annotated string
+            if counts[":"]:
+                name = txt[marker:i].split(":", 1)[0].strip(' ')
+                type_ = txt[marker:i].split(":", 1)[1].strip(' ')
+                counts[":"] -= 1
+            # No PEP484 string (`:` does not exist)
+            else:
+                name = txt[marker:i].strip(' ')
+                type_ = ''
+                if '=' in name:
+                    name, type_ = name.split('=')
+                    type_ = '=' + type_
+
+            args_out['args'][name] = type_
+            marker = i + 1
+        elif i == (
+                len(txt) - 1
+        ) and counts["p"] == 0 and counts["l"] == 0 and counts["b"] == 0:
+            # PEP 484 annotated string
+            if counts[":"]:
+                name = txt[marker:i + 1].split(":", 1)[0].strip(' ')
+                type_ = txt[marker:i + 1].split(":", 1)[1].strip(' ')
+                counts[":"] -= 1
+            # No PEP484 string (`:` does not exist)
+            else:
+                name = txt[marker:i + 1].strip(' ')
+                type_ = ''
+                if '=' in name:
+                    name, type_ = name.split('=')
+                    type_ = '=' + type_
+
+            args_out['args'][name] = type_
+            marker = i + 1
+    return args_out
+
+
+def uncached_parse_signature(args):
+    parsed_args, annotation = parse._parse_signature.__wrapped__(args)
+    return {'args': dict(parsed_args), 'return_annotation': annotation}
+
+
+def fixture_signatures():
+    """
+    Returns the signatures of all functions in the pybind fixture.
+    """
+    with open(fixture) as fh:
+        txt = fh.read()
+    return re.findall(r'^\s*(?:\d+\.\s+)?\w+(\(.*\)\s*(?:->.*)?)$', txt,
+                      re.M)
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print('%-10s %8.3f s %8.2f us/signature' % (label, elapsed,
+                                               1e6 * elapsed / count))
+
+
+def main(repeat=10000):
+    signatures = fixture_signatures() * repeat
+    count = len(signatures)
+    print('%d signatures (%d unique)' % (count, len(set(signatures))))
+
+    def run(func):
+        return lambda: [func(signature) for signature in signatures]
+
+    parse._parse_signature.cache_clear()
+    timed('legacy', count, run(legacy_parse_signature))
+    timed('uncached', count, run(uncached_parse_signature))
+    timed('cached', count, run(parse.parse_signature))
+    timed('batch', count, lambda: parse.parse_signatures(signatures))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,116 @@
+"""
+Generates synthetic modules for benchmarking.
+
+Usage:
+    python benchmarks/corpus.py <out> [files] [classes] [methods] [lines]
+                                [overloads]
+
+Writes `files` modules (defaults to 10) to the directory `out`, e.g., to
+benchmark the command line interface on a large package. Each module contains
+`classes` classes (defaults to 10) with `methods` methods each (defaults to 10),
+and as many functions. Each docstring has `lines` lines of description (defaults
+to 4). If `overloads` is greater than zero, a file of PyBind docstrings is also
+written, with as many overloads per function.
+
+The docstrings are Google style, with an argument list, a return value, and an
+example that contains a code block.
+
+"""
+import os
+import sys
+
+
+def docstring(name, args, lines=4, indent=''):
+    """
+    Returns the lines of a docstring (without quotes) that documents the
+    arguments `args`, given as a list of names and annotations (as in the
+    signature, or `''` for none).
+    """
+    out = ['Summary of %s.' % name, '']
+    for i in range(lines):
+        out.append('Line %d of the description of %s, which goes on for a '
+                   'while.' % (i, name))
+    if args:
+        out += ['', 'Args:']
+    for arg, annotation in args:
+        if annotation:
+            annotation = ' (%s)' % annotation
+        out += ['    %s%s: The argument `%s`.' % (arg, annotation, arg),
+                '        Second line of the description.']
+    out += ['', 'Returns:', '    int: The sum of the arguments.', '',
+            'Example:', '    Add the arguments.',
+            '    >>> %s(%s)' % (name, ', '.join(['1'] * len(args))),
+            '    %d' % len(args)]
+    return [indent + line if line else line for line in out]
+
+
+def module(classes=10, methods=10, lines=4):
+    """
+    Returns the source code of a module that contains `classes` classes with
+    `methods` methods each, and as many functions, and the queries for all of
+    its docstrings.
+    """
+    out = ['"""', 'Synthetic module.', '"""', '']
+    queries = ['']
+    for cls in range(classes):
+        name = 'Class%d' % cls
+        out += ['class %s(object):' % name, '    """']
+        out += docstring(name, [], lines, '    ')
+        out += ['    """', '']
+        queries.append(name)
+        for method in range(methods):
+            out += ['    def method%d(self, arg1: int, arg2: int = 1) -> int:' %
+                    method, '        """']
+            out += docstring('method%d' % method,
+                             [('arg1', 'int'), ('arg2', 'int = 1')], lines,
+                             '        ')
+            out += ['        """', '        return arg1 + arg2', '']
+            queries.append('%s.method%d' % (name, method))
+        out += ['def function%d(arg1, arg2=None, *args, **kwargs):' % cls,
+                '    """']
+        out += docstring('function%d' % cls, [('arg1', ''), ('arg2', '')],
+                         lines, '    ')
+        out += ['    """', '    return arg1', '']
+        queries.append('function%d' % cls)
+    return '\n'.join(out), queries
+
+
+def pybind_module(functions=10, overloads=4, lines=4):
+    """
+    Returns PyBind docstrings for `functions` overloaded functions with
+    `overloads` overloads each, and the names of the functions.
+    """
+    out = []
+    names = []
+    for func in range(functions):
+        name = 'overloaded%d' % func
+        out += ['Overloaded function.', '']
+        for overload in range(1, overloads + 1):
+            args = [('arg%d' % i, 'int') for i in range(overload)]
+            out += ['    %d. %s(%s) -> int' %
+                    (overload, name, ', '.join('%s: %s' % arg
+                                               for arg in args)), '', '']
+            out += docstring(name, args, lines, '        ')
+            out += ['', '']
+        names.append(name)
+    return '\n'.join(out), names
+
+
+def main(out, files=10, classes=10, methods=10, lines=4, overloads=0):
+    if not os.path.isdir(out):
+        os.makedirs(out)
+    for i in range(files):
+        txt = module(classes, methods, lines)[0]
+        with open(os.path.join(out, 'module%d.py' % i), 'w') as fh:
+            fh.write(txt + '\n')
+    if overloads > 0:
+        txt = pybind_module(classes, overloads, lines)[0]
+        with open(os.path.join(out, 'pybind.txt'), 'w') as fh:
+            fh.write(txt + '\n')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:]])
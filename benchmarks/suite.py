@@ -0,0 +1,193 @@
+"""
+Benchmark suite that times each stage of extracting, parsing, and rendering
+docstrings on a synthetic corpus (see `corpus.py`), and compares the times
+with a baseline.
+
+Usage:
+    python benchmarks/suite.py [--classes=N] [--methods=N] [--lines=N]
+                               [--overloads=N] [--repeat=N]
+                               [--baseline=FILE] [--threshold=X] [--save]
+
+The metrics are the best time out of `repeat` runs (defaults to 5), in
+microseconds per item:
+  * `extract_regex`, `extract_ast`, `extract_tokenize` : Extracting a
+    docstring from a module using `Extract.extract`, including building the
+    index of the module.
+  * `extract_pybind` : Extracting an overload from PyBind docstrings.
+  * `parse` : Parsing a docstring using `GoogleDocString.parse`, including
+    checking it against its signature.
+  * `parse_signature` : Parsing a signature using `parse.parse_signature`,
+    starting with an empty cache.
+  * `mark_code_blocks` : Marking the code blocks of a docstring.
+  * `render` : Rendering a docstring as Markdown using the default template.
+
+The metrics are compared with the baseline stored in `baseline.json` (or
+`FILE`). The suite exits with a non-zero status if any metric is more than
+`threshold` (defaults to 0.25, i.e., 25%) slower than its baseline. Use
+`--save` to store the metrics as the new baseline instead. Baselines depend on
+the machine, so they should be recorded on the machine that checks them, and
+they are only compared if the corpus has the same size.
+
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import corpus
+from mydocstring import command, extract, parse, render
+
+default_baseline = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def signature(docstring):
+    if not docstring['signature']:
+        return None
+    return parse.parse_signature(docstring['signature'])
+
+
+def stages(config):
+    """
+    Returns a dictionary that maps each metric to the number of items and a
+    function that processes all items, for a corpus of size `config`.
+    """
+    txt, queries = corpus.module(config['classes'], config['methods'],
+                                 config['lines'])
+    pybind, names = corpus.pybind_module(config['classes'],
+                                         config['overloads'], config['lines'])
+    extractor = extract.PyExtract(txt)
+    docstrings = [extractor.extract(query) for query in queries]
+    signatures = [signature(docstring) for docstring in docstrings]
+    parsed = [parse.GoogleDocString(docstring['docstring'],
+                                    signature=sig).parse(mark_code_blocks=True)
+              for docstring, sig in zip(docstrings, signatures)]
+    template = render.TemplateCache().get()
+
+    def extract_all(engine):
+        def run():
+            extractor = engine(txt)
+            for query in queries:
+                extractor.extract(query)
+        return run
+
+    def extract_pybind():
+        for name in names:
+            extract.PyBindExtract(pybind).extract(name)
+
+    def parse_all():
+        for docstring, sig in zip(docstrings, signatures):
+            parse.GoogleDocString(docstring['docstring'],
+                                  signature=sig).parse()
+
+    def parse_signatures():
+        parse._parse_signature.cache_clear()
+        for docstring in docstrings:
+            if docstring['signature']:
+                parse.parse_signature(docstring['signature'])
+
+    def mark_code_blocks():
+        for docstring in docstrings:
+            parse.mark_code_blocks(docstring['docstring'])
+
+    def render_all():
+        for docstring, data in zip(docstrings, parsed):
+            command.format_markdown(docstring, data, [], template)
+
+    count = len(queries)
+    return {'extract_regex': (count, extract_all(extract.PyExtract)),
+            'extract_ast': (count, extract_all(extract.AstExtract)),
+            'extract_tokenize': (count, extract_all(extract.TokenizeExtract)),
+            'extract_pybind': (len(names) * config['overloads'],
+                               extract_pybind),
+            'parse': (count, parse_all),
+            'parse_signature': (sum(1 for sig in signatures if sig),
+                                parse_signatures),
+            'mark_code_blocks': (count, mark_code_blocks),
+            'render': (count, render_all)}
+
+
+def run(config, repeat=5):
+    """
+    Returns the metrics (in microseconds per item) for a corpus of size
+    `config`.
+    """
+    metrics = {}
+    for name, (count, func) in sorted(stages(config).items()):
+        if not count:
+            continue
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        metrics[name] = 1e6 * best / count
+    return metrics
+
+
+def compare(metrics, baseline, threshold):
+    """
+    Prints the metrics next to their baseline and returns the names of the
+    metrics that are more than `threshold` slower than their baseline.
+    """
+    regressions = []
+    print('%-18s %12s %12s %8s' % ('metric', 'us/item', 'baseline', 'change'))
+    for name in sorted(metrics):
+        base = baseline.get(name)
+        if base is None:
+            print('%-18s %12.2f %12s %8s' % (name, metrics[name], '-', '-'))
+            continue
+        change = metrics[name] / base - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = ' !'
+        print('%-18s %12.2f %12.2f %+7.1f%%%s' % (name, metrics[name], base,
+                                                  100 * change, flag))
+    return regressions
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(
+        description='Benchmark suite with baseline gating.')
+    args.add_argument('--classes', type=int, default=20)
+    args.add_argument('--methods', type=int, default=10)
+    args.add_argument('--lines', type=int, default=4)
+    args.add_argument('--overloads', type=int, default=4)
+    args.add_argument('--repeat', type=int, default=5)
+    args.add_argument('--baseline', default=default_baseline)
+    args.add_argument('--threshold', type=float, default=0.25)
+    args.add_argument('--save', action='store_true')
+    args = args.parse_args(argv)
+
+    config = {'classes': args.classes, 'methods': args.methods,
+              'lines': args.lines, 'overloads': args.overloads}
+    metrics = run(config, args.repeat)
+
+    if args.save:
+        with open(args.baseline, 'w') as fh:
+            json.dump({'config': config, 'python': platform.python_version(),
+                       'metrics': metrics}, fh, sort_keys=True, indent=4,
+                      separators=(',', ': '))
+            fh.write('\n')
+        compare(metrics, {}, args.threshold)
+        print('Saved baseline to `%s`' % args.baseline)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            data = json.load(fh)
+        if data['config'] == config:
+            baseline = data['metrics']
+        else:
+            print('warning: the baseline was recorded for a different corpus '
+                  '(%s), and is not compared' % data['config'])
+    regressions = compare(metrics, baseline, args.threshold)
+    for name in regressions:
+        print('error: `%s` is more than %d%% slower than its baseline' %
+              (name, 100 * args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module builds a tree of Markdown and JSON files that mirrors a tree of
+Python source files. The build is incremental: a manifest in the output
+directory records the hashes that each output depends on, and only the outputs
+whose source file, configuration, or template has changed are rendered again.
+Outputs are written atomically, and files whose contents would not change are
+not written at all, so that their modification times are kept.
+"""
+import hashlib
+import json
+import os
+
+# The name of the manifest in the output directory
+manifest_name = '.mydocstring-manifest.json'
+
+extensions = {'markdown': '.md', 'json': '.json'}
+
+
+class Builder(object):
+    """
+    Builds the documentation of a directory tree.
+
+    For each file `SRC/path/module.py`, the Markdown output is written to
+    `OUT/path/module.md`, and the JSON output to `OUT/path/module.json`. The
+    manifest maps each output to the file that it was rendered from, and to
+    the hashes of the source file, the configuration (the version of this
+    package, the engine, and the format), the template (for Markdown output),
+    and the output itself.
+
+    Attributes:
+        src : The directory tree of source files.
+        out : The output directory.
+        formats : The output formats, `'markdown'` and/or `'json'`.
+        template : The template for Markdown output.
+        engine : The extraction engine (see `extract.extract`).
+        manifest : The outputs recorded in the manifest.
+        counts : The number of outputs that have been `written`, that were
+            rendered but left `unchanged`, that were `skipped` without
+            rendering, and that were `removed`, and the number of source files
+            that `failed`.
+
+    """
+
+    def __init__(self, src, out, formats=('markdown', 'json'), template=None,
+                 engine='regex'):
+        """
+        Initializer for Builder.
+
+        Arguments:
+            src: The directory tree of source files.
+            out: The output directory. It is created if it does not exist.
+            formats(optional): The output formats. Defaults to both
+                `'markdown'` and `'json'`.
+            template(optional): The template for Markdown output. Defaults to
+                the template that comes with the package.
+            engine(optional): The extraction engine. Defaults to `'regex'`.
+
+        """
+        from . import render
+        for fmt in formats:
+            if fmt not in extensions:
+                raise ValueError('Unknown format: `%s`' % fmt)
+        self.src = src
+        self.out = out
+        self.formats = list(formats)
+        self.template = render.default_template if template is None \
+            else template
+        self.engine = engine
+        self.manifest = {}
+        self.counts = dict.fromkeys(['written', 'unchanged', 'skipped',
+                                     'removed', 'failed'], 0)
+        self._templates = render.TemplateCache()
+
+    def build(self, force=False):
+        """
+        Builds the outputs of all source files that have changed since the
+        previous build. Outputs recorded in the manifest that this build does
+        not produce (e.g., those of source files that no longer exist, or
+        that fail to render) are removed.
+
+        Arguments:
+            force(optional): Render all outputs, even if they have not
+                changed. Outputs whose contents do not change are still not
+                written. Defaults to `False`.
+
+        Returns:
+            dict: The counts (see `counts`).
+
+        """
+        import warnings
+        from . import extract
+        from . import version
+
+        self.manifest = self.load_manifest()
+        configs = {}
+        for fmt in self.formats:
+            configs[fmt] = _hash(json.dumps([version.__VERSION__, self.engine,
+                                             fmt]).encode())
+        templates = {'markdown': _file_hash(self.template)}
+
+        found = set()
+        for filename in extract.find_files(self.src):
+            source = os.path.relpath(filename, self.src)
+            try:
+                txt = extract.read_file(filename)
+            except (IOError, UnicodeDecodeError) as err:
+                warnings.warn('Unable to build documentation for `%s`: %s' %
+                              (filename, err))
+                self.counts['failed'] += 1
+                continue
+            input_hash = _hash(txt.encode('utf-8', 'surrogateescape'))
+
+            # The hashes that each output depends on
+            pending = {}
+            for fmt in self.formats:
+                output = os.path.splitext(source)[0] + extensions[fmt]
+                found.add(output)
+                deps = {'source': source, 'input': input_hash,
+                        'config': configs[fmt],
+                        'template': templates.get(fmt, '')}
+                entry = self.manifest.get(output)
+                if not force and entry and \
+                   all(entry.get(key) == deps[key] for key in deps) and \
+                   os.path.exists(os.path.join(self.out, output)):
+                    self.counts['skipped'] += 1
+                    continue
+                pending[output] = (fmt, deps)
+            if not pending:
+                continue
+
+            try:
+                rendered = self.render(filename, source,
+                                       set(fmt for fmt, _ in
+                                           pending.values()), txt)
+            except (NameError, SyntaxError, ValueError) as err:
+                warnings.warn('Unable to build documentation for `%s`: %s' %
+                              (filename, err))
+                self.counts['failed'] += 1
+                # The outputs of the previous build are out of date and are
+                # removed below
+                found.difference_update(pending)
+                continue
+
+            for output, (fmt, deps) in sorted(pending.items()):
+                data = rendered[fmt].encode('utf-8')
+                deps['output'] = _hash(data)
+                path = os.path.join(self.out, output)
+                if _file_hash(path, '') == deps['output']:
+                    self.counts['unchanged'] += 1
+                else:
+                    write(path, data)
+                    self.counts['written'] += 1
+                self.manifest[output] = deps
+
+        for output in sorted(self.manifest):
+            if output in found:
+                continue
+            try:
+                os.remove(os.path.join(self.out, output))
+            except OSError:
+                pass
+            del self.manifest[output]
+            self.counts['removed'] += 1
+
+        write(os.path.join(self.out, manifest_name),
+              json.dumps({'outputs': self.manifest}, sort_keys=True,
+                         indent=4, separators=(',', ': ')).encode('utf-8'))
+        return self.counts
+
+    def render(self, filename, source, formats, txt=None):
+        """
+        Renders the docstrings of a source file. The docstrings are extracted
+        and parsed once for all formats.
+
+        Arguments:
+            filename: The source file.
+            source: The name of the source file recorded in the outputs.
+            formats: The formats to render.
+            txt(optional): The contents of the source file, if it has already
+                been read.
+
+        Returns:
+            dict: The rendered outputs keyed by format.
+
+        """
+        from . import command
+        from . import extract
+        from . import parse
+
+        docstrings = extract.get_extractor(filename, self.engine,
+                                           txt).extract_all()
+        markdown = []
+        records = []
+        for name in sorted(docstrings):
+            matches = docstrings[name]
+            if not isinstance(matches, list):
+                matches = [matches]
+            for match in matches:
+                parser = parse.GoogleDocString(match['docstring'])
+                sections = parser.parse()
+                if 'json' in formats:
+                    records.append(command.record(source, name, match,
+                                                  sections))
+                if 'markdown' in formats:
+                    markdown.append(command.format_markdown(
+                        match, parser.mark_sections(sections),
+                        parser.markdown()[0],
+                        self._templates.get(self.template)) + '\n')
+
+        out = {}
+        if 'markdown' in formats:
+            out['markdown'] = ''.join(markdown)
+        if 'json' in formats:
+            out['json'] = json.dumps(records, sort_keys=True, indent=4,
+                                     separators=(',', ': ')) + '\n'
+        return out
+
+    def load_manifest(self):
+        """
+        Returns the outputs recorded in the manifest of the output directory,
+        or an empty dictionary if there is no valid manifest.
+        """
+        try:
+            with open(os.path.join(self.out, manifest_name)) as fh:
+                outputs = json.load(fh)['outputs']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return {}
+        return outputs if isinstance(outputs, dict) else {}
+
+    def report(self):
+        """
+        Returns a summary of the build.
+        """
+        return ('build: %(written)d written, %(unchanged)d unchanged, '
+                '%(skipped)d skipped, %(removed)d removed, '
+                '%(failed)d failed' % self.counts)
+
+
+def write(path, data):
+    """
+    Writes data to a file atomically. The data is written to a temporary file
+    in the same directory that then replaces the file.
+
+    Arguments:
+        path: The file to write.
+        data: The bytes to write.
+
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path, default=None):
+    # Returns the hash of the contents of a file, or `default` if the file
+    # cannot be read
+    try:
+        with open(path, 'rb') as fh:
+            return _hash(fh.read())
+    except (IOError, OSError):
+        if default is None:
+            raise
+        return default
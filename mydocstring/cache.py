@@ -0,0 +1,249 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module provides a persistent cache for extracted docstrings. The
+docstrings of a file are stored as JSON data in a cache directory and are keyed
+by a hash of the contents of the file, the version of this package, and the
+extraction engine. A file therefore only has to be extracted again after it has
+been modified.
+
+The module also provides `Memo`, a bounded in-memory cache that is used to
+avoid parsing identical docstrings more than once.
+"""
+import os
+
+
+class Cache(object):
+    """
+    A cache directory of extracted docstrings.
+
+    The cache is limited in size. When the limit is exceeded, the least
+    recently used entries are evicted.
+
+    Attributes:
+        directory : The directory that the cache is stored in. It is created
+            when the first entry is stored.
+        max_size : The maximum size of the cache in bytes.
+        hits : The number of successful lookups.
+        misses : The number of failed lookups.
+        evictions : The number of entries that have been evicted.
+
+    """
+
+    def __init__(self, directory, max_size=256 * 2**20):
+        """
+        Initializer for Cache.
+
+        Arguments:
+            directory: A string that specifies the cache directory.
+            max_size(optional): The maximum size of the cache in bytes.
+                Defaults to 256 MB.
+
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+
+    def key(self, txt, engine):
+        """
+        Computes the key for the docstrings of a file.
+
+        Arguments:
+            txt: A string containing the contents of the file.
+            engine: The name of the extraction engine.
+
+        Returns:
+            str: A hex digest.
+
+        """
+        import hashlib
+        from . import version
+
+        digest = hashlib.sha256()
+        digest.update(('%s\0%s\0' % (version.__VERSION__, engine)).encode())
+        digest.update(txt.encode('utf-8', 'surrogateescape'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Looks up the docstrings stored for a key.
+
+        Returns:
+            The docstrings, or `None` if the key is not found.
+
+        """
+        import json
+
+        path = self._path(key)
+        try:
+            with open(path) as fh:
+                value = json.load(fh)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores the docstrings for a key and evicts entries if the cache is
+        full.
+        """
+        import json
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        if self._size is None:
+            self._size = sum([size for _, size, _ in self._entries()])
+
+        data = json.dumps(value, separators=(',', ':'),
+                          default=dict).encode('utf-8')
+        path = self._path(key)
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+        self._size += len(data)
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Evicts the least recently used entries until the cache is filled to
+        at most 90 % of its maximum size.
+        """
+        entries = sorted(self._entries())
+        self._size = sum([size for _, size, _ in entries])
+        for _, size, path in entries:
+            if self._size <= 0.9 * self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def report(self):
+        """
+        Returns a summary of the cache statistics.
+        """
+        return 'cache: %d hits, %d misses, %d evictions' % (
+            self.hits, self.misses, self.evictions)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _entries(self):
+        # Lists (last use, size, path) of all entries
+        out = []
+        if not os.path.isdir(self.directory):
+            return out
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            out.append((stat.st_mtime, stat.st_size, path))
+        return out
+
+
+class Memo(object):
+    """
+    A bounded in-memory cache. When the cache is full, the least recently used
+    entry is evicted. The cache can be shared by multiple threads.
+
+    Attributes:
+        max_size : The maximum number of entries.
+        hits : The number of successful lookups.
+        misses : The number of failed lookups.
+        evictions : The number of entries that have been evicted.
+
+    """
+
+    def __init__(self, max_size=1024):
+        """
+        Initializer for Memo.
+
+        Arguments:
+            max_size(optional): The maximum number of entries. Defaults to
+                `1024`.
+
+        """
+        import collections
+        import threading
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns the value of a key, or `None` if the key is not found.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """
+        Stores the value of a key and evicts the least recently used entry if
+        the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def report(self):
+        """
+        Returns a summary of the cache statistics.
+        """
+        return 'memo: %d hits, %d misses, %d evictions' % (
+            self.hits, self.misses, self.evictions)
@@ -26,6 +26,9 @@ The command module handles the execution of the user-supplied commands via the
 command-line interface (main application). In particular, this module takes the
 parsed docstrings and outputs them to plain-text, markdown, or json.
 """
+from . import timing
+
+
 class Command(object):
     """
     Executes the commands provided on the command line.
@@ -35,84 +38,444 @@ class Command(object):
     def __init__(self, options):
         import os
         from . import extract
-        from . import parse
         self.filename = options['<file>']
-        self.options = {}
+        self.outputs = []
+        self.commands = {}
+        self.entries = []
+        self.cache = None
+        self.diagnostics = None
+        self.writers = {}
+        self._sections = {}
+        self.profile = None
 
         if options['--version']:
             self.version()
             return
 
-        if options['<name>'] == '.':
-            self.name = ''
-        else:
-            self.name = options['<name>']
-        self.docstring = extract.extract(self.filename, self.name)
+        self.profile_format = (options.get('--profile') or '').lstrip('=')
+        if self.profile_format:
+            if self.profile_format not in ('json', 'table'):
+                raise ValueError('Unknown profile format: `%s`' %
+                                 self.profile_format)
+            self.profile = timing.Profile()
+            timing.add_hook(self.profile)
 
-        self.parser = parse.GoogleDocString(self.docstring['docstring']) 
-
-        self.options = {'--text' : self.text,
-                        '--markdown' : self.markdown,
-                        '--json' : self.json
+        from . import cache
+        self.engine = options['--engine'].lstrip('=')
+        self.memo = cache.Memo()
+        self.cache = None
+        cache_dir = options['--cache-dir'] or \
+            os.environ.get('MYDOCSTRING_CACHE_DIR')
+        if cache_dir and not options['--no-cache']:
+            self.cache = cache.Cache(cache_dir.lstrip('='))
+        self.formats = {'--text' : self.format_text,
+                        '--markdown' : self.format_markdown,
+                        '--json' : self.format_json,
+                        '--jsonl' : self.format_jsonl
                         }
+        self.commands = {'--recursive' : self.recursive,
+                         '--watch' : self.watch,
+                         'serve' : self.serve,
+                         'build' : self.build,
+                         '--stdin' : self.stdin}
+
+        self.report = (options.get('--report') or '').lstrip('=')
+        if self.report:
+            from . import diagnostics
+            if self.report not in ('json', 'text'):
+                raise ValueError('Unknown report format: `%s`' % self.report)
+            self.diagnostics = diagnostics.Diagnostics()
 
         if options['--template']:
             self.template = options['--template'][1:]
         else:
             self.template = ''
 
+        from . import render
         if not self.template:
-            self.template = os.path.join(os.path.dirname(__file__),
-                                         'templates/google_docstring.md')
+            self.template = render.default_template
+
+        # Compiled templates are stored next to the cached docstrings
+        module_directory = None
+        if self.cache:
+            module_directory = os.path.join(self.cache.directory, 'templates')
+        self.templates = render.TemplateCache(module_directory)
+
+        # Each output format is written to stdout, or to the file given by
+        # its file option
+        files = {'--text' : '--text-file',
+                 '--markdown' : '--markdown-file',
+                 '--json' : '--json-file',
+                 '--jsonl' : '--jsonl'}
+        self.outputs = [opt for opt in self.formats
+                        if options.get(opt) or options.get(files[opt])]
+        for opt in self.outputs:
+            filename = options.get(files[opt]) or '-'
+            self.writers[opt] = open_output(filename.lstrip('='))
+
+        # All outputs are written when the first option that selects an
+        # output is executed
+        selectors = set(files) | set(files.values())
+        for opt in options:
+            if options[opt] and opt in selectors:
+                self.commands[opt] = self.output
+                break
+
+        if options.get('serve'):
+            self.socket = options['--socket']
+            return
+        if options.get('build'):
+            self.src = options['<src>']
+            self.out = options['<out>']
+            self.force = options['--force']
+            return
+        if options.get('--stdin'):
+            return
+        if options['--recursive']:
+            self.root = options['--recursive'].lstrip('=')
+            self.jobs = int(options['--jobs'])
+            return
+        if options['--watch']:
+            self.root = options['--watch'].lstrip('=')
+            self.interval = float(options['--interval'])
+            return
+
+        names = options['<name>']
+        if not isinstance(names, list):
+            names = [names]
+        names = ['' if name == '.' else name for name in names]
+        self.load(self.filename,
+                  extract.extract_many(self.filename, names,
+                                       engine=self.engine, cache=self.cache),
+                  names)
 
     def __call__(self, cmd):
         """
-        Executes a command if it is found.
+        Executes a command if it is found. The options that select output
+        formats share a single command that outputs all formats at once (see
+        `output`).
 
         Args:
             cmd : A string that specifies the command to execute.
 
         """
-        if cmd in self.options:
-            self.options[cmd]()
+        if cmd in self.commands:
+            self.commands[cmd]()
+
+    def load(self, filename, docstrings, names=None):
+        """
+        Loads extracted docstrings that commands are executed for.
+
+        Args:
+            filename : The file that the docstrings were extracted from.
+            docstrings : A dictionary of docstrings keyed by name.
+            names(optional) : The names of the docstrings in the order to
+                execute commands for. Defaults to all names in sorted order.
+
+        When diagnostics are reported, each docstring is parsed once here and
+        checked against its signature.
+
+        """
+        from . import parse
+        self.filename = filename
+        self.docstrings = docstrings
+        if names is None:
+            names = sorted(docstrings)
+
+        # Overloaded functions have one entry per overload
+        self.entries = []
+        for name in names:
+            matches = docstrings[name]
+            if not isinstance(matches, list):
+                matches = [matches]
+            for match in matches:
+                if self.diagnostics is None:
+                    parser = parse.GoogleDocString(match['docstring'],
+                                                   memo=self.memo)
+                else:
+                    from . import diagnostics
+                    parser = parse.GoogleDocString(
+                        match['docstring'], match.get('parsed_signature'),
+                        memo=self.memo,
+                        diagnostics=self.diagnostics.bind(
+                            file=filename, symbol=name,
+                            line=match.get('lineno')))
+                    try:
+                        parser.parse()
+                    except (SyntaxError, ValueError) as err:
+                        # The error is reported with the diagnostics, and
+                        # the docstring is not output
+                        parser.diagnostics.add('parse-error', str(err))
+                        continue
+                    # Later calls to `parse` (one for each output) would
+                    # report the same diagnostics again
+                    parser.diagnostics = diagnostics.Diagnostics(False)
+                self.entries.append((name, match, parser))
+        if self.entries:
+            self.select(self.entries[0])
+
+    def select(self, entry):
+        """
+        Selects the docstring that commands are executed for.
+
+        Args:
+            entry : A tuple containing the name of the docstring, the
+                docstring, and its parser.
+
+        """
+        self.name, self.docstring, self.parser = entry
+        self._sections = {}
+
+    def sections(self, mark_code_blocks=False):
+        """
+        Returns the parsed sections of the selected docstring. The docstring
+        is parsed the first time that this method is called, and the sections
+        with code blocks marked (see `parse.DocString.mark_sections`) are
+        derived from the same result. The sections must not be modified.
+        """
+        if mark_code_blocks not in self._sections:
+            if False not in self._sections:
+                self._sections[False] = self.parser.parse()
+            if mark_code_blocks:
+                self._sections[True] = self.parser.mark_sections(
+                    self._sections[False])
+        return self._sections[mark_code_blocks]
+
+    def output(self):
+        """
+        Output all docstrings that have been loaded in all output formats
+        given on the command line (see `emit`).
+        """
+        for entry in self.entries:
+            self.emit(entry)
+
+    def emit(self, entry):
+        """
+        Writes a docstring in all output formats given on the command line,
+        each to its own output. The docstring is only parsed once. If the
+        docstring cannot be parsed, nothing is written.
+
+        Args:
+            entry : The docstring to write (see `select`).
+
+        """
+        self.select(entry)
+        outputs = [(opt, self.formats[opt]()) for opt in self.outputs]
+        for opt, txt in outputs:
+            self.writers[opt].write(txt + '\n')
+
+    def recursive(self):
+        """
+        Output all docstrings found in all Python files in a directory tree.
+        Docstrings that cannot be parsed are skipped with a warning.
+        """
+        import warnings
+        from . import extract
+        for filename, docstrings in extract.extract_tree(
+                self.root, jobs=self.jobs, engine=self.engine,
+                cache=self.cache, diagnostics=self.diagnostics):
+            self.load(filename, docstrings)
+            for entry in self.entries:
+                try:
+                    self.emit(entry)
+                except (SyntaxError, ValueError) as err:
+                    warnings.warn('Unable to parse `%s:%s`: %s' %
+                                  (filename, entry[0] or '.', err))
+        self.entries = []
+
+    def watch(self):
+        """
+        Watch a directory tree and output docstrings that have been added or
+        modified each time a Python file changes.
+        """
+        import sys
+        from . import watch
+
+        def output(changes):
+            for filename, name, txt in changes:
+                label = '%s:%s' % (filename, name or '.')
+                if txt is None:
+                    sys.stderr.write('removed %s\n' % label)
+                    continue
+                sys.stderr.write('updated %s\n' % label)
+                print(txt)
+            sys.stdout.flush()
+
+        watcher = watch.Watcher(self.root, self.render, engine=self.engine)
+        try:
+            watcher.run(interval=self.interval, callback=output)
+        except KeyboardInterrupt:
+            pass
+        self.entries = []
+
+    def stdin(self):
+        """
+        Output the docstrings queried on stdin. Each line of stdin contains a
+        query of the form `file:name`, and one line of JSON data is output for
+        each docstring found (see `record`), or for each query that fails. The
+        formatted output of the docstring is included for each output format
+        given on the command line. Consecutive queries for the same file reuse
+        its extractor, so that the file is only read and indexed once.
+        """
+        import json
+        import sys
+        from . import extract
+
+        current = None
+        extractor = None
+        for line in sys.stdin:
+            query = line.strip()
+            if not query:
+                continue
+            filename, _, name = query.rpartition(':')
+            try:
+                if not filename:
+                    raise ValueError('Expected a query of the form '
+                                     '`file:name`, got `%s`' % query)
+                if filename != current:
+                    current = None
+                    extractor = extract.get_extractor(filename, self.engine)
+                    current = filename
+                match = extractor.extract('' if name == '.' else name)
+                self.load(filename, {name: match}, [name])
+                records = []
+                for entry in self.entries:
+                    self.select(entry)
+                    record = self.record()
+                    for opt in self.outputs:
+                        record[opt.lstrip('-')] = self.formats[opt]()
+                    records.append(record)
+            except (IOError, NameError, NotImplementedError, SyntaxError,
+                    UnicodeDecodeError, ValueError) as err:
+                records = [{'file': filename, 'name': name,
+                            'error': str(err)}]
+            for record in records:
+                sys.stdout.write(json.dumps(record, separators=(',', ':')) +
+                                 '\n')
+            sys.stdout.flush()
+        self.entries = []
+
+    def build(self):
+        """
+        Build Markdown and/or JSON files for all Python files in a directory
+        tree, rendering only the files that have changed (see
+        `build.Builder`), and report what was done to stderr.
+        """
+        import sys
+        from . import build
 
-    def text(self):
+        formats = [fmt for opt, fmt in [('--markdown', 'markdown'),
+                                        ('--json', 'json')]
+                   if opt in self.outputs]
+        builder = build.Builder(self.src, self.out,
+                                formats=formats or ['markdown', 'json'],
+                                template=self.template, engine=self.engine)
+        builder.build(force=self.force)
+        sys.stderr.write(builder.report() + '\n')
+
+    def serve(self):
+        """
+        Answer JSON-RPC requests to extract, parse, and render docstrings until
+        the end of stdin, or until interrupted when serving on a socket (see
+        `server.Server`).
         """
-        Output docstring as plain-text.
+        import sys
+        from . import server
+
+        app = server.Server(engine=self.engine, template=self.template,
+                            memo=self.memo, templates=self.templates)
+        try:
+            if self.socket:
+                app.serve_socket(self.socket.lstrip('='))
+            else:
+                app.serve(sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+
+    def render(self, filename, name, docstring):
         """
-        txt = ''
+        Render a docstring using all output formats given on the command line.
+
+        Args:
+            filename : The file that the docstring was extracted from.
+            name : The name of the docstring.
+            docstring : The docstring (a list for overloaded functions).
+
+        Returns:
+            str : The rendered docstring.
 
-        self.parser.parse()
-        if self.docstring['class']:
-            txt += self.docstring['class']
-            if self.docstring['function']:
-                txt += '.'
-        for prop in ['function', 'signature']:
-            if prop in self.docstring:
-                txt += self.docstring[prop]
-        txt += self.docstring['docstring']
-        print(txt)
+        """
+        self.load(filename, {name: docstring}, [name])
+        out = []
+        for entry in self.entries:
+            self.select(entry)
+            for opt in self.outputs:
+                out.append(self.formats[opt]())
+        return '\n'.join(out)
+
+    def format_text(self):
+        """
+        Format docstring as plain-text.
+        """
+        self.sections()
+        return format_text(self.docstring)
+
+    def format_markdown(self):
+        """
+        Format docstring as markdown using a template. The template is only
+        compiled once (see `render.TemplateCache`).
+        """
+        headers = self.parser.markdown()[0]
+        return format_markdown(self.docstring, self.sections(True), headers,
+                               self.templates.get(self.template))
+
+    def format_json(self):
+        """
+        Format docstring as JSON data.
+        """
+        self.sections()
+        return self.parser.__json__()
+
+    def format_jsonl(self):
+        """
+        Format docstring as a single line of JSON data (see `record`).
+        """
+        import json
+        return json.dumps(self.record(), separators=(',', ':'))
 
-    def markdown(self):
+    def record(self):
         """
-        Output docstring as markdown using a template.
+        Returns a dictionary that contains the file, the name, the properties,
+        and the parsed sections of the docstring.
         """
-        from mako.template import Template
-        template = Template(filename=self.template)
-        hd1 = '#'
-        hd2 = '##'
-        hd3 = '###'
-        self.parser.parse(mark_code_blocks=True)
-        headers, data = self.parser.markdown()
-        print(template.render(header=self.docstring, sections=data,
-                              headers=headers, h1=hd1, h2=hd2, h3=hd3))
+        return record(self.filename, self.name, self.docstring,
+                      self.sections())
 
-    def json(self):
+    def close(self):
         """
-        Output docstring as JSON data.
+        Close the output files, output the diagnostics (if requested), and
+        report cache statistics (if a cache is used) and the time spent in each
+        stage (if requested) to stderr.
         """
-        self.parser.parse()
-        print(self.parser.__json__())
+        import sys
+        for writer in self.writers.values():
+            if writer is not sys.stdout:
+                writer.close()
+        self.writers = {}
+        if self.diagnostics is not None:
+            if self.report == 'json':
+                print(self.diagnostics.json())
+            elif self.diagnostics.records:
+                print(self.diagnostics.text())
+        if self.cache:
+            sys.stderr.write(self.cache.report() + '\n')
+        if self.profile is not None:
+            timing.remove_hook(self.profile)
+            if self.profile_format == 'json':
+                sys.stderr.write(self.profile.json() + '\n')
+            else:
+                sys.stderr.write(self.profile.table() + '\n')
+            self.profile = None
 
     def version(self):
         """
@@ -120,3 +483,86 @@ class Command(object):
         """
         from . import version
         print(version.__VERSION__)
+
+
+def format_text(docstring):
+    """
+    Format a docstring as plain-text.
+
+    Args:
+        docstring : The extracted docstring (see `extract.Extract.find`).
+
+    """
+    txt = ''
+
+    if docstring['class']:
+        txt += docstring['class']
+        if docstring['function']:
+            txt += '.'
+    for prop in ['function', 'signature']:
+        if prop in docstring:
+            txt += docstring[prop]
+    txt += docstring['docstring']
+    return txt
+
+
+@timing.timed('render')
+def format_markdown(docstring, sections, headers, template):
+    """
+    Format a docstring as markdown.
+
+    Args:
+        docstring : The extracted docstring (see `extract.Extract.find`).
+        sections : The parsed sections of the docstring, with code blocks
+            marked.
+        headers : The headers known by the parser.
+        template : The compiled template (see `render.TemplateCache`).
+
+    """
+    hd1 = '#'
+    hd2 = '##'
+    hd3 = '###'
+    return template.render(header=docstring, sections=sections,
+                           headers=headers, h1=hd1, h2=hd2, h3=hd3)
+
+
+def record(filename, name, docstring, sections):
+    """
+    Returns a dictionary that contains the file, the name, the properties, and
+    the parsed sections of a docstring.
+
+    Args:
+        filename : The file that the docstring was extracted from.
+        name : The name of the docstring.
+        docstring : The extracted docstring (see `extract.Extract.find`).
+        sections : The parsed sections of the docstring.
+
+    """
+    return {'file': filename,
+            'name': name,
+            'class': docstring['class'],
+            'function': docstring['function'],
+            'signature': docstring.get('signature', ''),
+            'type': docstring.get('type', ''),
+            'sections': sections}
+
+
+def open_output(filename):
+    """
+    Opens a file to write text to.
+
+    Args:
+        filename : The name of the file. Use `'-'` for stdout. The file is
+            compressed using gzip if its name ends with `.gz`.
+
+    Returns:
+        A file object.
+
+    """
+    import sys
+    if filename == '-':
+        return sys.stdout
+    if filename.endswith('.gz'):
+        import gzip
+        return gzip.open(filename, 'wt')
+    return open(filename, 'w')
@@ -0,0 +1,151 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module provides a collector for the diagnostics (e.g., missing argument
+documentation) that are found while parsing docstrings. By default, the parsers
+issue diagnostics as warnings. When a `Diagnostics` object is passed to a
+parser, the diagnostics are recorded instead, together with the file, symbol,
+and line that they were found in. The records are plain dictionaries that can
+be sent between processes, merged, and serialized as JSON.
+"""
+
+
+class Diagnostics(object):
+    """
+    A collector of diagnostics.
+
+    Each diagnostic is recorded as a dictionary with the keys `file`, `symbol`,
+    `line`, `kind`, and `message`. The kinds are:
+      * `missing-arg-doc` : An argument is not documented.
+      * `annotation-mismatch` : The annotation of an argument in the docstring
+        does not match the signature.
+      * `unknown-arg` : A documented argument is not in the signature.
+      * `undefined-header` : An argument list follows an unknown header.
+      * `parse-error` : A docstring could not be parsed.
+      * `extract-error` : A file could not be extracted.
+
+    Attributes:
+        enabled : A flag that if set to `False` discards all diagnostics.
+        file : The file that diagnostics are recorded for.
+        symbol : The symbol (e.g., `Class.method`) that diagnostics are
+            recorded for.
+        line : The line number that diagnostics are recorded for.
+        records : The list of recorded diagnostics. The list is shared with
+            the collectors returned by `bind`.
+
+    """
+
+    def __init__(self, enabled=True, file=None, symbol=None, line=None,
+                 records=None):
+        """
+        Initializer for Diagnostics.
+
+        Arguments:
+            enabled(optional): Set to `False` to discard all diagnostics.
+                Defaults to `True`.
+            file(optional): The file that diagnostics are recorded for.
+            symbol(optional): The symbol that diagnostics are recorded for.
+            line(optional): The line number that diagnostics are recorded for.
+            records(optional): A list to record diagnostics in.
+
+        """
+        self.enabled = enabled
+        self.file = file
+        self.symbol = symbol
+        self.line = line
+        self.records = [] if records is None else records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def bind(self, file=None, symbol=None, line=None):
+        """
+        Returns a collector that records diagnostics for a file, symbol, and
+        line in the same list of records as this collector.
+        """
+        return Diagnostics(self.enabled,
+                           self.file if file is None else file,
+                           self.symbol if symbol is None else symbol,
+                           self.line if line is None else line,
+                           self.records)
+
+    def add(self, kind, message):
+        """
+        Records a diagnostic (unless the collector is disabled).
+
+        Arguments:
+            kind: The kind of diagnostic (e.g., `'missing-arg-doc'`).
+            message: A description of the diagnostic.
+
+        """
+        if not self.enabled:
+            return
+        self.records.append({'file': self.file, 'symbol': self.symbol,
+                             'line': self.line, 'kind': kind,
+                             'message': message})
+
+    def merge(self, records):
+        """
+        Adds the records of another collector, or a list of records (e.g.,
+        received from another process).
+        """
+        if not self.enabled:
+            return
+        self.records.extend(records)
+
+    def counts(self):
+        """
+        Returns the number of diagnostics of each kind.
+        """
+        out = {}
+        for record in self.records:
+            out[record['kind']] = out.get(record['kind'], 0) + 1
+        return out
+
+    def text(self):
+        """
+        Returns the diagnostics as plain-text, one diagnostic per line.
+        """
+        out = []
+        for record in self.records:
+            fields = [record['file'] or '<unknown>']
+            if record['line']:
+                fields[0] += ':%d' % record['line']
+            if record['symbol'] is not None:
+                fields.append(record['symbol'] or '.')
+            fields += [record['kind'], record['message']]
+            out.append(': '.join(fields))
+        return '\n'.join(out)
+
+    def json(self):
+        """
+        Returns the diagnostics as JSON data.
+        """
+        import json
+        return json.dumps({'diagnostics': self.records,
+                           'counts': self.counts()},
+                          sort_keys=True, indent=4, separators=(',', ': '))
@@ -2,7 +2,12 @@
 mydocstring
 
 Usage:
-  mydocstring <file> <name> [-tmj] [-T=<tpl>]
+  mydocstring serve [--socket=<path>] [-T=<tpl>] [-e=<engine>]
+  mydocstring build <src> <out> [-mj] [-T=<tpl>] [-e=<engine>] [--force] [--profile=<fmt>]
+  mydocstring <file> <name>... [-tmj] [--jsonl=<out>] [--text-file=<out>] [--markdown-file=<out>] [--json-file=<out>] [-T=<tpl>] [-e=<engine>] [--cache-dir=<dir> | --no-cache] [--report=<fmt>] [--profile=<fmt>]
+  mydocstring -r=<dir> [--jobs=<n>] [-tmj] [--jsonl=<out>] [--text-file=<out>] [--markdown-file=<out>] [--json-file=<out>] [-T=<tpl>] [-e=<engine>] [--cache-dir=<dir> | --no-cache] [--report=<fmt>] [--profile=<fmt>]
+  mydocstring -w=<dir> [--interval=<s>] [-tmj] [-T=<tpl>] [-e=<engine>]
+  mydocstring --stdin [-tm] [-T=<tpl>] [-e=<engine>]
   mydocstring -h | --help
   mydocstring --version
 
@@ -12,7 +17,41 @@ Options:
   -m --markdown                     Output extracted docstring as Markdown.
   -t --text                         Output extracted docstring as plain-text.
   -j --json                         Output extracted docstring as JSON.
+  --jsonl=<out>                     Write one line of JSON per docstring to a
+                                    file, or to stdout if <out> is `-`. The
+                                    file is compressed if it ends with `.gz`.
+  --text-file=<out>                 Write plain-text output to a file.
+  --markdown-file=<out>             Write Markdown output to a file.
+  --json-file=<out>                 Write JSON output to a file.
   -T=<tpl> --template=<tpl>         Set template for Markdown output.
+  -e=<engine> --engine=<engine>     Set extraction engine: regex, ast, or tokenize
+                                    [default: regex].
+  -r=<dir> --recursive=<dir>        Extract all docstrings from all Python files
+                                    in a directory tree.
+  --jobs=<n>                        Number of processes to use for extracting
+                                    files (0 uses one per CPU) [default: 1].
+  --cache-dir=<dir>                 Cache extracted docstrings in a directory.
+                                    Defaults to $MYDOCSTRING_CACHE_DIR, if set.
+  --no-cache                        Disable the cache.
+  -w=<dir> --watch=<dir>            Watch a directory tree and output the
+                                    docstrings that change.
+  --interval=<s>                    Seconds between checking for changes
+                                    [default: 1].
+  --stdin                           Read queries of the form <file>:<name> from
+                                    stdin, one per line, and output one line of
+                                    JSON per docstring (see --jsonl). Use -t
+                                    and -m to include the formatted output.
+  --socket=<path>                   Serve requests on a Unix domain socket
+                                    instead of stdin and stdout.
+  --force                           Render all outputs of a build, even if their
+                                    inputs have not changed.
+  --report=<fmt>                    Check the docstrings against their
+                                    signatures and output all diagnostics as
+                                    json or text instead of warnings.
+  --profile=<fmt>                   Time each stage of extracting, parsing, and
+                                    rendering, and output the count, total,
+                                    median, and 95th percentile of each stage
+                                    to stderr as a table or json.
 
 Examples:
   Extract the module docstring
@@ -23,22 +62,129 @@ Examples:
     mydocstring module.py Class --markdown
   Extract a method docstring
     mydocstring module.py Class.method --markdown
+  Extract multiple docstrings
+    mydocstring module.py function Class Class.method --markdown
+  Extract all docstrings in a package using four processes
+    mydocstring --recursive=package --jobs=4 --json
+  Output docstrings as Markdown each time they change
+    mydocstring --watch=package --markdown
+  Write Markdown and JSON output for a package to two files in one pass
+    mydocstring -r=package --markdown-file=api.md --json-file=api.json
+  Write all docstrings in a package to a compressed JSON Lines file
+    mydocstring --recursive=package --jsonl=docs.jsonl.gz
+  Report all diagnostics for a package as JSON
+    mydocstring --recursive=package --report=json
+  Report where the time is spent when extracting a package
+    mydocstring --recursive=package --markdown --profile=table
+  Query docstrings from a pipeline
+    echo module.py:Class.method | mydocstring --stdin --markdown
+  Build Markdown and JSON files for a package, rendering only what changed
+    mydocstring build package docs
+  Answer JSON-RPC requests (e.g., from an editor) on a socket
+    mydocstring serve --socket=/tmp/mydocstring.sock
 
 Help:
   Please see the issue tracker for the Github repository:
   https://github.com/ooreilly/docstringout
 """
-from docopt import docopt
 from . import command
 
+# The options produced by `docopt` for the usage above, in the same order, and
+# their defaults
+defaults = [('serve', False), ('--socket', None), ('--template', None),
+            ('--engine', 'regex'), ('build', False), ('<src>', None),
+            ('<out>', None), ('--markdown', False), ('--json', False),
+            ('--force', False), ('--profile', None), ('<file>', None),
+            ('<name>', []), ('--text', False), ('--jsonl', None),
+            ('--text-file', None), ('--markdown-file', None),
+            ('--json-file', None), ('--cache-dir', None), ('--no-cache', False),
+            ('--report', None), ('--recursive', None), ('--jobs', '1'),
+            ('--watch', None), ('--interval', '1'), ('--stdin', False),
+            ('--help', False), ('--version', False)]
+
+flags = {'-t': '--text', '-m': '--markdown', '-j': '--json'}
+values = {'-T': '--template', '-e': '--engine', '-r': '--recursive'}
+commands = ['serve', 'build']
+
+
 def main():
     """
     Program main
     """
-    options = docopt(__doc__)
+    import sys
+    options = parse_argv(sys.argv[1:])
+    if options is None:
+        from docopt import docopt
+        options = docopt(__doc__)
     cmd = command.Command(options)
 
-    for opt in options:
-        if options[opt]:
-            cmd(opt)
+    try:
+        for opt in options:
+            if options[opt]:
+                cmd(opt)
+    finally:
+        cmd.close()
+
+
+def parse_argv(argv):
+    """
+    Parses the command line arguments of the most common commands, i.e.,
+    extracting docstrings from a file or a directory tree, without using
+    `docopt`.
+
+    Args:
+        argv : The command line arguments (excluding the program name).
+
+    Returns:
+        dict: The same options as returned by `docopt`, or `None` if the
+            arguments are not handled. In that case, `docopt` is used instead
+            (e.g., to show help, or to report an error).
+
+    """
+    options = dict(defaults)
+    allowed = set(['--text', '--markdown', '--json', '--jsonl', '--text-file',
+                   '--markdown-file', '--json-file', '--template', '--engine',
+                   '--cache-dir', '--no-cache', '--report', '--recursive',
+                   '--jobs', '--profile'])
+    found = []
+    names = []
+    for arg in argv:
+        if not arg.startswith('-') or arg == '-':
+            names.append(arg)
+        elif arg.startswith('--'):
+            key, sep, value = arg.partition('=')
+            if key not in allowed:
+                return None
+            if isinstance(options[key], bool):
+                if sep:
+                    return None
+                value = True
+            elif not sep:
+                return None
+            found.append(key)
+            options[key] = value
+        elif arg[:2] in values and len(arg) > 2:
+            found.append(values[arg[:2]])
+            options[values[arg[:2]]] = arg[2:]
+        elif len(arg) > 1 and all('-' + c in flags for c in arg[1:]):
+            for c in arg[1:]:
+                found.append(flags['-' + c])
+                options[flags['-' + c]] = True
+        else:
+            return None
 
+    # Options can only be given once, and some options can only be used
+    # together with others
+    if len(found) != len(set(found)):
+        return None
+    if options['--cache-dir'] is not None and options['--no-cache']:
+        return None
+    if options['--recursive'] is not None:
+        if names:
+            return None
+    elif len(names) < 2 or '--jobs' in found or names[0] in commands:
+        return None
+    else:
+        options['<file>'] = names[0]
+        options['<name>'] = names[1:]
+    return options
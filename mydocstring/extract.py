@@ -25,6 +25,9 @@ SOFTWARE.
 This module is used to extract a docstring from source.
 """
 import re
+from collections.abc import Mapping
+
+from . import timing
 
 
 class Extract(object):
@@ -106,6 +109,60 @@ class Extract(object):
                 r'Unable to extract docstring for `%s`' % self.query)
         return matches
 
+    def finditer(self, pattern, pos=0, endpos=None):
+        """
+        Apply regex pattern to the section `txt[pos:endpos]` of the text
+        without copying it. Like for a copy of the section, `^` matches at the
+        start of the section.
+
+        Args:
+            pattern: The pattern to search for.
+            pos(optional): The offset of the start of the section.
+            endpos(optional): The offset of the end of the section. Defaults to
+                the end of the text.
+
+        Raises:
+            NameError: if no matches are found.
+
+        Returns:
+            list: The match objects found.
+
+        """
+        if endpos is None:
+            endpos = len(self.txt)
+
+        matches = []
+        # `^` only matches at `pos` if it is the start of a line
+        if pattern.startswith('^') and pos > 0 and self.txt[pos - 1] != '\n':
+            match = re.compile(pattern[1:], re.M).match(self.txt, pos, endpos)
+            if match:
+                matches.append(match)
+                pos = match.end()
+        matches.extend(re.compile(pattern, re.M).finditer(self.txt, pos,
+                                                          endpos))
+        if not matches:
+            raise NameError(
+                r'Unable to extract docstring for `%s`' % self.query)
+        return matches
+
+    def sections(self):
+        """
+        Returns the sections of the text that are separated by the token
+        `token_split` in `self.keywords`, e.g., one section per function.
+
+        Returns:
+            list: The sections as `(start, end)` offsets into the text.
+
+        """
+        out = []
+        start = 0
+        for match in re.finditer(self.keywords['token_split'], self.txt,
+                                 re.M):
+            out.append((start, match.start()))
+            start = match.end()
+        out.append((start, len(self.txt)))
+        return out
+
     def extract(self, query):
         """
         Extracts the docstring.
@@ -122,6 +179,11 @@ class Extract(object):
 
         self.query = query
         self.classname, self.funcname, self.dtype = get_names(query)
+
+        matches = self.lookup()
+        if matches is not None:
+            return matches
+
         types = {
             'class': self.extract_class,
             'method': self.extract_method,
@@ -131,6 +193,44 @@ class Extract(object):
 
         return types[self.dtype]()
 
+    def extract_all(self):
+        """
+        Extracts all docstrings that are listed by `Extract.names`.
+
+        Returns:
+            dict: The docstrings keyed by query. See `Extract.find` for a
+                description of each docstring.
+
+        """
+        out = {}
+        for names in self.names():
+            self.classname, self.funcname, self.dtype = names
+            self.query = get_query(*names)
+            out[self.query] = self.lookup()
+        return out
+
+    def names(self):
+        """
+        Override this method to list all docstrings that can be extracted
+        using `Extract.lookup`.
+
+        Returns:
+            list: A list of tuples in the format returned by `get_names`.
+        """
+        return []
+
+    def lookup(self):
+        """
+        Override this method to answer the current query without searching the
+        text, e.g., by using an index of the source code. When no match is
+        returned, the query is handled by the `extract_*` methods.
+
+        Returns:
+            A dictionary that matches the description given by `Extract.find`,
+            a list of such dictionaries, or `None` if the query is not found.
+        """
+        return None
+
     def extract_function(self):
         """
         Override this method to extract function docstrings for the specific
@@ -175,25 +275,20 @@ class Extract(object):
 
     def findall(self, pattern, ids=None):
         """
-        Splits the input text into multiple strings and performs a search for
-        each string. The idea is to handle text that contains multiple
-        functions/methods and search each such function for a specific pattern.
+        Splits the input text into multiple sections (see `Extract.sections`)
+        and performs a search for each section. The idea is to handle text
+        that contains multiple functions/methods and search each such function
+        for a specific pattern. The sections are searched in place and the
+        text is never copied.
 
         """
-        import re
-
         out = []
-        input_txt = self.txt
         if self.split:
-            matches = re.split(
-                self.keywords['token_split'], self.txt, flags=re.M)
-            for match in matches:
-                self.txt = match
+            for start, end in self.sections():
                 try:
-                    out.append(self.find(pattern, ids))
-                except:
+                    out.append(self.find(pattern, ids, start, end))
+                except NameError:
                     continue
-            self.txt = input_txt
             if not out:
                 raise NameError(
                     r'Unable to extract docstring for `%s`' % self.query)
@@ -204,12 +299,20 @@ class Extract(object):
         else:
             return self.find(pattern, ids)
 
-    def find(self, pattern, ids=None):
+    def find(self, pattern, ids=None, pos=0, endpos=None):
         """
         Performs a search for a docstring that matches a specific pattern.
 
+        Args:
+            pattern: The pattern to search for.
+            ids(optional): A dictionary that maps each attribute to the index
+                of the group that captures it. Defaults to `self.ids`.
+            pos(optional): The offset to start the search at.
+            endpos(optional): The offset to end the search at. Defaults to the
+                end of the text.
+
         Returns:
-            dict: The return type is a dictionary with the following keys:
+            DocRecord: The return type is a mapping with the following keys:
                  * `class` :  The name of the class.
                  * `function` : The name of the function/method.
                  * `signature` : The signature of the function/method.
@@ -221,17 +324,14 @@ class Extract(object):
                  * `source` : The source code if the query is a function/method.
                  * `args` : A dictionary containing signature arguments, and
                     return type.
+                 * `lineno` : The line number that the docstring starts at, if
+                    it is known.
 
         Raises:
             NameError: This is exception is raised if the docstring cannot be
                 extracted.
         """
-        import textwrap
-        try:
-            from . import parse
-        except:
-            import parse
-        matches = self.get_matches(pattern)
+        matches = self.finditer(pattern, pos, endpos)
 
         if not ids:
             ids = self.ids
@@ -239,47 +339,281 @@ class Extract(object):
         out_list = []
 
         for match in matches:
-            cls = get_match(match, ids['class'])
-            function = get_match(match, ids['function'])
-            signature = format_txt(get_match(match, ids['signature']))
-            indent = len(get_match(match, ids['indent']))
-            return_annotation = get_match(match, ids['return_annotation'])
-            docstring = remove_indent(
-                get_match(match, ids['docstring']), indent)
-            if self.dtype == 'function' or self.dtype == 'method':
-                source = textwrap.dedent(self.function_keyword + function +
-                                         signature + ':' + return_annotation +
-                                         '\n' + get_match(match, ids['body']))
-            else:
-                source = ''
-
-            out = {}
-            out['class'] = cls
-            out['function'] = function
-            out['signature'] = signature
-            out['docstring'] = docstring
-            out['return_annotation'] = return_annotation
-            out['source'] = source
-            out['type'] = self.dtype
-            out['label'] = self.query
-            try:
-                out['parsed_signature'] = parse.parse_signature(
-                    out['signature'])
-            except:
-                pass
-            out_list.append(out)
+            cls = get_span(match, ids['class'])
+            function = get_span(match, ids['function'])
+            indent = get_span(match, ids['indent'])
+            out_list.append(
+                self.result(
+                    cls=self.txt[cls[0]:cls[1]],
+                    function=self.txt[function[0]:function[1]],
+                    signature=get_span(match, ids['signature']),
+                    return_annotation=get_span(match,
+                                               ids['return_annotation']),
+                    indent=indent[1] - indent[0],
+                    docstring=get_span(match, ids['docstring']),
+                    body=get_span(match, ids['body'])))
 
         if len(out_list) == 1:
             return out_list[0]
         else:
             return out_list
 
+    def result(self, cls, function, signature, return_annotation, indent,
+               docstring, body, header_indent=0, line=None):
+        """
+        Constructs the record that is returned for a single match (see
+        `Extract.find` for a description of its keys). The signature, return
+        annotation, docstring, and body can be given as `(start, end)` offsets
+        into the text, in which case they are not copied until they are read.
+
+        Arguments:
+            cls: The name of the class.
+            function: The name of the function/method.
+            signature: The unformatted signature.
+            return_annotation: The return annotation.
+            indent: The number of spaces to remove from the docstring.
+            docstring: The docstring, including its indentation.
+            body: The source code that follows the docstring.
+            header_indent(optional): The number of spaces to remove from each
+                line of the body.
+            line(optional): The line number that the docstring starts at.
+                Computed from the offsets of the docstring if not given.
+
+        Returns:
+            DocRecord: The docstring and its properties.
+
+        """
+        return DocRecord(self.txt, cls=cls, function=function,
+                         signature=signature,
+                         return_annotation=return_annotation,
+                         indent=indent, docstring=docstring, body=body,
+                         header_indent=header_indent, dtype=self.dtype,
+                         label=self.query, keyword=self.function_keyword,
+                         line=line)
+
+
+class DocRecord(Mapping):
+    """
+    A compact, read-only mapping that holds a docstring and its properties
+    (see `Extract.find` for a description of its keys).
+
+    The record refers to the source code that it was extracted from instead of
+    holding copies of it. The strings are sliced from the source code, and the
+    dedented docstring, source, and parsed signature are constructed, the
+    first time they are read. Records compare equal to dictionaries that have
+    the same keys and values. Use `DocRecord.to_dict` to obtain a dictionary.
+    Checking if a key is present does not construct its value. The parsed
+    signature is therefore present if the signature is not empty, and is
+    `None` if the signature cannot be parsed.
+
+    Attributes:
+        txt : The source code that the record was extracted from.
+        cls : The name of the class.
+        function : The name of the function/method.
+        dtype : What type of construct the docstring is attached to.
+        label : The search query string.
+        keyword : The keyword that starts the source of a function/method.
+        indent : The number of spaces to remove from the docstring.
+        header_indent : The number of spaces to remove from each line of the
+            body.
+        signature : The unformatted signature.
+        return_annotation : The return annotation.
+        docstring : The docstring, including its indentation.
+        body : The source code that follows the docstring.
+        line : The line number that the docstring starts at (see `lineno`).
+
+    The attributes `signature`, `return_annotation`, `docstring`, and `body`
+    are either strings, or `(start, end)` offsets into `txt`.
+
+    """
+    __slots__ = ('txt', 'cls', 'function', 'dtype', 'label', 'keyword',
+                 'indent', 'header_indent', 'signature', 'return_annotation',
+                 'docstring', 'body', 'line', '_values')
+
+    fields = ('class', 'function', 'signature', 'docstring',
+              'return_annotation', 'source', 'type', 'label',
+              'parsed_signature', 'lineno')
+
+    def __init__(self, txt, cls, function, signature, return_annotation,
+                 indent, docstring, body, header_indent=0, dtype='', label='',
+                 keyword='def ', line=None):
+        self.txt = txt
+        self.cls = cls
+        self.function = function
+        self.dtype = dtype
+        self.label = label
+        self.keyword = keyword
+        self.indent = indent
+        self.header_indent = header_indent
+        self.signature = signature
+        self.return_annotation = return_annotation
+        self.docstring = docstring
+        self.body = body
+        self.line = line
+        # Values that have been constructed, keyed by name
+        self._values = None
+
+    def text(self, name):
+        """
+        Returns the text of an attribute (e.g., `'docstring'`) as it appears
+        in the source code.
+        """
+        span = getattr(self, name)
+        if isinstance(span, tuple):
+            return self.txt[span[0]:span[1]]
+        return span
+
+    def lineno(self):
+        """
+        Returns the line number (starting at 1) of the first line of the
+        docstring, or `None` if it is not known.
+        """
+        if self.line is None and isinstance(self.docstring, tuple):
+            self.line = self.txt.count('\n', 0, self.docstring[0]) + 1
+        return self.line
+
+    def to_dict(self):
+        """
+        Returns the record as a dictionary.
+        """
+        return dict((key, self[key]) for key in self)
+
+    def __getitem__(self, key):
+        if key == 'class':
+            return self.cls
+        elif key == 'function':
+            return self.function
+        elif key == 'return_annotation':
+            return self.text('return_annotation')
+        elif key == 'type':
+            return self.dtype
+        elif key == 'label':
+            return self.label
+        elif key == 'lineno':
+            line = self.lineno()
+            if line is None:
+                raise KeyError(key)
+            return line
+        elif key not in self:
+            raise KeyError(key)
+
+        if self._values is None:
+            self._values = {}
+        if key not in self._values:
+            self._values[key] = self._value(key)
+        value = self._values[key]
+        if value is None and key != 'parsed_signature':
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key in self.fields:
+            if key in self:
+                yield key
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __contains__(self, key):
+        # Values are not constructed to check if they are present
+        if key == 'parsed_signature':
+            return bool(self.text('signature'))
+        elif key == 'lineno':
+            return self.line is not None or isinstance(self.docstring, tuple)
+        return key in self.fields
+
+    def __reduce__(self):
+        # Only the text of the attributes is copied, not the source code
+        return (DocRecord, ('', self.cls, self.function,
+                            self.text('signature'),
+                            self.text('return_annotation'), self.indent,
+                            self.text('docstring'), self.text('body'),
+                            self.header_indent, self.dtype, self.label,
+                            self.keyword, self.lineno()))
+
+    def __repr__(self):
+        return 'DocRecord(%r)' % self.to_dict()
+
+    def _value(self, key):
+        # Constructs the value of a key, or `None` if it has no value
+        from . import parse
+
+        if key == 'signature':
+            return format_txt(self.text('signature'))
+        elif key == 'docstring':
+            return remove_indent(self.text('docstring'), self.indent)
+        elif key == 'source':
+            if self.dtype != 'function' and self.dtype != 'method':
+                return ''
+            import textwrap
+            body = remove_header_indent(self.text('body'), self.header_indent)
+            return textwrap.dedent(self.keyword + self.function +
+                                   self['signature'] + ':' +
+                                   self.text('return_annotation') + '\n' +
+                                   body)
+        elif key == 'parsed_signature':
+            try:
+                return parse.parse_signature(self['signature'])
+            except ValueError:
+                return None
+
 
 class PyExtract(Extract):
     """
     Base class for extracting docstrings from python source code.
+
+    Queries are answered using a `ModuleIndex` that is built the first time a
+    docstring is extracted. Queries for classes and functions that the index
+    found without a docstring raise `NameError`, and other queries that are
+    not found in the index fall back to a regex search of the source code.
+
+    Attributes:
+        index : The `ModuleIndex` of `txt`, or `None` if it has not been built
+            yet.
+
     """
 
+    def __init__(self, txt):
+        Extract.__init__(self, txt)
+        self.index = None
+
+    def names(self):
+        if self.index is None:
+            self.index = ModuleIndex(self.txt)
+        return list(self.index.entries)
+
+    @timing.timed('lookup')
+    def lookup(self):
+        if self.index is None:
+            self.index = ModuleIndex(self.txt)
+        key = (self.classname, self.funcname, self.dtype)
+        entries = self.index.entries.get(key)
+        if not entries:
+            if key in self.index.undocumented:
+                raise NameError(
+                    r'Unable to extract docstring for `%s`' % self.query)
+            return None
+
+        out_list = []
+        for entry in entries:
+            out_list.append(
+                self.result(
+                    cls=entry['class'],
+                    function=entry['function'],
+                    signature=entry['signature'],
+                    return_annotation=entry['return_annotation'],
+                    indent=entry['indent'],
+                    docstring=entry['docstring'],
+                    body=entry['body'],
+                    header_indent=entry['header_indent'],
+                    line=entry['line']))
+
+        if len(out_list) == 1:
+            return out_list[0]
+        else:
+            return out_list
+
+    @timing.timed('extract_function')
     def extract_function(self):
                   #  ^\s*                         - start with zero or more spaces
                   #      (%s)                     - capture name of function
@@ -318,6 +652,7 @@ class PyExtract(Extract):
         }
         return self.findall(pattern, ids)
 
+    @timing.timed('extract_class')
     def extract_class(self):
                     #^\s*                                                   - starts with zero or more space
                     #    class                                              - class pattern
@@ -338,6 +673,7 @@ class PyExtract(Extract):
             self.keywords['docstring']))
         return self.find(pattern)
 
+    @timing.timed('extract_method')
     def extract_method(self):
                   #  class                                  - class pattern
                   #       \s+                               - one or more space
@@ -382,6 +718,7 @@ class PyExtract(Extract):
         }
         return self.find(pattern, ids)
 
+    @timing.timed('extract_module')
     def extract_module(self):
                   # ()                        - capture nothing
                   #   ()                      - capture nothing
@@ -415,6 +752,13 @@ class PyBindExtract(PyExtract):
         }
         self.split = 1
 
+    def names(self):
+        # PyBind docstrings are not Python source code and cannot be indexed
+        return []
+
+    def lookup(self):
+        return None
+
     def extract_function(self):
         pattern = (
             r'^\s*(%s)(\([\w\W]*?\)' % (self.funcname) +
@@ -439,7 +783,7 @@ class PyBindExtract(PyExtract):
         if not match:
             raise NameError('Class name in query string does not match class ' \
                             'name in docstring.')
-        out['class'] = self.classname
+        out.cls = self.classname
         return out
 
     def extract_class(self):
@@ -492,7 +836,817 @@ class PyBindExtract(PyExtract):
         return functions
 
 
-def extract(filestr, query):
+class AstExtract(Extract):
+    """
+    Extracts docstrings from Python source code using the abstract syntax tree
+    produced by the `ast` module in the standard library.
+
+    In contrast to `PyExtract`, the source code is never searched using regex
+    and decorated functions, nested classes, and single-quoted docstrings are
+    supported. The source code must be valid syntax for the running version of
+    Python (3.8, or later is required).
+
+    Attributes:
+        nodes : A dictionary that maps the tuple returned by `get_names` for a
+            query to a list of AST nodes that have docstrings. `None` until the
+            first query.
+
+    """
+
+    def __init__(self, txt):
+        Extract.__init__(self, txt)
+        self.nodes = None
+        self._lines = []
+        self._offsets = []
+
+    @timing.timed('lookup')
+    def lookup(self):
+        """
+        Looks up the current query in the syntax tree.
+
+        Raises:
+            NameError: This exception is raised if the docstring cannot be
+                extracted.
+
+        """
+        if self.nodes is None:
+            self._build()
+
+        key = (self.classname, self.funcname, self.dtype)
+        if key not in self.nodes:
+            raise NameError(
+                r'Unable to extract docstring for `%s`' % self.query)
+
+        out_list = [self._result(node) for node in self.nodes[key]]
+        if len(out_list) == 1:
+            return out_list[0]
+        else:
+            return out_list
+
+    def names(self):
+        if self.nodes is None:
+            self._build()
+        return list(self.nodes)
+
+    def _build(self):
+        import ast
+
+        self._lines = _splitlines(self.txt)
+        self._offsets = [0]
+        for line in self._lines:
+            self._offsets.append(self._offsets[-1] + len(line))
+
+        self.nodes = {}
+        tree = ast.parse(self.txt)
+        self._add(tree, ('', '', 'module'))
+        self._visit(tree, None)
+
+    def _visit(self, node, cls):
+        # `cls` is `None` at the module level, the name of the class inside a
+        # class body, and `''` inside a function.
+        import ast
+
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                self._add(child, (child.name, '', 'class'))
+                self._visit(child, child.name)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if cls:
+                    self._add(child, (cls, child.name, 'method'))
+                elif cls is None:
+                    self._add(child, ('', child.name, 'function'))
+                self._visit(child, '')
+            else:
+                self._visit(child, cls)
+
+    def _add(self, node, key):
+        import ast
+
+        if ast.get_docstring(node, clean=False) is not None:
+            self.nodes.setdefault(key, []).append(node)
+
+    def _offset(self, lineno, col_offset):
+        # Column offsets in the syntax tree are UTF-8 byte offsets
+        line = self._lines[lineno - 1]
+        col = len(line.encode('utf-8')[:col_offset].decode('utf-8', 'replace'))
+        return self._offsets[lineno - 1] + col
+
+    def _result(self, node):
+        import ast
+
+        doc = node.body[0]
+        start = self._offset(doc.lineno, doc.col_offset)
+        end = self._offset(doc.end_lineno, doc.end_col_offset)
+        while self.txt[start] in 'rRuU':
+            start += 1
+        quote = 3 if self.txt[start:start + 3] in ('"""', "'''") else 1
+        docstring = (start + quote, end - quote)
+
+        cls = self.classname
+        function = self.funcname
+        signature = ''
+        return_annotation = ''
+        body = ''
+        header_indent = 0
+        if not isinstance(node, ast.Module):
+            linenum = node.lineno - 1
+            pos = self._offset(node.lineno, node.col_offset) - \
+                    self._offsets[linenum]
+            pos += _header.match(self._lines[linenum][pos:]).end()
+            start = self._offsets[linenum] + pos
+            linenum, end, ret_start = _scan_header(self.txt, self._lines,
+                                                   self._offsets, linenum, pos)
+            signature = (start, end)
+            return_annotation = (ret_start, end)
+            # Include trailing empty lines for consistency with `PyExtract`
+            end_lineno = node.end_lineno
+            while end_lineno < len(self._lines) and \
+                    not self._lines[end_lineno].strip():
+                end_lineno += 1
+            body = (self._offsets[doc.end_lineno], self._offsets[end_lineno])
+            header_indent = node.col_offset
+
+        return self.result(cls=cls,
+                           function=function,
+                           signature=signature,
+                           return_annotation=return_annotation,
+                           indent=doc.col_offset,
+                           docstring=docstring,
+                           body=body,
+                           header_indent=header_indent,
+                           line=doc.lineno)
+
+
+class TokenizeExtract(Extract):
+    """
+    Extracts docstrings from Python source code using `scan_docstrings`, which
+    is built on the `tokenize` module in the standard library. The source code
+    is scanned once, in linear time, on the first query. Use `from_file` to
+    scan a file line by line instead of reading it into memory first.
+
+    Only the text of each docstring, signature, and function body is kept.
+    The lines of the source code are discarded as soon as they are no longer
+    needed, i.e., at the end of each class or function at the module level.
+
+    Attributes:
+        entries : A dictionary that maps the tuple returned by `get_names` for
+            a query to a list of the entries yielded by `scan_docstrings`,
+            with the body of each function and method added as `source`.
+            `None` until the first query.
+
+    """
+
+    def __init__(self, txt):
+        Extract.__init__(self, txt)
+        self.entries = None
+
+    @classmethod
+    def from_file(cls, fh):
+        """
+        Returns a new extractor that has scanned the source code in a file.
+        The file is read line by line and can be closed afterwards.
+
+        Arguments:
+            fh: A file handle (or any object with a `readline` method) to read
+                the source code from.
+
+        Raises:
+            SyntaxError: This exception is raised if the source code cannot be
+                tokenized.
+
+        """
+        extractor = cls('')
+        extractor._build(fh)
+        return extractor
+
+    def names(self):
+        if self.entries is None:
+            self._build()
+        return list(self.entries)
+
+    @timing.timed('lookup')
+    def lookup(self):
+        """
+        Looks up the current query in the scanned entries.
+
+        Raises:
+            NameError: This exception is raised if the docstring cannot be
+                extracted.
+
+        """
+        if self.entries is None:
+            self._build()
+
+        key = (self.classname, self.funcname, self.dtype)
+        if key not in self.entries:
+            raise NameError(
+                r'Unable to extract docstring for `%s`' % self.query)
+
+        out_list = []
+        for entry in self.entries[key]:
+            out_list.append(
+                self.result(cls=entry['class'],
+                            function=entry['function'],
+                            signature=entry['signature'],
+                            return_annotation=entry['return_annotation'],
+                            indent=entry['indent'],
+                            docstring=entry['docstring'],
+                            body=entry['source'],
+                            line=entry['line']))
+
+        if len(out_list) == 1:
+            return out_list[0]
+        else:
+            return out_list
+
+    def _build(self, fh=None):
+        import io
+
+        if fh is None:
+            fh = io.StringIO(self.txt)
+        lines = _LineBuffer(fh)
+        self.entries = {}
+        for entry in scan_docstrings(lines):
+            start, end = entry['body']
+            entry['source'] = ''
+            if entry['type'] in ('function', 'method'):
+                entry['source'] = remove_header_indent(
+                    lines.text(start, end), entry['header_indent'])
+            # Blocks at the module level are not nested in any other block
+            if not entry['header_indent']:
+                lines.discard(end)
+            key = (entry['class'], entry['function'], entry['type'])
+            self.entries.setdefault(key, []).append(entry)
+
+
+class _LineBuffer(object):
+    # Reads lines from a file handle and keeps them until they are discarded
+
+    def __init__(self, fh):
+        self._readline = fh.readline
+        self.lines = []
+        # The line number of the first line in `lines`
+        self.first = 1
+
+    def readline(self):
+        line = self._readline()
+        self.lines.append(line)
+        return line
+
+    def text(self, start, end):
+        # Returns the lines `start` to `end` (exclusive)
+        return ''.join(self.lines[start - self.first:end - self.first])
+
+    def discard(self, end):
+        # Discards the lines before line `end`
+        if end > self.first:
+            del self.lines[:end - self.first]
+            self.first = end
+
+
+class ModuleIndex(object):
+    """
+    An index of the docstrings found in Python source code.
+
+    The index is built using a single pass over the source code and records
+    the module docstring and the docstrings of all classes, methods, and module
+    functions. Once the index has been built, a query is answered by a
+    dictionary lookup.
+
+    Attributes:
+        txt : The source code that has been indexed.
+        entries : A dictionary that maps the tuple returned by `get_names` for
+            a query to a list of entries (overloaded functions have more than
+            one entry). Each entry is a dictionary that contains the keys
+            `class`, `function`, `type`, `indent` (the indentation of the
+            docstring), `header_indent` (the indentation of `def` or
+            `class`), `line` (the line number of the docstring), and the
+            spans `signature`, `return_annotation`, `docstring`, and `body`. A
+            span is a tuple `(start, end)` of offsets into `txt`.
+        undocumented : A set of the keys of the classes, methods, and module
+            functions that have been found without a docstring.
+
+    """
+
+    def __init__(self, txt):
+        """
+        Builds the index.
+
+        Arguments:
+            txt: A string containing the source code to index.
+
+        """
+        self.txt = txt
+        self.entries = {}
+        self.undocumented = set()
+        self._build()
+
+    def lookup(self, query):
+        """
+        Looks up a query in the index.
+
+        Arguments:
+            query : The docstring to search for (see `Extract.extract`).
+
+        Returns:
+            A list of entries, or `None` if the query is not found.
+
+        """
+        try:
+            key = get_names(query)
+        except ValueError:
+            return None
+        return self.entries.get(key)
+
+    def get(self, entry, span):
+        """
+        Returns the text of a span of an entry (e.g., `'docstring'`).
+        """
+        start, end = entry[span]
+        return self.txt[start:end]
+
+    def get_body(self, entry):
+        """
+        Returns the body of an entry with the indentation of its header
+        removed.
+        """
+        return remove_header_indent(self.get(entry, 'body'),
+                                    entry['header_indent'])
+
+    def _build(self):
+        txt = self.txt
+        lines = _splitlines(txt)
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+        self._offsets = offsets
+
+        # Open classes and functions as a list of (indent, type, name, entry)
+        scopes = []
+        delim = None
+        depth = 0
+        first = True
+        linenum = 0
+
+        while linenum < len(lines):
+            line = lines[linenum]
+            # Skip the contents of multi-line strings and continuation lines
+            if delim or depth:
+                delim, depth, _, _ = _scan_line(line, 0, delim, depth)
+                linenum += 1
+                continue
+
+            code = line.lstrip()
+            if not code or code[0] == '#':
+                linenum += 1
+                continue
+
+            indent = len(line) - len(code)
+            self._close_scopes(scopes, indent, offsets[linenum])
+
+            header = _header.match(line)
+            if header:
+                linenum = self._add_header(scopes, lines, offsets, linenum,
+                                           header)
+            else:
+                if first and not indent:
+                    docstring = _find_docstring(lines, offsets, linenum)
+                    if docstring:
+                        start, end, _, linenum = docstring
+                        self._add({'class': '', 'function': '',
+                                   'type': 'module', 'indent': 0,
+                                   'header_indent': 0,
+                                   'signature': (start, start),
+                                   'return_annotation': (start, start),
+                                   'docstring': (start, end),
+                                   'body': (start, start)})
+                        first = False
+                        continue
+                delim, depth, _, _ = _scan_line(line, indent, None, 0)
+                linenum += 1
+            first = False
+
+        self._close_scopes(scopes, 0, len(txt))
+        del self._offsets
+
+    def _add_header(self, scopes, lines, offsets, linenum, header):
+        """
+        Adds the class or function whose header starts at `linenum` and returns
+        the line number to continue scanning from.
+        """
+        indent = len(header.group(1))
+        keyword = header.group(2)
+        name = header.group(3)
+
+        # Find the end of the header, which may span multiple lines
+        start = offsets[linenum] + header.end()
+        linenum, end, ret_start = _scan_header(self.txt, lines, offsets,
+                                               linenum, header.end())
+        if end < 0:
+            return linenum + 1
+
+        tail = lines[linenum][end - offsets[linenum] + 1:].strip()
+        linenum += 1
+
+        parent = scopes[-1] if scopes else None
+        if keyword == 'class':
+            dtype = 'class'
+            cls = name
+            function = ''
+        elif not parent:
+            dtype = 'function'
+            cls = ''
+            function = name
+        elif parent[1] == 'class':
+            dtype = 'method'
+            cls = parent[2]
+            function = name
+        else:
+            # Nested functions are not indexed
+            dtype = ''
+
+        # One-line definitions, e.g., `def f(): pass`, do not have docstrings
+        docstring = None
+        if not tail or tail[0] == '#':
+            docstring = _find_docstring(lines, offsets, linenum)
+
+        entry = None
+        if dtype and docstring:
+            doc_start, doc_end, doc_indent, linenum = docstring
+            entry = {'class': cls, 'function': function, 'type': dtype,
+                     'indent': doc_indent, 'header_indent': indent,
+                     'signature': (start, end),
+                     'return_annotation': (ret_start, end),
+                     'docstring': (doc_start, doc_end),
+                     'body': (offsets[linenum], offsets[linenum])}
+            self._add(entry)
+        elif dtype:
+            self.undocumented.add((cls, function, dtype))
+
+        scopes.append((indent, keyword, name, entry))
+        return linenum
+
+    def _add(self, entry):
+        import bisect
+
+        entry['line'] = bisect.bisect_right(self._offsets,
+                                            entry['docstring'][0])
+        key = (entry['class'], entry['function'], entry['type'])
+        self.entries.setdefault(key, []).append(entry)
+
+    def _close_scopes(self, scopes, indent, offset):
+        # A scope is closed by a line that is not indented further than the
+        # header of the scope. The body of a function ends where it is closed.
+        while scopes and scopes[-1][0] >= indent:
+            entry = scopes.pop()[3]
+            if entry and entry['type'] != 'class':
+                entry['body'] = (entry['body'][0], max(entry['body'][0],
+                                                       offset))
+
+
+def scan_docstrings(fh):
+    """
+    Scans Python source code for docstrings in a single streaming pass using
+    the `tokenize` module. Only the current line of the source code is held in
+    memory, and the time taken grows linearly with the size of the source
+    code, regardless of how many strings it contains.
+
+    A docstring is a string that is the first statement of the module, or of
+    the body of a class or function. Classes at any level of nesting, methods
+    (functions in the body of a class), and module functions are scanned.
+
+    Arguments:
+        fh: A file handle (or any object with a `readline` method) to read the
+            source code from.
+
+    Yields:
+        dict: An entry for each docstring with the keys `class`, `function`,
+            `type`, `signature`, `return_annotation`, `docstring` (excluding
+            quotes and including indentation), `indent` (the column of the
+            docstring), `header_indent` (the column of `def` or `class`),
+            `lineno` (the line number of `def` or `class`), `line` (the line
+            number of the docstring), and `body` (the line numbers
+            `(start, end)` of the body that follows the docstring, where `end`
+            is exclusive). The entry of a class or function is yielded when
+            its body ends.
+
+    Raises:
+        SyntaxError: This exception is raised if the source code cannot be
+            tokenized.
+
+    """
+    import tokenize
+
+    # Open blocks as a list of (keyword, name, entry). `keyword` is `''` for
+    # blocks that do not belong to a class or function (e.g., `if`).
+    stack = []
+    # Header of a class or function that is being scanned
+    header = None
+    # Header that has been scanned and is followed by an indented block
+    block = None
+    # Entry of the block whose first statement is next
+    opened = None
+    # Entry and string token of a string that may be a docstring
+    candidate = None
+    module = True
+
+    try:
+        for tok in tokenize.generate_tokens(fh.readline):
+            toktype, string, start = tok[0], tok[1], tok[2]
+            if toktype in (tokenize.COMMENT, tokenize.NL):
+                continue
+
+            # A string is a docstring if it is followed by the end of the
+            # statement
+            if candidate:
+                entry, doc = candidate
+                candidate = None
+                if toktype == tokenize.NEWLINE:
+                    entry['indent'] = doc[2][1]
+                    entry['docstring'] = _strip_quotes(doc[1])
+                    entry['line'] = doc[2][0]
+                    entry['body'] = (doc[3][0] + 1, doc[3][0] + 1)
+                    if entry['type'] == 'module':
+                        yield entry
+
+            if header:
+                if not header['name']:
+                    header['name'] = string
+                    continue
+                if header['tokens'] is not None:
+                    if toktype == tokenize.OP and string in '([{':
+                        header['depth'] += 1
+                    elif toktype == tokenize.OP and string in ')]}':
+                        header['depth'] -= 1
+                    elif toktype == tokenize.OP and not header['depth']:
+                        if string == ':':
+                            header['signature'] = header['tokens']
+                            header['tokens'] = None
+                            continue
+                        if string == '->':
+                            header['arrow'] = len(header['tokens']) + 1
+                    header['tokens'].append(tok)
+                    continue
+                # The body follows on the next line, unless the class or
+                # function is defined on a single line
+                if toktype == tokenize.NEWLINE:
+                    block = _header_entry(header, stack)
+                header = None
+                continue
+
+            if toktype == tokenize.INDENT:
+                if block:
+                    stack.append(block)
+                    opened = block[2]
+                    block = None
+                else:
+                    stack.append(('', '', None))
+                continue
+
+            if toktype in (tokenize.DEDENT, tokenize.ENDMARKER):
+                while stack:
+                    entry = stack.pop()[2]
+                    if entry and 'docstring' in entry:
+                        entry['body'] = (entry['body'][0], start[0])
+                        yield entry
+                    if toktype == tokenize.DEDENT:
+                        break
+                continue
+
+            if toktype == tokenize.NEWLINE:
+                continue
+
+            # First statement of the module, or of a class or function
+            if module or opened:
+                entry = opened
+                if module:
+                    entry = {'class': '', 'function': '', 'type': 'module',
+                             'signature': '', 'return_annotation': '',
+                             'header_indent': 0, 'lineno': 0}
+                module = False
+                opened = None
+                if toktype == tokenize.STRING:
+                    candidate = (entry, tok)
+                    continue
+
+            if toktype == tokenize.NAME and string in ('def', 'class'):
+                line = tok[4]
+                header = {'keyword': string, 'name': '', 'tokens': [],
+                          'depth': 0, 'arrow': 0, 'lineno': start[0],
+                          'indent': len(line) - len(line.lstrip())}
+    except tokenize.TokenError as err:
+        raise SyntaxError(str(err))
+
+
+def _header_entry(header, stack):
+    # Returns the block that is opened by a class or function header
+    parent = None
+    for parent_block in reversed(stack):
+        if parent_block[0]:
+            parent = parent_block
+            break
+
+    name = header['name']
+    if header['keyword'] == 'class':
+        dtype, cls, function = 'class', name, ''
+    elif not parent:
+        dtype, cls, function = 'function', '', name
+    elif parent[0] == 'class':
+        dtype, cls, function = 'method', parent[1], name
+    else:
+        # Nested functions are not scanned
+        return (header['keyword'], name, None)
+
+    tokens = header['signature']
+    entry = {'class': cls, 'function': function, 'type': dtype,
+             'signature': _scan_signature(tokens),
+             'return_annotation': _scan_signature(tokens[header['arrow']:])
+                                  if header['arrow'] else '',
+             'header_indent': header['indent'],
+             'lineno': header['lineno']}
+    return (header['keyword'], name, entry)
+
+
+def _scan_signature(tokens):
+    # Reconstructs the text of a list of tokens. Line breaks are kept so that
+    # the text can be formatted in the same way as text read from the source.
+    out = []
+    prev = None
+    for tok in tokens:
+        if prev is None:
+            pass
+        elif tok[2][0] != prev[0]:
+            out.append('\n' + ' ' * tok[2][1])
+        else:
+            out.append(' ' * (tok[2][1] - prev[1]))
+        out.append(tok[1])
+        prev = tok[3]
+    return ''.join(out)
+
+
+def _strip_quotes(string):
+    # Removes the prefix and quotes of a string literal
+    string = string.lstrip('rRuU')
+    quote = string[:3] if string[:3] in ('"""', "\'\'\'") else string[:1]
+    return string[len(quote):-len(quote)]
+
+
+def _scan_header(txt, lines, offsets, linenum, pos):
+    """
+    Finds the end of the header of a class or function, i.e., the `:` that
+    follows its signature. The header may span multiple lines.
+
+    Arguments:
+        txt: The source code.
+        lines: The lines of the source code.
+        offsets: The offset of the beginning of each line in `txt`.
+        linenum: The line number that the header starts on.
+        pos: The position in the line that follows the name of the class or
+            function.
+
+    Returns:
+        tuple: The line number that the header ends on, the offset of the `:`
+            (`-1` if not found), and the offset of the return annotation (if
+            there is no return annotation, this offset is the same as the
+            offset of the `:`).
+
+    """
+    delim = None
+    depth = 0
+    arrow = -1
+    colon = -1
+    while linenum < len(lines):
+        delim, depth, colon, line_arrow = _scan_line(lines[linenum], pos,
+                                                     delim, depth)
+        if line_arrow >= 0 and arrow < 0:
+            arrow = offsets[linenum] + line_arrow
+        if colon >= 0 or not (delim or depth):
+            break
+        linenum += 1
+        pos = 0
+
+    if linenum == len(lines) or colon < 0:
+        return linenum, -1, -1
+
+    end = offsets[linenum] + colon
+    if arrow < 0 or arrow > end:
+        return linenum, end, end
+
+    ret_start = arrow + 2
+    while ret_start < end and txt[ret_start].isspace():
+        ret_start += 1
+    return linenum, end, ret_start
+
+
+def _find_docstring(lines, offsets, linenum):
+    """
+    Finds a docstring that starts on the first non-empty line at, or after,
+    `linenum`.
+
+    Returns:
+        tuple: The offsets `(start, end)` of the docstring (excluding quotes),
+            its indentation, and the line number that follows the docstring.
+            `None` is returned if no docstring is found.
+
+    """
+    while linenum < len(lines) and not lines[linenum].strip():
+        linenum += 1
+    if linenum == len(lines):
+        return None
+
+    line = lines[linenum]
+    code = line.lstrip()
+    # Raw and unicode strings have a prefix
+    prefix = int(code[:1] in ('r', 'R', 'u', 'U'))
+    delim = code[prefix:prefix + 3]
+    if delim not in ('"""', "'''"):
+        return None
+    indent = len(line) - len(code)
+    pos = indent + prefix + 3
+    start = offsets[linenum] + pos
+    while linenum < len(lines):
+        end = lines[linenum].find(delim, pos)
+        if end >= 0:
+            return (start, offsets[linenum] + end, indent, linenum + 1)
+        linenum += 1
+        pos = 0
+    return None
+
+
+def _scan_line(line, pos, delim, depth):
+    """
+    Scans a line of Python source code, starting at `pos`, for strings,
+    brackets, and comments.
+
+    Arguments:
+        line: The line to scan.
+        pos: The position to start scanning at.
+        delim: The delimiter of a multi-line string that is open at `pos`, or
+            `None`.
+        depth: The number of brackets that are open at `pos`.
+
+    Returns:
+        tuple: The delimiter of the multi-line string that is open at the end
+            of the line (or `None`), the number of open brackets, the position
+            of the first `:`  and the first `->` found outside of strings and
+            brackets (or `-1`).
+
+    """
+    colon = -1
+    arrow = -1
+    end = len(line)
+    while pos < end:
+        if delim:
+            pos = line.find(delim, pos)
+            if pos < 0:
+                break
+            pos += 3
+            delim = None
+            continue
+        c = line[pos]
+        if c == '#':
+            break
+        elif c == '"' or c == "'":
+            if line.startswith(c * 3, pos):
+                delim = c * 3
+                pos += 3
+                continue
+            # Skip single-line string
+            pos += 1
+            while pos < end and line[pos] != c and line[pos] != '\n':
+                if line[pos] == '\\':
+                    pos += 1
+                pos += 1
+        elif c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth = max(depth - 1, 0)
+        elif not depth:
+            if c == ':' and colon < 0:
+                colon = pos
+            elif c == '-' and arrow < 0 and line.startswith('->', pos):
+                arrow = pos
+        pos += 1
+    return delim, depth, colon, arrow
+
+
+def _splitlines(txt):
+    """
+    Splits text into lines and keeps the line endings. In contrast to
+    `str.splitlines`, lines are only split at newline characters, which is
+    consistent with the line numbers reported by the `ast` module.
+    """
+    lines = txt.split('\n')
+    out = [line + '\n' for line in lines[:-1]]
+    if lines[-1]:
+        out.append(lines[-1])
+    return out
+
+
+_header = re.compile(r'^([ \t]*)(?:async\s+)?(def|class)\s+(\w+)')
+
+
+def extract(filestr, query, engine='regex'):
     """
     Extracts a docstring from source.
 
@@ -500,19 +1654,252 @@ def extract(filestr, query):
         filestr: A string that specifies filename of the source code to extract
             from.
         query: A string that specifies what type of docstring to extract.
+        engine(optional): A string that selects the extraction engine. Use
+            `'regex'` for `PyExtract`, `'ast'` for `AstExtract`, or
+            `'tokenize'` for `TokenizeExtract`. Defaults to `'regex'`.
+
+    Raises:
+        NotImplementedError: This exception is raised if the file type or the
+            engine is not supported.
+
+    """
+    return get_extractor(filestr, engine).extract(query)
+
+
+def extract_many(filestr, queries, engine='regex', cache=None):
+    """
+    Extracts multiple docstrings from source. The source is only read once and
+    all queries are answered by the same extractor.
+
+    Arguments:
+        filestr: A string that specifies filename of the source code to extract
+            from.
+        queries: A list of strings that specify what docstrings to extract.
+        engine(optional): A string that selects the extraction engine (see
+            `extract`). Defaults to `'regex'`.
+        cache(optional): A `cache.Cache` to look up and store the docstrings
+            of the file in (see `extract_file`).
+
+    Returns:
+        dict: The docstrings keyed by query. See `Extract.find` for a
+            description of each docstring.
+
+    Raises:
+        NameError: This exception is raised if a docstring cannot be extracted.
+
+    """
+    docstrings = {}
+    if cache is not None:
+        docstrings = extract_file(filestr, engine, cache)
+
+    extractor = None
+    out = {}
+    for query in queries:
+        if query in out:
+            continue
+        name = get_query(*get_names(query))
+        if name in docstrings:
+            out[query] = docstrings[name]
+            continue
+        if extractor is None:
+            extractor = get_extractor(filestr, engine)
+        out[query] = extractor.extract(query)
+    return out
+
+
+def extract_file(filestr, engine='regex', cache=None):
+    """
+    Extracts all docstrings from a file (see `Extract.extract_all`).
+
+    Arguments:
+        filestr: A string that specifies filename of the source code to extract
+            from.
+        engine(optional): A string that selects the extraction engine (see
+            `extract`). Defaults to `'regex'`.
+        cache(optional): A `cache.Cache`. If the docstrings of the file are
+            found in the cache, the file is not extracted again. Otherwise,
+            the extracted docstrings are stored in the cache.
+
+    Returns:
+        dict: The docstrings keyed by query.
+
+    """
+    if cache is None:
+        return get_extractor(filestr, engine).extract_all()
+
+    txt = read_file(filestr)
+    key = cache.key(txt, engine)
+    docstrings = cache.get(key)
+    if docstrings is None:
+        docstrings = get_extractor(filestr, engine, txt).extract_all()
+        cache.put(key, docstrings)
+    return docstrings
+
+
+def extract_tree(root, jobs=1, engine='regex', cache=None, diagnostics=None):
+    """
+    Extracts all docstrings from all Python source files in a directory tree.
+    Files that cannot be read, or parsed, are skipped with a warning, or are
+    recorded as `extract-error` diagnostics if `diagnostics` is given.
+
+    Arguments:
+        root: A string that specifies the directory to search for `.py` files.
+        jobs(optional): The number of processes to extract files with. Use `0`
+            to use one process per CPU. Defaults to `1`, which extracts all
+            files in the current process.
+        engine(optional): A string that selects the extraction engine (see
+            `extract`). Defaults to `'regex'`.
+        cache(optional): A `cache.Cache`. Files found in the cache are yielded
+            first and only the remaining files are extracted.
+        diagnostics(optional): A `diagnostics.Diagnostics` that records the
+            files that could not be extracted.
+
+    Yields:
+        tuple: The filename and the docstrings of the file keyed by query (see
+            `Extract.extract_all`). Files are yielded as soon as they have been
+            extracted. When `jobs` is not `1`, the order is therefore not
+            deterministic.
+
+    """
+    import warnings
+
+    filenames = find_files(root)
+
+    if cache is not None:
+        misses = []
+        for filename in filenames:
+            try:
+                docstrings = cache.get(cache.key(read_file(filename), engine))
+            except (IOError, UnicodeDecodeError):
+                docstrings = None
+            if docstrings is None:
+                misses.append(filename)
+            else:
+                yield filename, docstrings
+        filenames = misses
+
+    if jobs == 1:
+        results = (_extract_file(filename, engine, cache)
+                   for filename in filenames)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        executor = ProcessPoolExecutor(max_workers=jobs or None)
+        futures = [executor.submit(_extract_file, filename, engine, cache)
+                   for filename in filenames]
+        results = (future.result() for future in as_completed(futures))
+
+    try:
+        for filename, docstrings, error, key in results:
+            if error:
+                message = 'Unable to extract docstrings from `%s`: %s' % \
+                    (filename, error)
+                if diagnostics is None:
+                    warnings.warn(message)
+                else:
+                    diagnostics.bind(file=filename).add('extract-error',
+                                                        message)
+                continue
+            if cache is not None:
+                cache.put(key, docstrings)
+            yield filename, docstrings
+    finally:
+        if executor:
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
+
+def find_files(root, ext='.py'):
+    """
+    Returns the sorted list of files in a directory tree that have a certain
+    extension. Hidden directories and `__pycache__` are skipped.
+
+    Arguments:
+        root: A string that specifies the directory to search.
+        ext(optional): The file extension to search for. Defaults to `'.py'`.
 
     """
     import os
 
-    filename = os.path.splitext(filestr)
-    ext = filename[1]
+    out = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted([dirname for dirname in dirnames
+                              if not dirname.startswith('.') and
+                              dirname != '__pycache__'])
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] == ext:
+                out.append(os.path.join(dirpath, filename))
+    return out
+
+
+def _extract_file(filestr, engine, cache=None):
+    # Runs in worker processes and therefore returns errors instead of raising
+    # them. Cache entries are stored by the caller.
+    try:
+        txt = read_file(filestr) if cache is not None else None
+        docstrings = get_extractor(filestr, engine, txt).extract_all()
+    except (IOError, SyntaxError, UnicodeDecodeError, ValueError) as err:
+        return filestr, None, str(err), ''
+    key = cache.key(txt, engine) if cache is not None else ''
+    return filestr, docstrings, '', key
+
+
+def get_extractor(filestr, engine='regex', txt=None):
+    """
+    Returns a new extractor for the source code in a file.
 
-    options = {'.py': PyExtract}
+    Arguments:
+        filestr: A string that specifies filename of the source code to extract
+            from.
+        engine(optional): A string that selects the extraction engine (see
+            `extract`). Defaults to `'regex'`.
+        txt(optional): The contents of the file, if it has already been read.
+            Otherwise, the `tokenize` engine scans the file line by line (see
+            `TokenizeExtract.from_file`), and the other engines read it first.
 
-    if ext in options:
-        extractor = options[ext](open(filestr).read())
+    Raises:
+        NotImplementedError: This exception is raised if the file type or the
+            engine is not supported (the `ast` engine requires Python 3.8, or
+            later).
 
-    return extractor.extract(query)
+    """
+    import os
+    import sys
+
+    filename = os.path.splitext(filestr)
+    ext = filename[1]
+
+    options = {'.py': {'regex': PyExtract, 'ast': AstExtract,
+                       'tokenize': TokenizeExtract}}
+
+    if ext not in options:
+        raise NotImplementedError(
+            'Unable to extract docstrings from `%s` files' % ext)
+    if engine not in options[ext]:
+        raise NotImplementedError(
+            'The extraction engine `%s` is not implemented' % engine)
+    # The `ast` engine uses the end positions of nodes, added in Python 3.8
+    if engine == 'ast' and sys.version_info < (3, 8):
+        raise NotImplementedError(
+            'The extraction engine `ast` requires Python 3.8, or later')
+
+    extractor = options[ext][engine]
+    if txt is None:
+        if hasattr(extractor, 'from_file'):
+            with open(filestr) as fh:
+                return extractor.from_file(fh)
+        txt = read_file(filestr)
+    return extractor(txt)
+
+
+@timing.timed('read')
+def read_file(filestr):
+    """
+    Returns the contents of a source file.
+    """
+    with open(filestr) as fh:
+        return fh.read()
 
 
 def get_names(query):
@@ -557,6 +1944,26 @@ def get_names(query):
     return (classname, funcname, dtype)
 
 
+def get_query(classname, funcname, dtype):
+    """
+    Constructs a query string from a class name, function name and type. This
+    function is the inverse of `get_names`.
+
+    Arguments:
+        classname: The class name, if any.
+        funcname: The function name, if any.
+        dtype: The type of the query `module`, `class`, `method`, or
+            `function`.
+
+    Returns:
+        str: The query string.
+
+    """
+    if dtype == 'method':
+        return '%s.%s' % (classname, funcname)
+    return classname or funcname
+
+
 def remove_indent(txt, indent):
     """
     Dedents a string by a certain amount.
@@ -569,6 +1976,19 @@ def remove_indent(txt, indent):
     return '\n'.join([header] + [line[indent:] for line in lines[1:]])
 
 
+def remove_header_indent(body, indent):
+    """
+    Removes up to `indent` leading spaces from each line of the body of a
+    function so that it is indented relative to the header of the function.
+    """
+    if not indent:
+        return body
+    lines = body.split('\n')
+    return '\n'.join(
+        [line[min(indent, len(line) - len(line.lstrip(' '))):]
+         for line in lines])
+
+
 def get_match(match, index, default=''):
     """
     Returns a value from match list for a given index. In the list is out of
@@ -581,6 +2001,19 @@ def get_match(match, index, default=''):
         return match[index]
 
 
+def get_span(match, index):
+    """
+    Returns the span `(start, end)` of the group of a match object for a given
+    index (the first group has index 0). If the index is out of bounds, or the
+    group did not participate in the match, an empty span is returned.
+
+    """
+    if index >= match.re.groups or match.start(index + 1) < 0:
+        return (0, 0)
+    else:
+        return match.span(index + 1)
+
+
 def format_txt(signature):
     """
     Remove excess spaces and newline characters.
@@ -27,8 +27,12 @@ parsers work on docstring data objects that are constructed using the `extract`
 module. After parsing, the data of docstring is stored in a dictionary. This
 data can for instance be serialized using JSON, or rendered to markdown.
 """
+import functools
 import re
 import warnings
+from collections.abc import Mapping
+
+from . import timing
 
 
 class DocString(object):
@@ -65,9 +69,21 @@ class DocString(object):
         exclude_warn_if_no_arg_doc: Do no issue warnings for args missing
             documentation if they are part of this list. Defaults to `['self']`.
 
+    Parsed docstrings can be memoized by passing a `cache.Memo` called `memo`
+    during initialization. The memo is keyed by the docstring, the signature,
+    and the configuration, and can be shared by multiple parsers. Each call to
+    `parse` returns a copy of the memoized data that is safe to modify.
+    The diagnostics found the first time that a docstring is parsed are
+    memoized too, and are reported again each time that it is parsed.
+
+    Diagnostics (e.g., missing argument documentation) are issued as warnings,
+    unless a `diagnostics.Diagnostics` object called `diagnostics` is passed
+    during initialization. In that case, they are recorded by this object.
+
     """
 
-    def __init__(self, docstring, signature=None, config=None):
+    def __init__(self, docstring, signature=None, config=None, memo=None,
+                 diagnostics=None):
         """
 
         Initialize a new parser.
@@ -80,12 +96,17 @@ class DocString(object):
                 this dict instead of obtaining them from the docstrings.
             config(dict, optional): A dict containing optional configuration
                 settings that modify default behavior.
+            memo(cache.Memo, optional): A cache of parsed docstrings.
+            diagnostics(diagnostics.Diagnostics, optional): A collector that
+                records diagnostics instead of issuing warnings.
 
         """
         self.header = {}
         self.docstring = docstring
         self.data = []
         self.signature = signature
+        self.memo = memo
+        self.diagnostics = diagnostics
 
         default_config = {}
         default_config['delimiter'] = ':'
@@ -108,53 +129,164 @@ class DocString(object):
         self._config = get_config(default_config, config)
 
         # Internals for parsing
-        # _section : This variable will hold the contents of each unparsed section
-        # _sections : A list that will hold all unparsed sections.
-        # _linenum : line number relative to the current section being
-        # parsed.
+        # sections : The unparsed sections found by the most recent call to
+        # `parse`.
         # _re .. : Regex functions.
-        # _indent : This variable will hold the current indentation (number of spaces).
 
         self._parsing = {
-            'indent': 0,
-            'linenum': 0,
-            'sections': [],
-            'section': []
+            'sections': []
         }
         self._re = {}
+        self._frozen_config = None
+        self._sections = None
+
+    @property
+    def sections(self):
+        """
+        A read-only mapping of the sections of the docstring keyed by header
+        (see `Sections`). Each section is parsed the first time it is
+        accessed.
+        """
+        if self._sections is None:
+            self._sections = Sections(self, self.docstring, self.signature)
+        return self._sections
 
-    def parse(self, mark_code_blocks=False):
+    def parse(self, mark_code_blocks=False, sections=None):
         """
-        This method should be overloaded and perform the parsing of all
-        sections.
+        Parses all sections of the docstring. The result is stored in `data`.
 
         Args:
             mark_code_blocks: Format code blocks using markdown. Defaults to
                 `False`.
+            sections(list, optional): Only parse the sections that have these
+                headers (e.g., `['Args', 'Returns']`). Use `''` to select
+                sections without a header. Other names for the argument and
+                return sections (see `GoogleDocString`) are also selected.
+                Defaults to all sections.
         """
-        self.data = []
-        self.extract_sections()
-        for section in self._parsing['sections']:
-            self.data.append(self.parse_section(section))
-
-        for i, di in enumerate(self.data):
-            self.check_args(di)
-            if self.signature:
-                self.override_annotations(self.data[i], self.signature['args'],
+        self._parsing['sections'], self.data = self._parse(self.docstring,
+                                                           self.signature,
+                                                           mark_code_blocks,
+                                                           sections)
+        return self.data
+
+    @timing.timed('parse')
+    def _parse(self, docstring, signature, mark_code_blocks, selected=None,
+               diagnostics=None):
+        # Returns the unparsed and the parsed sections of a docstring
+        if diagnostics is None:
+            diagnostics = self.diagnostics
+        issues = []
+        if self.memo is None:
+            sections = self.select_sections(self.extract_sections(docstring),
+                                            selected)
+            data = self.parse_sections(sections, signature, mark_code_blocks,
+                                       issues)
+            _report(issues, diagnostics)
+            return sections, data
+
+        if self._frozen_config is None:
+            self._frozen_config = _freeze(self._config)
+        key = (self.__class__.__name__, self._frozen_config, docstring,
+               _freeze(signature), bool(mark_code_blocks), _freeze(selected))
+        value = self.memo.get(key)
+        if value is None:
+            sections = self.select_sections(self.extract_sections(docstring),
+                                            selected)
+            data = self.parse_sections(sections, signature, mark_code_blocks,
+                                       issues)
+            self.memo.put(key, (tuple(sections), _copy_data(data),
+                                tuple(issues)))
+            _report(issues, diagnostics)
+            return sections, data
+        _report(value[2], diagnostics)
+        return list(value[0]), _copy_data(value[1])
+
+    def parse_sections(self, sections, signature=None,
+                       mark_code_blocks=False, issues=None):
+        """
+        Parses a list of sections obtained from `extract_sections`. This method
+        does not modify the parser and can be called by multiple threads.
+
+        Args:
+            sections: The sections to parse.
+            signature(dict, optional): A dict containing arguments and return
+                annotations (see `__init__`).
+            mark_code_blocks: Format code blocks using markdown. Defaults to
+                `False`.
+            issues(list, optional): A list to append `(kind, message)` tuples
+                to for each diagnostic found. Diagnostics are issued as
+                warnings if this argument is not specified.
+
+        Returns:
+            list: The parsed sections.
+
+        """
+        data = [self.parse_section(section, issues) for section in sections]
+
+        for section in data:
+            self.check_args(section, signature, issues)
+            if signature:
+                self.override_annotations(section, signature['args'],
                                           self._config['args'].split('|'))
                 self.override_annotations(
-                    self.data[i], {'': self.signature['return_annotation']},
+                    section, {'': signature['return_annotation']},
                     self._config['returns'].split('|'))
             if mark_code_blocks:
-                self.mark_code_blocks(self.data[i])
+                self.mark_code_blocks(section)
 
-        return self.data
+        return data
 
-    def extract_sections(self):
+    def extract_sections(self, docstring=None):
         """
         This method should be overloaded to specify how to extract sections.
+
+        Args:
+            docstring(optional): The docstring to extract sections from.
+                Defaults to the docstring of the parser.
+
+        Returns:
+            list: The unparsed sections.
         """
-        pass
+        return []
+
+    def section_header(self, section):
+        """
+        This method should be overloaded to return the header of an unparsed
+        section without parsing it (`''` if the section has no header).
+        """
+        return ''
+
+    def select_sections(self, sections, names=None):
+        """
+        Selects the unparsed sections that have the given headers.
+
+        Args:
+            sections: The unparsed sections.
+            names(list, optional): The headers to select. The names for the
+                argument and return sections given by the configuration
+                settings `args` and `returns` are treated as equivalent.
+                Defaults to all sections.
+
+        Returns:
+            list: The selected sections.
+
+        """
+        if names is None:
+            return sections
+        headers = set()
+        for name in names:
+            headers.update(self._aliases(name))
+        return [section for section in sections
+                if self.section_header(section) in headers]
+
+    def _aliases(self, name):
+        # Returns all names of a section header
+        for group in (self._config['args'], self._config['returns']):
+            aliases = [alias for alias in group.split('|') if alias]
+            if name in aliases:
+                return aliases
+        return [name]
 
     def parse_section(self, section):
         """
@@ -162,16 +294,24 @@ class DocString(object):
         """
         pass
 
-    def __json__(self):
+    def __json__(self, compact=False):
         """
-        Output docstring as JSON data.
+        Output docstring as JSON data. The parsed sections are followed by the
+        header. The parser is not modified.
+
+        Args:
+            compact(optional): Output the data on a single line, without
+                whitespace and with keys in the order that they were inserted.
+                Defaults to `False`.
+
         """
         import json
 
-        data = self.data
-        data.append(self.header)
+        data = self.data + [self.header]
+        if compact:
+            return json.dumps(data, separators=(',', ':'))
         return json.dumps(
-            self.data, sort_keys=True, indent=4, separators=(',', ': '))
+            data, sort_keys=True, indent=4, separators=(',', ': '))
 
     def __str__(self):
         """
@@ -191,14 +331,23 @@ class DocString(object):
         headers = self._config['headers'].split('|')
         return headers, data
 
-    def check_args(self, section):
+    def check_args(self, section, signature=None, issues=None):
         """
         Check if all args have been documented in the docstring and if, they
         have annotations, annotations matches the ones in the function
         signature. This method only works when `signature` have been specified. 
 
+        Args:
+            section: The parsed section to check.
+            signature(dict, optional): The signature to check against.
+                Defaults to the signature of the parser.
+            issues(list, optional): A list to append diagnostics to (see
+                `parse_sections`).
+
         """
-        if not self.signature or not self._config['check_args']:
+        if signature is None:
+            signature = self.signature
+        if not signature or not self._config['check_args']:
             return
 
         docstring_args = {}
@@ -207,27 +356,26 @@ class DocString(object):
             for arg in section['args']:
                 docstring_args[arg['field']] = arg
 
-            for arg in self.signature['args']:
+            for arg in signature['args']:
                 # Skip checks if signature does not contain any annotations
                 # or if the argument should not have documentation.
-                if not self.signature['args'][arg] or                          \
+                if not signature['args'][arg] or                          \
                    arg in self._config['exclude_warn_if_no_arg_doc']:
                     continue
                 if arg not in docstring_args and                               \
                         self._config['warn_if_no_arg_doc']:
-                    warnings.warn(
-                        'Missing documentation for `%s` in docstring.' % arg,
-                        UserWarning)
+                    _issue(issues, 'missing-arg-doc',
+                           'Missing documentation for `%s` in docstring.' % arg)
                 elif docstring_args[arg]['signature'] != \
-                     '(%s)'%self.signature['args'][arg] and    \
+                     '(%s)'%signature['args'][arg] and    \
                      docstring_args[arg]['signature'] != '':
-                    warnings.warn(
-                        'Annotation mismatch for `%s` in docstring.' % arg,
-                        UserWarning)
+                    _issue(issues, 'annotation-mismatch',
+                           'Annotation mismatch for `%s` in docstring.' % arg)
             for arg in docstring_args:
-                if arg not in self.signature['args']:
-                    warnings.warn(' Found argument `%s` in docstring that does'\
-                    ' not exist in function signature.' % arg, UserWarning)
+                if arg not in signature['args']:
+                    _issue(issues, 'unknown-arg',
+                           ' Found argument `%s` in docstring that does'
+                           ' not exist in function signature.' % arg)
 
     def override_annotations(self, section, parsed_args, headers):
         """
@@ -250,6 +398,7 @@ class DocString(object):
                 out['signature'] = parsed_args[arg['field']]
             section['args'].append(out)
 
+    @timing.timed('code_blocks')
     def mark_code_blocks(self, section):
         """
 
@@ -263,6 +412,22 @@ class DocString(object):
         section['text'] = mark_code_blocks(
             section['text'], lang=self._config['code'])
 
+    def mark_sections(self, data):
+        """
+        Returns a copy of parsed sections in which code blocks are formatted
+        using markdown. The result is the same as parsing the docstring again
+        using `parse(mark_code_blocks=True)`, but `data` is not modified and
+        only the text of each section is copied.
+
+        Args:
+            data: The parsed sections.
+
+        """
+        data = [dict(section) for section in data]
+        for section in data:
+            self.mark_code_blocks(section)
+        return data
+
 
 class GoogleDocString(DocString):
     """
@@ -290,8 +455,12 @@ class GoogleDocString(DocString):
         
 
     """
+    # Compiled regexes shared by all parsers, keyed by the configuration
+    # settings that they depend on (see `GoogleDocString._compile`).
+    _compiled = {}
 
-    def __init__(self, docstring, signature=None, config=None):
+    def __init__(self, docstring, signature=None, config=None, memo=None,
+                 diagnostics=None):
         """
         Initialize GoogleDocString parser.
 
@@ -311,15 +480,13 @@ class GoogleDocString(DocString):
         if config['extra_headers']:
             config['headers'] += '|' + config['extra_headers']
 
-        super(GoogleDocString, self).__init__(docstring, signature, config)
+        super(GoogleDocString, self).__init__(docstring, signature, config,
+                                              memo, diagnostics)
 
-        self._re = {
-            'header': self._compile_header(),
-            'indent': self._compile_indent(),
-            'arg': self._compile_arg()
-        }
+        self._re = self._compile()
 
-    def parse_section(self, section):
+    @timing.timed('sections')
+    def parse_section(self, section, issues=None):
         """
         Parses blocks in a section by searching for an argument list, and
         regular notes. The argument list must be the first block in the section.
@@ -341,19 +508,17 @@ class GoogleDocString(DocString):
 
         """
 
-        # Get header
         lines = section.split('\n')
-        header = self._compile_header().findall(lines[0])
+        table = self._classify(lines, headers=False, args=True)
 
         # Skip the first line if it is a header
-        header = self._get_header(lines[0])
-        self._parsing['linenum'] = int(bool(header))
+        header = self._re['header'].match(lines[0])
+        header = header.group(1) if header else ''
+        linenum = int(bool(header))
         text = []
 
         args = []
-        while self._parsing['linenum'] < len(lines):
-
-            linenum = self._parsing['linenum']
+        while linenum < len(lines):
 
             # Disable parsing inside code blocks
             if self._config['code_block_delimiter'] in lines[linenum]:
@@ -362,21 +527,22 @@ class GoogleDocString(DocString):
                                               code_block_delimiter=
                                               self._config['code_block_delimiter'])
                 text += code
-                self._parsing['linenum'] += len(code)
+                linenum += len(code)
                 continue
 
-            arg_data = self._parse_arglist(lines)
+            arg_data, linenum = self._parse_arglist(lines, table, linenum)
             if not header and arg_data and                                    \
             self._config['warn_if_undefined_header']:
-                warnings.warn("Undefined header: '%s'" %header                 \
-                              + ' followed by an argument list.')
+                _issue(issues, 'undefined-header',
+                       "Undefined header: '%s'" % header
+                       + ' followed by an argument list.')
             if (arg_data and header) or                                        \
                (arg_data and not header and not                                \
                self._config['ignore_args_for_undefined_headers']):
                 args.append(arg_data)
             else:
-                text.append(lines[self._parsing['linenum']])
-            self._parsing['linenum'] += 1
+                text.append(lines[linenum])
+            linenum += 1
 
         out = {}
         out['header'] = header
@@ -384,67 +550,89 @@ class GoogleDocString(DocString):
         out['args'] = args
         return out
 
-    def extract_sections(self):
+    @timing.timed('split')
+    def extract_sections(self, docstring=None):
         """
         Extracts sections from the docstring. Sections are identified by an
         additional header which is a recognized Keyword such as `Args` or
         `Returns`. All text within  a section is indented and the section ends
         after the indention.
-        """
 
-        lines = self.docstring.split('\n')
+        Args:
+            docstring(optional): The docstring to extract sections from.
+                Defaults to the docstring of the parser.
+
+        Returns:
+            list: The unparsed sections.
+        """
+        if docstring is None:
+            docstring = self.docstring
+
+        lines = docstring.split('\n')
+        table = self._classify(lines)
+        sections = []
+        section = []
+        indent = 0
         new_section = True
 
         for linenumber, line in enumerate(lines):
             # Compute amount of indentation
-            current_indent = self._get_indent(line)
+            current_indent = table['indent'][linenumber]
 
             # Capture indent to be able to remove it from the text and also
             # to determine when a section ends.
             # The indent is reset when a new section begins.
-            if new_section and self._is_indent(line):
-                self._parsing['indent'] = current_indent
+            if new_section and current_indent > 0:
+                indent = current_indent
                 new_section = False
 
-            if self._is_header(line):
-                self._err_if_missing_indent(lines, linenumber)
-                self._end_section()
-                self._begin_section()
+            if table['header'][linenumber] is not None:
+                self._err_if_missing_indent(lines, table, linenumber)
+                self._end_section(sections, section)
+                section = []
+                indent = 0
                 new_section = True
             # Section ends because of a change in indent that is not caused
             # by a line break
-            elif line and current_indent < self._parsing['indent']:
-                self._end_section()
-                self._begin_section()
+            elif line and current_indent < indent:
+                self._end_section(sections, section)
+                section = []
+                indent = 0
 
-            self._parsing['section'].append(line[self._parsing['indent']:])
+            section.append(line[indent:])
 
-        self._end_section()
-        self._begin_section()
+        self._end_section(sections, section)
+        return sections
 
-    def _parse_arglist(self, lines, require=False):
-        arg_data = self._get_arg(lines[self._parsing['linenum']])
+    def section_header(self, section):
+        header = self._re['header'].match(section.partition('\n')[0])
+        return header.group(1) if header else ''
+
+    def _parse_arglist(self, lines, table, linenum, require=False):
+        # Returns the argument (or `None`) that starts at `linenum` and the
+        # line number of the last line of its description
+        arg_data = table['arg'][linenum]
 
         if not arg_data:
             if require:
                 raise ValueError('Failed to parse argument list:\n `%s` ' %
-                                 (self._parsing['section']))
-            return None
+                                 '\n'.join(lines))
+            return None, linenum
 
         # Take into account that the description can be multi-line
         # the next line has to be indented
-        description = [arg_data[0][2]]
-        next_line = _get_next_line(lines, self._parsing['linenum'])
-        while self._is_indent(next_line):
-            self._parsing['linenum'] += 1
-            description.append(lines[self._parsing['linenum']])
-            next_line = _get_next_line(lines, self._parsing['linenum'])
+        description = [arg_data[2]]
+        indent = table['indent']
+        next_line = table['next']
+        while indent[next_line[linenum]]:
+            linenum += 1
+            description.append(lines[linenum])
 
         return {
-            'field': arg_data[0][0],
-            'signature': arg_data[0][1],
+            'field': arg_data[0],
+            'signature': arg_data[1],
             'description': '\n'.join(description)
-        }
+        }, linenum
 
     def _parse_code_block(self, lines, start=0, code_block_delimiter="```"):
         """
@@ -459,10 +647,9 @@ class GoogleDocString(DocString):
         code_block = []
         start_block = True
         end_block = False
-        linenum = self._parsing['linenum']
 
         # Go over each line starting at the beginning of the code block (``` ... )
-        for line in lines[linenum:]:
+        for line in lines[start:]:
             code_block.append(line)
             if code_block_delimiter in line:
                 if start_block:
@@ -476,6 +663,23 @@ class GoogleDocString(DocString):
 
         return code_block
 
+    def _compile(self):
+        """
+        Returns the compiled regexes for the current configuration. The regexes
+        are only compiled the first time that a configuration is used.
+        """
+        key = (self._config['headers'], self._config['delimiter'],
+               self._config['indent'], self._config['arg_delimiter'])
+        compiled = GoogleDocString._compiled.get(key)
+        if compiled is None:
+            compiled = {
+                'header': self._compile_header(),
+                'indent': self._compile_indent(),
+                'arg': self._compile_arg()
+            }
+            GoogleDocString._compiled[key] = compiled
+        return compiled
+
     def _compile_header(self):
                           # ^\s*          - starts with zero or more spaces
                           #     (%s)      - captures headers
@@ -502,68 +706,231 @@ class GoogleDocString(DocString):
             #                       (.*) - capture everything there is
             r'(\w*)\s*(\(.*\))?\s*%s(.*)' % self._config['arg_delimiter'])
 
-    def _err_if_missing_indent(self, lines, linenumber):
-        next_line = _get_next_line(lines, linenumber)
-        is_next_indent = self._is_indent(next_line)
-        if not is_next_indent:
-            raise SyntaxError("Missing indent after `%s`" % next_line)
+    def _err_if_missing_indent(self, lines, table, linenumber):
+        next_line = table['next'][linenumber]
+        if not table['indent'][next_line]:
+            raise SyntaxError("Missing indent after `%s`" %
+                              (lines + [''])[next_line])
 
-    def _begin_section(self):
-        self._parsing['section'] = []
-        self._parsing['indent'] = 0
-
-    def _end_section(self):
-        section_text = '\n'.join(self._parsing['section'])
+    def _end_section(self, sections, section):
+        section_text = '\n'.join(section)
         if section_text.strip():
-            self._parsing['sections'].append(section_text)
+            sections.append(section_text)
 
-    def _get_indent(self, line):
+    def _classify(self, lines, headers=True, args=False):
         """
-        Returns the indentation size.
+        Classifies each line in a single pass and returns a table that holds
+        the results. The table is a dictionary of lists that are indexed by
+        line number:
+            * `indent` : The indentation size (`0` if the line is indented by
+                less than the `indent` setting).
+            * `header` : The header keyword, or `None` if the line is not a
+                header (only classified if `headers` is `True`).
+            * `arg` : The tuple `(field, signature, description)` if the line
+                starts an argument list, or `None` (only classified if `args`
+                is `True`).
+            * `next` : The line number of the next non-empty line, or
+                `len(lines)` if there is none.
+
+        Each list has an additional entry for `len(lines)`, i.e., an empty
+        line past the last line.
         """
-        indent_size = self._re['indent'].findall(line)
-        if indent_size:
-            return len(indent_size[0])
-        else:
-            return 0
+        indent_re = self._re['indent']
+        header_re = self._re['header']
+        arg_re = self._re['arg']
+        num_lines = len(lines)
+
+        # Lines that do not contain the argument delimiter cannot be matched
+        # and are skipped without a (slow) search, unless it is a regex
+        delimiter = self._config['arg_delimiter']
+        if any(c in '.^$*+?{}[]\\|()' for c in delimiter):
+            delimiter = ''
+
+        indent = [0] * (num_lines + 1)
+        header = [None] * (num_lines + 1)
+        arg = [None] * (num_lines + 1)
+        next_line = [num_lines] * (num_lines + 1)
+
+        following = num_lines
+        for linenum in range(num_lines - 1, -1, -1):
+            line = lines[linenum]
+            next_line[linenum] = following
+            if not line:
+                continue
+            following = linenum
+            match = indent_re.match(line)
+            if match:
+                indent[linenum] = match.end()
+            if headers:
+                match = header_re.match(line)
+                if match:
+                    header[linenum] = match.group(1)
+            if args and delimiter in line:
+                match = arg_re.search(line)
+                if match:
+                    arg[linenum] = match.groups('')
+
+        return {'indent': indent, 'header': header, 'arg': arg,
+                'next': next_line}
+
+
+class Parser(object):
+    """
+    A reusable docstring parser that is configured once and then parses any
+    number of docstrings. In contrast to `DocString`, the parser is not tied to
+    a single docstring and holds no state between calls. A parser can
+    therefore be shared by multiple threads.
+
+    Example:
+        ```
+        parser = Parser(config={'extra_headers': 'Usage'})
+        data = parser.parse(docstring, signature=parse_signature('(a, b)'))
+        for data in parser.parse_many(docstrings):
+            ...
+        ```
+
+    """
+
+    def __init__(self, choice='Google', config=None, mark_code_blocks=False,
+                 memo=None, diagnostics=None):
+        """
+        Initialize a new parser.
+
+        Args:
+            choice(optional): Keyword that determines the docstring syntax to
+                parse. Defaults to `'Google'`.
+            config(dict, optional): A dict containing optional configuration
+                settings (see `DocString`).
+            mark_code_blocks(optional): Format code blocks using markdown.
+                Defaults to `False`.
+            memo(cache.Memo, optional): A cache of parsed docstrings (see
+                `DocString`).
+            diagnostics(diagnostics.Diagnostics, optional): A collector that
+                records diagnostics instead of issuing warnings.
+
+        Raises:
+            NotImplementedError : This exception is raised when no parser is
+                found.
 
-    def _is_indent(self, line):
         """
-        Returns if the line is indented or not.
+        parsers = {'Google': GoogleDocString}
+        if choice not in parsers:
+            raise NotImplementedError(
+                'The docstring parser `%s` is not implemented' % choice)
+        self.mark_code_blocks = mark_code_blocks
+        self._parser = parsers[choice]('', config=config, memo=memo,
+                                       diagnostics=diagnostics)
+
+    def parse(self, docstring, signature=None, sections=None,
+              diagnostics=None):
         """
-        indent = self._get_indent(line)
-        return bool(indent > 0)
+        Parses a docstring.
 
-    def _is_header(self, line):
-        return bool(self._re['header'].findall(line))
+        Args:
+            docstring: The docstring to parse.
+            signature(dict, optional): A dict containing arguments and return
+                annotations (see `DocString`).
+            sections(list, optional): Only parse the sections that have these
+                headers (see `DocString.parse`). Defaults to all sections.
+            diagnostics(diagnostics.Diagnostics, optional): A collector for
+                the diagnostics of this docstring (e.g., one returned by
+                `Diagnostics.bind`). Defaults to the collector of the parser.
 
-    def _get_header(self, line):
-        header = self._re['header'].findall(line)
-        if header:
-            return header[0]
-        else:
-            return ''
+        Returns:
+            list: The parsed sections (see `DocString.parse`).
 
-    def _get_arg(self, line):
-        return self._re['arg'].findall(line)
+        """
+        return self._parser._parse(docstring, signature,
+                                   self.mark_code_blocks, sections,
+                                   diagnostics)[1]
+
+    def sections(self, docstring, signature=None):
+        """
+        Returns the sections of a docstring keyed by header. Each section is
+        parsed the first time it is accessed (see `Sections`).
+        """
+        return Sections(self._parser, docstring, signature,
+                        self.mark_code_blocks)
 
-    def _is_arg(self, line):
-        return bool(self._re['arg'].findall(line))
+    def parse_many(self, docstrings):
+        """
+        Parses docstrings one at a time.
+
+        Args:
+            docstrings: An iterable of docstrings, or of
+                `(docstring, signature)` tuples.
 
+        Yields:
+            list: The parsed sections of each docstring.
 
-def _get_next_line(lines, linenumber):
+        """
+        for docstring in docstrings:
+            if isinstance(docstring, tuple):
+                yield self.parse(*docstring)
+            else:
+                yield self.parse(docstring)
+
+
+class Sections(Mapping):
     """
-    Returns the next line but skips over any empty lines.
-    An empty line is returned if read past the last line.
+    A read-only mapping of the sections of a docstring keyed by header (`''`
+    for sections without a header). The sections are split up when the mapping
+    is created, but each section is only parsed the first time it is accessed.
+    If multiple sections have the same header, the first one is used. Other
+    names for the argument and return sections (see `DocString.parse`) can be
+    used to access them, e.g., `sections['Args']` also finds `Arguments`.
+
     """
-    inc = linenumber + 1
-    num_lines = len(lines)
-    while True:
-        if inc == num_lines:
-            return ''
-        if lines[inc]:
-            return lines[inc]
-        inc += 1
+
+    def __init__(self, parser, docstring, signature=None,
+                 mark_code_blocks=False):
+        """
+        Initializer for Sections.
+
+        Args:
+            parser: The `DocString` used to extract and parse the sections.
+            docstring: The docstring.
+            signature(dict, optional): A dict containing arguments and return
+                annotations (see `DocString`).
+            mark_code_blocks(optional): Format code blocks using markdown.
+                Defaults to `False`.
+
+        """
+        self._parser = parser
+        self._signature = signature
+        self._mark_code_blocks = mark_code_blocks
+        self._unparsed = {}
+        self._headers = []
+        for section in parser.extract_sections(docstring):
+            header = parser.section_header(section)
+            if header not in self._unparsed:
+                self._unparsed[header] = section
+                self._headers.append(header)
+        self._parsed = {}
+
+    def __getitem__(self, name):
+        for header in self._parser._aliases(name):
+            if header in self._unparsed:
+                break
+        else:
+            raise KeyError(name)
+        if header not in self._parsed:
+            issues = []
+            self._parsed[header] = self._parser.parse_sections(
+                [self._unparsed[header]], self._signature,
+                self._mark_code_blocks, issues)[0]
+            _report(issues, self._parser.diagnostics)
+        return self._parsed[header]
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def __len__(self):
+        return len(self._headers)
+
+    def __contains__(self, name):
+        return any(header in self._unparsed
+                   for header in self._parser._aliases(name))
 
 
 def parser(obj, choice='Google', args=None, returns=None, config=None):
@@ -602,10 +969,18 @@ def summary(txt):
     return lines[0]
 
 
+@timing.timed('signature')
 def parse_signature(args, return_annotation='__return_annotation'):
     """
-        Parse the signature e.g., `(int: a, int: b) -> int` and put into a dict 
-        {'a' : 'int', 'b' : 'int', '__return_annotation__' : 'int'}
+        Parse the signature e.g., `(a: int, b: int = 1) -> int` and put into
+        a dict {'args': {'a': 'int', 'b': 'int = 1'}, 'return_annotation':
+        'int'}. The annotation and default value of an argument are stored
+        together. Arguments without annotation store `'=' + default`, or `''`
+        if there is no default value. Variadic arguments and markers keep their
+        prefix (e.g., `*args`, `**kwargs`, `*`, and `/`).
+
+        The result of parsing a signature is cached, so that parsing a
+        signature again (e.g., for overloaded functions) only costs a lookup.
 
         Args:
             args : string to parse.
@@ -613,88 +988,161 @@ def parse_signature(args, return_annotation='__return_annotation'):
                 Defaults to `'__return_annotation'`. This default value has been
                 chosen to avoid the return type to clash with the arguments.
                 
-
+        Raises:
+            ValueError: This exception is raised if the string does not contain
+                a signature.
 
         """
-                       # \(                               - ( pattern
-                       #   ([\w\W]*?)                     - captures characters and special characters
-                       #             \)                   - ) pattern
-                       #               \s*                - zero or more spaces
-                       #                  (?:             - non capture block starts
-                       #                     ->           - -> pattern
-                       #                       \s*        - zero or more spaces
-                       #                          (\w+)   - captures characters
-                       #                               )  - non capture block ends
-                       #                                ? - zero or one previous pattern
-    match = re.findall(r'\(([\w\W]*?)\)\s*(?:->\s*(\w+))?', args)
-    if not match:
-        raise ValueError('The string `%s` is not a signature.' % args)
-    match = match[0]
-
-    args_out = {'args': {}, 'return_annotation': ''}
-
-    if len(match) > 1:
-        args_out['return_annotation'] = match[1]
-
-    # Split the function input string
-    counts = {"p": 0, "l": 0, "b": 0, ":": 0}
-    marker = 0
-    txt = match[0]
-    for i, c in enumerate(txt):
-
-        # Count brackets, parentheses and inequality symbols
-        if c == "(":  # parentheses
-            counts["p"] += 1
-        elif c == ")":
-            counts["p"] -= 1
-        elif c == "<":  # greater than or less than symbols
-            counts["l"] += 1
-        elif c == ">":
-            counts["l"] -= 1
-        elif c == "[":  # greater than or less than symbols
-            counts["b"] += 1
-        elif c == "]":
-            counts["b"] -= 1
-        elif c == ":":
-            counts[":"] += 1
-
-        # Splitting
-        if c == ',' and counts["p"] == 0 and counts["l"] == 0 and counts[
-                "b"] == 0:
-            # PEP 484 annotated string
-            if counts[":"]:
-                name = txt[marker:i].split(":", 1)[0].strip(' ')
-                type_ = txt[marker:i].split(":", 1)[1].strip(' ')
-                counts[":"] -= 1
-            # No PEP484 string (`:` does not exist)
-            else:
-                name = txt[marker:i].strip(' ')
-                type_ = ''
-                if '=' in name:
-                    name, type_ = name.split('=')
-                    type_ = '=' + type_
-
-            args_out['args'][name] = type_
-            marker = i + 1
-        elif i == (
-                len(txt) - 1
-        ) and counts["p"] == 0 and counts["l"] == 0 and counts["b"] == 0:
-            # PEP 484 annotated string
-            if counts[":"]:
-                name = txt[marker:i + 1].split(":", 1)[0].strip(' ')
-                type_ = txt[marker:i + 1].split(":", 1)[1].strip(' ')
-                counts[":"] -= 1
-            # No PEP484 string (`:` does not exist)
-            else:
-                name = txt[marker:i + 1].strip(' ')
-                type_ = ''
-                if '=' in name:
-                    name, type_ = name.split('=')
-                    type_ = '=' + type_
-
-            args_out['args'][name] = type_
-            marker = i + 1
-    return args_out
+    parsed_args, annotation = _parse_signature(args)
+    return {'args': dict(parsed_args), 'return_annotation': annotation}
+
+
+def parse_signatures(signatures):
+    """
+    Parse multiple signatures (see `parse_signature`).
+
+    Args:
+        signatures : An iterable of strings to parse.
+
+    Returns:
+        list : The parsed signatures, and `None` for each string that is not a
+            signature.
+
+    """
+    out = []
+    for signature in signatures:
+        try:
+            out.append(parse_signature(signature))
+        except ValueError:
+            out.append(None)
+    return out
+
+
+                          # '(?:[^'\\]|\\.)*'   - single-quoted string
+                          # "(?:[^"\\]|\\.)*"   - double-quoted string
+                          # ->|::|<<|[=!<>]=   - operators that are skipped
+                          # [()\[\]{}<>,:=]    - brackets and delimiters
+_signature_tokens = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|"""
+                               r'->|::|<<|[=!<>]=|[()\[\]{}<>,:=]')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_signature(signature):
+    # Returns the arguments as a tuple of (name, annotation) pairs and the
+    # return annotation
+    start = signature.find('(')
+    if start < 0:
+        raise ValueError('The string `%s` is not a signature.' % signature)
+
+    # A `<` that directly follows an identifier opens a template argument
+    # list (e.g., `std::vector<int>`), unless it is never closed, in which
+    # case it is a comparison (e.g., `b=x<y`)
+    split = (_split_signature(signature, start, True) or
+             _split_signature(signature, start, False))
+    if split is None:
+        raise ValueError('The string `%s` is not a signature.' % signature)
+    params, end = split
+
+    parsed_args = []
+    for arg_start, arg_end, colon, equals in params:
+        if colon is not None:
+            name = signature[arg_start:colon].strip()
+            annotation = signature[colon + 1:arg_end].strip()
+        elif equals is not None:
+            name = signature[arg_start:equals].strip()
+            annotation = '=' + signature[equals + 1:arg_end].strip()
+        else:
+            name = signature[arg_start:arg_end].strip()
+            annotation = ''
+        if name:
+            parsed_args.append((name, annotation))
+
+    rest = signature[end + 1:].strip()
+    annotation = rest[2:].strip() if rest.startswith('->') else ''
+    return tuple(parsed_args), annotation
+
+
+def _split_signature(signature, start, templates):
+    # Returns the offsets of the arguments, as (start, end, colon, equals)
+    # tuples, and the offset of the closing parenthesis. Only tokens that can
+    # change the structure of the signature are visited, everything in between
+    # is sliced. Returns `None` if the brackets do not match.
+    params = []
+    brackets = []
+    arg_start = start + 1
+    colon = None
+    equals = None
+    for match in _signature_tokens.finditer(signature, start):
+        token = match.group()
+        if token in ('(', '[', '{'):
+            brackets.append(token)
+        elif token == '<':
+            if templates and _follows_identifier(signature, match.start()):
+                brackets.append('<')
+        elif token in (')', ']', '}'):
+            if not brackets or brackets.pop() == '<':
+                return None
+            if not brackets:
+                params.append((arg_start, match.start(), colon, equals))
+                return params, match.start()
+        elif token == '>':
+            if brackets and brackets[-1] == '<':
+                brackets.pop()
+        elif len(brackets) != 1:
+            continue
+        elif token == ',':
+            params.append((arg_start, match.start(), colon, equals))
+            arg_start = match.end()
+            colon = None
+            equals = None
+        elif token == ':' and colon is None and equals is None:
+            colon = match.start()
+        elif token == '=' and equals is None:
+            equals = match.start()
+    return None
+
+
+def _follows_identifier(text, pos):
+    # Returns `True` if `text[pos]` directly follows an identifier
+    start = pos
+    while start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+        start -= 1
+    return start < pos and not text[start].isdigit()
+
+
+def _issue(issues, kind, message):
+    # Appends a diagnostic to `issues`, or issues it as a warning if `issues`
+    # is `None`
+    if issues is None:
+        warnings.warn(message, UserWarning)
+    else:
+        issues.append((kind, message))
+
+
+def _report(issues, diagnostics=None):
+    # Records a list of `(kind, message)` diagnostics, or issues them as
+    # warnings if no collector is given
+    for kind, message in issues:
+        if diagnostics is None:
+            warnings.warn(message, UserWarning)
+        else:
+            diagnostics.add(kind, message)
+
+
+def _freeze(obj):
+    # Converts dictionaries and lists to tuples that can be used as keys
+    if isinstance(obj, dict):
+        return tuple(sorted((key, _freeze(obj[key])) for key in obj))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+def _copy_data(data):
+    # Copies parsed sections so that modifying the copy does not modify the
+    # original
+    return [dict(section, args=[dict(arg) for arg in section['args']])
+            for section in data]
 
 
 def get_config(default, config=None, warn=1):
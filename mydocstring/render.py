@@ -0,0 +1,171 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module renders parsed docstrings as Markdown. Templates are compiled once
+and kept in memory (and optionally on disk), and the default template is
+rendered by a built-in renderer that does not depend on mako.
+"""
+import os
+
+default_template = os.path.join(os.path.dirname(__file__),
+                                'templates/google_docstring.md')
+
+
+class TemplateCache(object):
+    """
+    Compiles templates and keeps them in memory, so that one template can be
+    used to render many docstrings. A template is compiled again when its
+    modification time or size changes.
+
+    Attributes:
+        module_directory : A directory to store the modules that mako compiles
+            templates into, or `None` to only keep them in memory. Modules
+            found in this directory are reused by other processes.
+        builtin : A flag that if set to `True` renders the default template
+            using `Markdown` instead of mako.
+        templates : A dictionary that maps each template file to its
+            modification time and size, and its compiled template.
+
+    """
+
+    def __init__(self, module_directory=None, builtin=True):
+        """
+        Initializer for TemplateCache.
+
+        Arguments:
+            module_directory(optional): A directory to store compiled
+                templates in. Defaults to `None`.
+            builtin(optional): Set to `False` to render the default template
+                using mako. Defaults to `True`.
+
+        """
+        self.module_directory = module_directory
+        self.builtin = builtin
+        self.templates = {}
+        self._markdown = None
+
+    def __len__(self):
+        return len(self.templates)
+
+    def get(self, filename=None):
+        """
+        Returns a compiled template.
+
+        Arguments:
+            filename(optional): The template file. Defaults to the default
+                template.
+
+        Returns:
+            An object that has a method `render` that takes the same keyword
+            arguments as the template, e.g., a `mako.template.Template`.
+
+        """
+        if filename is None:
+            filename = default_template
+        if self.builtin and _samefile(filename, default_template):
+            if self._markdown is None:
+                self._markdown = Markdown()
+            return self._markdown
+
+        stat = os.stat(filename)
+        state = (stat.st_mtime, stat.st_size)
+        entry = self.templates.get(filename)
+        if entry is None or entry[0] != state:
+            from mako.template import Template
+            entry = (state, Template(filename=filename,
+                                     module_directory=self.module_directory))
+            self.templates[filename] = entry
+        return entry[1]
+
+
+class Markdown(object):
+    """
+    Renders docstrings to the same output as the default template, without
+    using mako.
+    """
+
+    def render(self, **kwargs):
+        """
+        Renders a docstring (see `iter_render`).
+
+        Returns:
+            str: The rendered docstring.
+
+        """
+        return ''.join(self.iter_render(**kwargs))
+
+    def iter_render(self, header, sections, h1='#', h2='##', h3='###',
+                    **kwargs):
+        """
+        Renders a docstring piece by piece.
+
+        Arguments:
+            header: The extracted docstring (see `extract.Extract.find`).
+            sections: The parsed sections of the docstring.
+            h1(optional): The markup for the top-level headings.
+            h2(optional): The markup for the section headings.
+            h3(optional): Not used.
+
+        Yields:
+            str: The rendered docstring, one line at a time.
+
+        """
+        yield '\n'
+        if header['function']:
+            if header['class']:
+                yield '%s %s.%s\n' % (h1, header['class'], header['function'])
+            else:
+                yield '%s %s\n' % (h1, header['function'])
+            yield '```python\ndef %s%s:\n```\n' % (header['function'],
+                                                   header['signature'])
+        elif header['class']:
+            yield '%s %s\n' % (h1, header['class'])
+            yield '```python\nclass %s%s:\n```\n' % (header['class'],
+                                                     header['signature'])
+        yield '\n'
+
+        for section in sections:
+            if section['header']:
+                yield '%s %s\n' % (h2, section['header'])
+            else:
+                yield '---\n'
+            for arg in section['args'] or []:
+                if arg['field']:
+                    yield '* **%s** %s : %s\n' % (arg['field'],
+                                                  arg['signature'],
+                                                  arg['description'])
+                else:
+                    yield '* %s\n' % arg['description']
+            yield '%s\n' % section['text']
+
+        yield '\n'
+        if header['function'] and header['source']:
+            yield '%s Source\n```python\n%s\n```\n' % (h2, header['source'])
+
+
+def _samefile(filename, other):
+    try:
+        return os.path.samefile(filename, other)
+    except OSError:
+        return False
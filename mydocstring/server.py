@@ -0,0 +1,302 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module implements a long-running server that answers requests to extract,
+parse, and render docstrings. The extracted docstrings of each file, the parsed
+docstrings, and the compiled templates are kept in memory, so that a request
+does not pay for starting the interpreter, reading the source code, or
+compiling the template. A file is read again when its modification time or
+size changes.
+
+Requests and responses are JSON-RPC 2.0 messages, one message per line. The
+server either reads requests from stdin and writes the responses to stdout, or
+listens on a Unix domain socket.
+"""
+import inspect
+import json
+import os
+import threading
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class Server(object):
+    """
+    Answers requests to extract, parse, and render docstrings.
+
+    The methods that can be requested, and their parameters, are:
+      * `extract` : `file`, `name`. Returns the extracted docstring (see
+        `extract.Extract.find`), or all docstrings of the file keyed by name
+        if `name` is omitted.
+      * `parse` : `file`, `name`, `sections` (optional). Returns the parsed
+        sections (see `parse.DocString.parse`).
+      * `render` : `file`, `name`, `format` (optional), `template` (optional).
+        Returns the docstring formatted as `markdown` (default), `text`, or
+        `json`.
+      * `stats` : Returns the number of files and templates in memory, and the
+        statistics of the memo.
+
+    The name `.` selects the module docstring. Overloaded functions give a list
+    with one result per overload.
+
+    Attributes:
+        engine : The extraction engine (see `extract.extract`).
+        template : The default template for Markdown output.
+        memo : The `cache.Memo` of parsed docstrings.
+        files : A dictionary that maps each file to a tuple that holds its
+            modification time and size, its extractor, and its docstrings
+            keyed by name.
+        templates : The `render.TemplateCache` of compiled templates.
+
+    """
+
+    def __init__(self, engine='regex', template=None, memo=None,
+                 templates=None):
+        """
+        Initializer for Server.
+
+        Arguments:
+            engine(optional): The extraction engine. Defaults to `'regex'`.
+            template(optional): The default template for Markdown output.
+                Defaults to the template that comes with the package.
+            memo(optional): The `cache.Memo` of parsed docstrings. Defaults to
+                a new memo.
+            templates(optional): The `render.TemplateCache` of compiled
+                templates. Defaults to a new cache.
+
+        """
+        from . import cache
+        from . import render
+        self.engine = engine
+        self.template = render.default_template if template is None \
+            else template
+        self.memo = cache.Memo() if memo is None else memo
+        self.templates = render.TemplateCache() if templates is None \
+            else templates
+        self.files = {}
+        self.methods = {'extract': self.extract,
+                        'parse': self.parse,
+                        'render': self.render,
+                        'stats': self.stats}
+        self._lock = threading.Lock()
+
+    def handle(self, request):
+        """
+        Answers a single request.
+
+        Arguments:
+            request: A JSON-RPC request, either as a string or decoded.
+
+        Returns:
+            dict: The response, or `None` if the request is a notification
+                (i.e., it has no `id`).
+
+        """
+        if not isinstance(request, dict):
+            try:
+                request = json.loads(request)
+            except ValueError as err:
+                return _error(None, PARSE_ERROR, str(err))
+        if not isinstance(request, dict) or \
+           not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, 'Invalid request')
+
+        ident = request.get('id')
+        method = self.methods.get(request['method'])
+        params = request.get('params', {})
+        if method is None:
+            response = _error(ident, METHOD_NOT_FOUND,
+                              'Method not found: `%s`' % request['method'])
+        elif not isinstance(params, dict):
+            response = _error(ident, INVALID_PARAMS,
+                              'Parameters must be given by name')
+        else:
+            try:
+                inspect.signature(method).bind(**params)
+            except TypeError as err:
+                response = _error(ident, INVALID_PARAMS, str(err))
+            else:
+                try:
+                    with self._lock:
+                        response = {'jsonrpc': '2.0', 'id': ident,
+                                    'result': method(**params)}
+                except Exception as err:
+                    response = _error(ident, SERVER_ERROR, str(err))
+
+        if 'id' not in request:
+            return None
+        return response
+
+    def serve(self, infile, outfile):
+        """
+        Answers requests read line by line from `infile`, and writes each
+        response on a line to `outfile`, until the end of `infile`.
+        """
+        for line in infile:
+            if not line.strip():
+                continue
+            response = self.handle(line)
+            if response is not None:
+                outfile.write(json.dumps(response) + '\n')
+                outfile.flush()
+
+    def serve_socket(self, path):
+        """
+        Listens for connections on a Unix domain socket and answers the
+        requests of each connection (see `serve`) until interrupted.
+
+        Arguments:
+            path: The path of the socket. An existing socket is replaced.
+
+        """
+        import io
+        import socketserver
+        import stat
+
+        app = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                app.serve(io.TextIOWrapper(self.rfile, encoding='utf-8'),
+                          io.TextIOWrapper(self.wfile, encoding='utf-8'))
+
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.remove(path)
+
+    def extract(self, file, name=None):
+        """
+        Returns an extracted docstring, or all docstrings of a file keyed by
+        name if `name` is `None`.
+        """
+        if name is None:
+            return dict((key, _to_json(value))
+                        for key, value in self._extract_all(file).items())
+        return _to_json(self._extract(file, name))
+
+    def parse(self, file, name, sections=None):
+        """
+        Returns the parsed sections of a docstring.
+        """
+        return self._each(self._extract(file, name),
+                          lambda match: self._parser(match).parse(
+                              sections=sections))
+
+    def render(self, file, name, format='markdown', template=None):
+        """
+        Returns a docstring formatted as `markdown`, `text`, or `json`.
+        """
+        from . import command
+
+        if format not in ('markdown', 'text', 'json'):
+            raise ValueError('Unknown format: `%s`' % format)
+
+        def render(match):
+            parser = self._parser(match)
+            if format == 'text':
+                return command.format_text(match)
+            elif format == 'json':
+                parser.parse()
+                return parser.__json__()
+            return command.format_markdown(
+                match, parser.parse(mark_code_blocks=True),
+                parser.markdown()[0],
+                self.templates.get(template or self.template))
+
+        return self._each(self._extract(file, name), render)
+
+    def stats(self):
+        """
+        Returns the number of files and templates in memory, and the
+        statistics of the memo.
+        """
+        return {'files': len(self.files),
+                'templates': len(self.templates),
+                'memo': {'size': len(self.memo), 'hits': self.memo.hits,
+                         'misses': self.memo.misses,
+                         'evictions': self.memo.evictions}}
+
+    def _load(self, filename):
+        # Returns the extractor and the docstrings of a file. The file is read
+        # again if it has changed since it was last read.
+        from . import extract
+
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            self.files.pop(filename, None)
+            raise
+        state = (stat.st_mtime, stat.st_size)
+        entry = self.files.get(filename)
+        if entry is None or entry[0] != state:
+            entry = (state, extract.get_extractor(filename, self.engine), {})
+            self.files[filename] = entry
+        return entry[1], entry[2]
+
+    def _extract(self, filename, name):
+        extractor, docstrings = self._load(filename)
+        name = '' if name == '.' else name
+        if name not in docstrings:
+            docstrings[name] = extractor.extract(name)
+        return docstrings[name]
+
+    def _extract_all(self, filename):
+        # All docstrings are stored under the key `None`
+        extractor, docstrings = self._load(filename)
+        if None not in docstrings:
+            docstrings[None] = extractor.extract_all()
+        return docstrings[None]
+
+    def _parser(self, match):
+        from . import parse
+        return parse.GoogleDocString(match['docstring'], memo=self.memo)
+
+    def _each(self, match, func):
+        # Applies `func` to a docstring, or to each overload of a function
+        if isinstance(match, list):
+            return [func(overload) for overload in match]
+        return func(match)
+
+
+def _to_json(match):
+    # Converts extracted docstrings into dictionaries that can be serialized
+    if isinstance(match, list):
+        return [dict(overload) for overload in match]
+    return dict(match)
+
+
+def _error(ident, code, message):
+    return {'jsonrpc': '2.0', 'id': ident,
+            'error': {'code': code, 'message': message}}
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import pytest
+from mydocstring import build
+
+def setup_tree(tmpdir):
+    src = tmpdir.join('src')
+    src.join('pkg').ensure(dir=True)
+    src.join('pkg', 'a.py').write('def f(x):\n    """\n    Function f.\n'
+                                  '\n    Args:\n        x: An argument.\n'
+                                  '    """\n')
+    src.join('b.py').write('"""\nModule b.\n"""\n')
+    return str(src), str(tmpdir.join('out'))
+
+def mtimes(out):
+    return dict((name, os.stat(os.path.join(out, name)).st_mtime_ns)
+                for name in ['pkg/a.md', 'pkg/a.json', 'b.md', 'b.json'])
+
+def test_build(tmpdir):
+    src, out = setup_tree(tmpdir)
+    builder = build.Builder(src, out)
+    assert builder.build()['written'] == 4
+    assert open(os.path.join(out, 'pkg', 'a.md')).read().startswith('\n# f')
+    records = json.load(open(os.path.join(out, 'pkg', 'a.json')))
+    assert records[0]['name'] == 'f'
+    assert records[0]['file'] == os.path.join('pkg', 'a.py')
+    manifest = json.load(open(os.path.join(out, build.manifest_name)))
+    assert sorted(manifest['outputs']) == ['b.json', 'b.md', 'pkg/a.json',
+                                           'pkg/a.md']
+    before = mtimes(out)
+
+    counts = build.Builder(src, out).build()
+    assert (counts['written'], counts['skipped']) == (0, 4)
+
+    # Outputs whose contents do not change are not written
+    counts = build.Builder(src, out).build(force=True)
+    assert (counts['written'], counts['unchanged']) == (0, 4)
+    assert mtimes(out) == before
+
+    with open(os.path.join(src, 'b.py'), 'w') as fh:
+        fh.write('"""\nModule b, modified.\n"""\n')
+    counts = build.Builder(src, out).build()
+    assert (counts['written'], counts['skipped']) == (2, 2)
+    after = mtimes(out)
+    assert after['pkg/a.md'] == before['pkg/a.md']
+    assert after['b.md'] != before['b.md']
+
+def test_build_changes(tmpdir):
+    src, out = setup_tree(tmpdir)
+    build.Builder(src, out, formats=['markdown']).build()
+    assert not os.path.exists(os.path.join(out, 'b.json'))
+
+    # A new template renders all Markdown outputs again
+    template = str(tmpdir.join('template.md'))
+    with open(template, 'w') as fh:
+        fh.write('${header["function"]}\n')
+    counts = build.Builder(src, out, formats=['markdown'],
+                           template=template).build()
+    assert counts['written'] == 2
+    assert open(os.path.join(out, 'pkg', 'a.md')).read() == 'f\n\n'
+
+    # Outputs of removed files are removed
+    shutil.rmtree(os.path.join(src, 'pkg'))
+    counts = build.Builder(src, out, formats=['markdown'],
+                           template=template).build()
+    assert (counts['removed'], counts['skipped']) == (1, 1)
+    assert not os.path.exists(os.path.join(out, 'pkg', 'a.md'))
+
+def test_build_failure(tmpdir):
+    src, out = setup_tree(tmpdir)
+    build.Builder(src, out).build()
+
+    # The outputs of a source file that fails to render are removed
+    with open(os.path.join(src, 'b.py'), 'w') as fh:
+        fh.write('"""\nArgs:\nx: y\n"""\n')
+    with pytest.warns(UserWarning):
+        counts = build.Builder(src, out).build()
+    assert (counts['failed'], counts['removed']) == (1, 2)
+    assert not os.path.exists(os.path.join(out, 'b.md'))
+    assert not os.path.exists(os.path.join(out, 'b.json'))
+    assert os.path.exists(os.path.join(out, 'pkg', 'a.md'))
+    with open(os.path.join(out, build.manifest_name)) as fh:
+        assert sorted(json.load(fh)['outputs']) == ['pkg/a.json', 'pkg/a.md']
+
+    # The outputs are built again once the source file is fixed
+    with open(os.path.join(src, 'b.py'), 'w') as fh:
+        fh.write('"""\nModule b.\n"""\n')
+    counts = build.Builder(src, out).build()
+    assert (counts['written'], counts['skipped']) == (2, 2)
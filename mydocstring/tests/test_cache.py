@@ -0,0 +1,65 @@
+import os
+from mydocstring import cache
+from mydocstring import extract
+
+example = 'fixtures/example.py'
+
+def test_get_put(tmpdir):
+    store = cache.Cache(str(tmpdir.join('cache')))
+    key = store.key('txt', 'regex')
+    assert key != store.key('txt', 'ast')
+    assert key != store.key('text', 'regex')
+
+    assert store.get(key) is None
+    store.put(key, {'': {'docstring': 'Module docstring'}})
+    assert store.get(key) == {'': {'docstring': 'Module docstring'}}
+    assert (store.hits, store.misses) == (1, 1)
+    assert '1 hits, 1 misses' in store.report()
+
+def test_evict(tmpdir):
+    store = cache.Cache(str(tmpdir), max_size=250)
+    for i in range(3):
+        key = store.key(str(i), 'regex')
+        store.put(key, 'x' * 100)
+        os.utime(os.path.join(str(tmpdir), key + '.json'), (i, i))
+    assert store.evictions == 1
+    assert store.get(store.key('0', 'regex')) is None
+    assert store.get(store.key('2', 'regex')) == 'x' * 100
+
+def test_extract_file(tmpdir):
+    store = cache.Cache(str(tmpdir))
+    docstrings = extract.extract_file(example, cache=store)
+    assert docstrings == extract.extract_file(example)
+    assert extract.extract_file(example, cache=store) == docstrings
+    assert (store.hits, store.misses) == (1, 1)
+
+    match = extract.extract_many(example, ['ExampleNewClass'], cache=store)
+    assert match['ExampleNewClass'] == docstrings['ExampleNewClass']
+
+def test_extract_tree(tmpdir):
+    source = tmpdir.mkdir('source').join('module.py')
+    source.write('"""\nFirst version.\n"""\n')
+    store = cache.Cache(str(tmpdir.join('cache')))
+    files = dict(extract.extract_tree(str(tmpdir.join('source')), cache=store))
+    assert (store.hits, store.misses) == (0, 1)
+    files = dict(extract.extract_tree(str(tmpdir.join('source')), cache=store))
+    assert (store.hits, store.misses) == (1, 1)
+    assert 'First' in files[str(source)]['']['docstring']
+
+    source.write('"""\nSecond version.\n"""\n')
+    files = dict(extract.extract_tree(str(tmpdir.join('source')), cache=store))
+    assert (store.hits, store.misses) == (1, 2)
+    assert 'Second' in files[str(source)]['']['docstring']
+
+def test_memo():
+    memo = cache.Memo(max_size=2)
+    assert memo.get('a') is None
+    memo.put('a', 1)
+    memo.put('b', 2)
+    assert memo.get('a') == 1
+    memo.put('c', 3)
+    assert memo.get('b') is None
+    assert memo.get('a') == 1
+    assert len(memo) == 2
+    assert (memo.hits, memo.misses, memo.evictions) == (2, 2, 1)
+    assert memo.report() == 'memo: 2 hits, 2 misses, 1 evictions'
@@ -0,0 +1,130 @@
+import gzip
+import io
+import json
+import pytest
+from docopt import docopt
+from mydocstring import command
+from mydocstring import docstring
+
+example = 'fixtures/example.py'
+
+def run(argv, monkeypatch, capsys, stdin=''):
+    monkeypatch.setattr('sys.stdin', io.StringIO(stdin))
+    options = docopt(docstring.__doc__, argv)
+    cmd = command.Command(options)
+    for opt in options:
+        if options[opt]:
+            cmd(opt)
+    cmd.close()
+    return capsys.readouterr().out, cmd
+
+def test_stdin(monkeypatch, capsys):
+    queries = ['%s:function_with_docstring' % example, '',
+               '%s:missing' % example, '%s:.' % example]
+    out, _ = run(['--stdin', '--text'], monkeypatch, capsys,
+                 '\n'.join(queries))
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record['name'] for record in records] == \
+        ['function_with_docstring', 'missing', '.']
+    assert records[0]['sections'][1]['header'] == 'Args'
+    assert records[0]['text'].startswith('function_with_docstring(')
+    assert 'error' in records[1]
+    assert records[2]['type'] == 'module'
+
+def test_parse_argv():
+    commands = [[example, 'f', 'g', '-T=x', '--engine=ast', '-tj'],
+                ['-r=package', '--jobs=2', '-Tx', '--cache-dir=cache'],
+                ['--recursive=package', '-m', '--jsonl=-', '--report=json'],
+                [example, 'f', '--json-file=out.json', '--text-file=out.txt'],
+                [example, 'f', '-m', '--profile=json']]
+    for argv in commands:
+        assert list(docstring.parse_argv(argv).items()) == \
+            list(docopt(docstring.__doc__, argv).items())
+
+    # Use docopt for everything else
+    for argv in [[example], [example, 'f', '--jobs=2'], [example, 'f', '-j',
+                 '-j'], ['-r=package', 'f'], ['--help'], ['serve'],
+                 [example, 'f', '--mark'], [example, 'f', '-e', 'ast'],
+                 ['build', 'src', 'out']]:
+        assert docstring.parse_argv(argv) is None
+
+def test_single_pass(monkeypatch, capsys, tmpdir):
+    names = ['function_with_docstring', 'ExampleOldClass']
+    expected = {}
+    for opt in ['--text', '--markdown', '--json']:
+        expected[opt], _ = run([example] + names + [opt], monkeypatch, capsys)
+
+    markdown = str(tmpdir.join('out.md'))
+    json_file = str(tmpdir.join('out.json'))
+    out, cmd = run([example] + names + ['--text', '--markdown-file=' +
+                                        markdown, '--json-file=' + json_file],
+                   monkeypatch, capsys)
+    assert out == expected['--text']
+    assert open(markdown).read() == expected['--markdown']
+    assert open(json_file).read() == expected['--json']
+    # Each docstring is parsed once
+    assert (cmd.memo.hits, cmd.memo.misses) == (0, 2)
+
+def test_profile(monkeypatch, capsys):
+    cmd = command.Command(docopt(docstring.__doc__,
+                                 [example, 'function_with_docstring', '-m',
+                                  '--profile=json']))
+    cmd('--markdown')
+    cmd.close()
+    stats = json.loads(capsys.readouterr().err)
+    for stage in ['read', 'lookup', 'parse', 'sections', 'code_blocks',
+                  'render']:
+        assert stats[stage]['count'] > 0
+    assert stats['read']['count'] == 1
+    assert stats['render']['p50'] <= stats['render']['p95']
+
+def test_jsonl(monkeypatch, capsys, tmpdir):
+    names = ['function_with_docstring', 'ExampleOldClass']
+    out, _ = run([example] + names + ['--jsonl=-'], monkeypatch, capsys)
+    lines = out.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record['name'] for record in records] == names
+    assert lines == [json.dumps(record, separators=(',', ':'))
+                     for record in records]
+    assert records[0]['sections'][1]['header'] == 'Args'
+
+    filename = str(tmpdir.join('docs.jsonl.gz'))
+    run([example] + names + ['--jsonl=%s' % filename], monkeypatch, capsys)
+    with gzip.open(filename, 'rt') as fh:
+        assert [json.loads(line) for line in fh] == records
+
+def test_report_parse_error(monkeypatch, capsys, tmpdir):
+    # Docstrings that fail to parse are reported, and not output
+    filename = tmpdir.join('a.py')
+    filename.write('def f():\n    """\n    Summary.\n    """\n'
+                   'def g():\n    """\n    Args:\n    x: y\n    """\n')
+    out, _ = run([str(filename), 'f', 'g', '--jsonl=-', '--report=text'],
+                 monkeypatch, capsys)
+    record, report = out.split('\n', 1)
+    assert json.loads(record)['name'] == 'f'
+    assert 'parse-error' in report
+
+def test_jsonl_parse_error(tmpdir):
+    # Docstrings that fail to parse are skipped, and the other docstrings
+    # in the tree are still written
+    pkg = tmpdir.mkdir('pkg')
+    pkg.join('a.py').write('def f():\n    """\n    Summary.\n    """\n')
+    pkg.join('b.py').write('def g():\n    """\n    Args:\n    x: y\n    """\n'
+                           'def h():\n    """\n    Summary.\n    """\n')
+    pkg.join('c.py').write('def k():\n    """\n    Summary.\n    """\n')
+    filename = str(tmpdir.join('docs.jsonl.gz'))
+    options = docopt(docstring.__doc__, ['-r=%s' % pkg,
+                                         '--jsonl=%s' % filename])
+    cmd = command.Command(options)
+    with pytest.warns(UserWarning) as record:
+        for opt in options:
+            if options[opt]:
+                cmd(opt)
+    assert len(record) == 1
+    assert 'b.py:g' in str(record[0].message)
+    writers = list(cmd.writers.values())
+    cmd.close()
+    assert writers and all(writer.closed for writer in writers)
+    with gzip.open(filename, 'rt') as fh:
+        records = [json.loads(line) for line in fh]
+    assert [record['name'] for record in records] == ['f', 'h', 'k']
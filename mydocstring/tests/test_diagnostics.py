@@ -0,0 +1,99 @@
+import json
+import pickle
+import sys
+import warnings
+import pytest
+from mydocstring import diagnostics
+from mydocstring import extract
+from mydocstring import parse
+from mydocstring import cache
+
+docstring = """Summary.
+
+Args:
+    arg1 (str): The first argument.
+    arg3: An argument that is not in the signature.
+"""
+signature = parse.parse_signature('(arg1: int, arg2: int)')
+
+def test_collect():
+    diag = diagnostics.Diagnostics(file='a.py')
+    diag.bind(symbol='f', line=3).add('unknown-arg', 'Unknown `x`.')
+    diag.add('extract-error', 'Failed.')
+    assert len(diag) == 2
+    assert diag.records[0] == {'file': 'a.py', 'symbol': 'f', 'line': 3,
+                               'kind': 'unknown-arg', 'message': 'Unknown `x`.'}
+    assert diag.counts() == {'unknown-arg': 1, 'extract-error': 1}
+    assert diag.text() == 'a.py:3: f: unknown-arg: Unknown `x`.\n' \
+                          'a.py: extract-error: Failed.'
+    assert json.loads(diag.json())['counts'] == diag.counts()
+
+    other = diagnostics.Diagnostics()
+    other.merge(pickle.loads(pickle.dumps(diag.records)))
+    assert other.records == diag.records
+
+    disabled = diagnostics.Diagnostics(enabled=False)
+    disabled.add('unknown-arg', 'Unknown `x`.')
+    disabled.merge(diag)
+    assert len(disabled) == 0
+
+def test_parser_diagnostics():
+    diag = diagnostics.Diagnostics()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        parse.GoogleDocString(docstring, signature, diagnostics=diag).parse()
+    assert [record['kind'] for record in diag] == \
+        ['annotation-mismatch', 'missing-arg-doc', 'unknown-arg']
+
+    # Memoized diagnostics are reported each time a docstring is parsed
+    memo = cache.Memo()
+    diag = diagnostics.Diagnostics()
+    parser = parse.Parser(memo=memo, diagnostics=diag)
+    parser.parse(docstring, signature)
+    parser.parse(docstring, signature, diagnostics=diag.bind(symbol='f'))
+    assert memo.hits == 1
+    assert len(diag) == 6
+    assert diag.records[3]['symbol'] == 'f'
+
+@pytest.mark.skipif(sys.version_info < (3, 8),
+                    reason='The ast engine requires Python 3.8')
+def test_extract_diagnostics(tmpdir):
+    tmpdir.join('good.py').write('def f():\n    """\n    Docstring.\n    """\n')
+    tmpdir.join('bad.py').write('def f(:\n')
+    diag = diagnostics.Diagnostics()
+    files = dict(extract.extract_tree(str(tmpdir), engine='ast',
+                                      diagnostics=diag))
+    assert list(files) == [str(tmpdir.join('good.py'))]
+    assert diag.counts() == {'extract-error': 1}
+    assert diag.records[0]['file'] == str(tmpdir.join('bad.py'))
+
+    match = files[str(tmpdir.join('good.py'))]['f']
+    assert match.lineno() == 2
+    assert pickle.loads(pickle.dumps(match)).lineno() == 2
+
+def test_report_lines(tmpdir, capsys):
+    from docopt import docopt
+    from mydocstring import command
+    from mydocstring import docstring as cli
+    tmpdir.mkdir('pkg').join('mod.py').write('\n\ndef f(arg1: int):\n    """\n'
+                                '    Summary.\n\n    Args:\n'
+                                '        arg2: Unknown.\n    """\n')
+
+    def report(*argv):
+        options = docopt(cli.__doc__, ['-r=%s' % tmpdir.join('pkg'),
+                                       '--report=json'] + list(argv))
+        cmd = command.Command(options)
+        for opt in options:
+            if options[opt]:
+                cmd(opt)
+        cmd.close()
+        records = json.loads(capsys.readouterr().out)['diagnostics']
+        return [record['line'] for record in records]
+
+    cache_dir = '--cache-dir=%s' % tmpdir.join('cache')
+    assert report(cache_dir) == [4, 4]
+    # Docstrings read from the cache
+    assert report(cache_dir) == [4, 4]
+    assert report('--engine=tokenize') == [4, 4]
+    if sys.version_info >= (3, 8):
+        assert report('--engine=ast') == [4, 4]
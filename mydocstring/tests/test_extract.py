@@ -1,9 +1,13 @@
+import sys
 from mydocstring import extract
 import pytest
 
 example = 'fixtures/example.py'
 example_pybind = 'fixtures/example_pybind.py'
 
+requires_ast_engine = pytest.mark.skipif(
+    sys.version_info < (3, 8), reason='The ast engine requires Python 3.8')
+
 def test_get_names():
     extract.get_names('test') == ('', 'test', 'function')
     extract.get_names('Test') == ('Test', '', 'class')
@@ -74,6 +78,57 @@ def test_overloaded_function():
     assert 'Some more' in match[1]['docstring']
     assert 'arg3' in match[1]['docstring']
 
+def test_findall_sections():
+    with open(example) as fh:
+        txt = fh.read()
+    pyextract = extract.PyExtract(txt)
+    pyextract.lookup = lambda: None
+    match = pyextract.extract('overloaded_add')
+    assert pyextract.txt is txt
+    assert len(match) == 2
+    assert match[0] == extract.extract(example, 'overloaded_add')[0]
+    starts = [start for start, _ in pyextract.sections()]
+    assert all(txt[:start].endswith('def ') for start in starts[1:])
+
+def test_doc_record():
+    import pickle
+    with open(example) as fh:
+        txt = fh.read()
+    match = extract.PyExtract(txt).extract('function_with_docstring')
+    assert isinstance(match, extract.DocRecord)
+    # The line number is found by the index
+    assert match.line == txt.count('\n', 0, match.docstring[0]) + 1
+    assert match['lineno'] == match.line
+    # Values are constructed the first time that they are read, and not to
+    # check which keys are present
+    assert match._values is None
+    assert len(match) == len(match.fields)
+    assert 'parsed_signature' in match
+    assert match._values is None
+    assert match['parsed_signature']['args']
+    assert sorted(match._values) == ['parsed_signature', 'signature']
+    assert match.txt is txt
+    assert isinstance(match.docstring, tuple)
+    assert match == dict(match)
+    assert list(match)[:3] == ['class', 'function', 'signature']
+    assert 'parsed_signature' in match
+    assert not hasattr(match, '__dict__')
+    assert match['source'] is match['source']
+    assert type(match.to_dict()) is dict
+    assert match.to_dict() == match
+    copy = pickle.loads(pickle.dumps(match))
+    assert copy == match
+    assert copy.txt == ''
+
+def test_doc_record_unparsed_signature():
+    record = extract.DocRecord('', '', 'f', 'not a signature', '', 0,
+                               'Docstring.', '')
+    assert 'parsed_signature' in record
+    assert record['parsed_signature'] is None
+    record = extract.DocRecord('', '', '', '', '', 0, 'Docstring.', '')
+    assert 'parsed_signature' not in record
+    assert record.get('parsed_signature') is None
+
 def test_multiline_signature():
     example = 'fixtures/example.py'
     match = extract.extract(example, 'multiline')
@@ -206,3 +261,197 @@ def test_pybind_method():
     # Class name can be omitted, but then type is 'function' instead of 'method'
     match = pybind.extract('operation')
     assert match['type'] == 'function'
+
+def test_module_index():
+    index = extract.ModuleIndex(open(example).read())
+    assert index.lookup('')
+    assert index.lookup('ExampleOldClass')
+    assert len(index.lookup('overloaded_add')) == 2
+    assert not index.lookup('something')
+    assert not index.lookup('something.a.a')
+
+    # Module functions are not confused with methods of the same name
+    entries = index.lookup('__init__')
+    assert len(entries) == 1
+    assert index.get(entries[0], 'signature') == '(arg1)'
+
+    match = extract.extract(example, 'ExampleOldClass.method_with_docstring')
+    assert match['source'] == \
+            'def method_with_docstring(self, arg1, arg2):\n    pass\n\n'
+
+def test_module_index_strings():
+    txt = '\n'.join([
+        'import os',
+        '',
+        'TEMPLATE = """',
+        'def not_a_function():',
+        '    """',
+        '',
+        '@decorator',
+        'async def function(arg1=")", arg2=(1,',
+        '                   2)) -> int:',
+        "    '''Single-quoted docstring.'''",
+        '    def nested():',
+        '        """Nested functions are not indexed."""',
+        '    return 1',
+        ''])
+    pyextract = extract.PyExtract(txt)
+    match = pyextract.extract('function')
+    assert match['signature'] == '(arg1=")", arg2=(1, 2)) -> int'
+    assert match['return_annotation'] == 'int'
+    assert 'Single-quoted' in match['docstring']
+    assert not pyextract.index.lookup('not_a_function')
+    assert not pyextract.index.lookup('nested')
+
+def test_module_index_undocumented(monkeypatch):
+    # Classes and functions without docstrings are not searched for again
+    txt = 'def f():\n    pass\nclass A:\n    def g(self):\n        pass\n'
+    def search(self):
+        raise AssertionError('The source code is searched')
+    monkeypatch.setattr(extract.PyExtract, 'extract_function', search)
+    monkeypatch.setattr(extract.PyExtract, 'extract_method', search)
+    pyextract = extract.PyExtract(txt)
+    for query in ['f', 'A', 'A.g']:
+        with pytest.raises(NameError):
+            pyextract.extract(query)
+    assert pyextract.index.undocumented == {('', 'f', 'function'),
+                                            ('A', '', 'class'),
+                                            ('A', 'g', 'method')}
+
+@requires_ast_engine
+def test_ast_engine():
+    for query in ['.', 'function_with_docstring', 'ExampleNewClass',
+                  'ExampleOldClass.__init__', 'overloaded_add']:
+        query = '' if query == '.' else query
+        assert extract.extract(example, query, engine='ast') == \
+               extract.extract(example, query)
+
+    with pytest.raises(NameError):
+        extract.extract(example, 'something', engine='ast')
+    with pytest.raises(NotImplementedError):
+        extract.extract(example, 'function_with_docstring', engine='unknown')
+
+@requires_ast_engine
+def test_ast_engine_nested():
+    txt = '\n'.join([
+        'class Outer(Base, Mixin):',
+        "    '''Outer class.'''",
+        '',
+        '    class Inner:',
+        '        """Nested class."""',
+        '',
+        '        @property',
+        '        def value(self):',
+        '            """Decorated method."""',
+        '            return 1',
+        ''])
+    astextract = extract.AstExtract(txt)
+    match = astextract.extract('Outer')
+    assert match['signature'] == '(Base, Mixin)'
+    assert 'Outer class.' in match['docstring']
+    assert 'Nested class.' in astextract.extract('Inner')['docstring']
+    match = astextract.extract('Inner.value')
+    assert match['type'] == 'method'
+    assert match['source'] == 'def value(self):\n    return 1\n'
+
+def test_ast_engine_version(monkeypatch):
+    monkeypatch.setattr('sys.version_info', (3, 7, 0))
+    with pytest.raises(NotImplementedError) as err:
+        extract.get_extractor(example, 'ast')
+    assert 'Python 3.8' in str(err.value)
+
+def test_tokenize_engine():
+    for query in ['.', 'function_with_docstring', 'ExampleNewClass',
+                  'ExampleOldClass.__init__', 'overloaded_add']:
+        query = '' if query == '.' else query
+        assert extract.extract(example, query, engine='tokenize') == \
+               extract.extract(example, query)
+
+    with pytest.raises(NameError):
+        extract.extract(example, 'something', engine='tokenize')
+
+def test_tokenize_from_file(monkeypatch):
+    txt = open(example).read()
+    with open(example) as fh:
+        streamed = extract.TokenizeExtract.from_file(fh)
+    assert streamed.txt == ''
+    assert streamed.extract_all() == extract.TokenizeExtract(txt).extract_all()
+    assert streamed.extract_all() == extract.PyExtract(txt).extract_all()
+    match = extract.extract(example, 'ExampleOldClass.__init__',
+                            engine='tokenize')
+    assert match['source'].startswith('def __init__(self')
+
+    # Lines are discarded at the end of each block at the module level
+    sizes = []
+    readline = extract._LineBuffer.readline
+
+    def record(self):
+        sizes.append(len(self.lines))
+        return readline(self)
+
+    monkeypatch.setattr(extract._LineBuffer, 'readline', record)
+    block = 'def f%d(a):\n    """Docstring."""\n    return a\n\n'
+    import io
+    streamed = extract.TokenizeExtract.from_file(io.StringIO(
+        ''.join(block % i for i in range(100))))
+    assert len(streamed.names()) == 100
+    assert max(sizes) < 10
+
+def test_scan_docstrings():
+    with open(example) as fh:
+        entries = list(extract.scan_docstrings(fh))
+    names = [(entry['class'], entry['function'], entry['type'])
+             for entry in entries]
+    assert ('', '', 'module') in names
+    assert ('ExampleOldClass', '__init__', 'method') in names
+    assert ('', 'function_with_docstring', 'function') in names
+
+    import io
+    entries = list(extract.scan_docstrings(io.StringIO(
+        'def target(a, b=(1, 2)) -> int:\n'
+        '    x = """not a docstring"""\n'
+        'class Target:\n'
+        '    def method(self, a="):"):\n'
+        '        r"""Method."""\n')))
+    assert len(entries) == 1
+    assert entries[0]['function'] == 'method'
+    assert entries[0]['signature'] == '(self, a="):")'
+    assert entries[0]['docstring'] == 'Method.'
+
+    with pytest.raises(SyntaxError):
+        list(extract.scan_docstrings(io.StringIO('def f():\n    """Open')))
+
+def test_extract_many():
+    queries = ['function_with_docstring', 'ExampleNewClass',
+               'ExampleOldClass.__init__', 'function_with_docstring']
+    matches = extract.extract_many(example, queries)
+    assert len(matches) == 3
+    for query in queries:
+        assert matches[query] == extract.extract(example, query)
+
+    with pytest.raises(NameError):
+        extract.extract_many(example, ['ExampleNewClass', 'something'])
+    with pytest.raises(NotImplementedError):
+        extract.extract_many('fixtures/example.txt', ['something'])
+
+def test_extract_all():
+    txt = open(example).read()
+    extractors = [extract.PyExtract(txt)]
+    if sys.version_info >= (3, 8):
+        extractors.append(extract.AstExtract(txt))
+    for extractor in extractors:
+        matches = extractor.extract_all()
+        assert '' in matches
+        assert matches['ExampleOldClass']['type'] == 'class'
+        assert matches['ExampleOldClass.__init__']['type'] == 'method'
+        assert len(matches['overloaded_add']) == 2
+    assert extract.PyBindExtract(open(example_pybind).read()).extract_all() \
+            == {}
+
+def test_extract_tree():
+    files = dict(extract.extract_tree('fixtures'))
+    assert sorted(files) == [example, example_pybind]
+    assert files[example] == extract.PyExtract(open(example).read()) \
+                                    .extract_all()
+
+    assert dict(extract.extract_tree('fixtures', jobs=2)) == files
@@ -163,9 +163,13 @@ def test_summary():
 def test_json():
     from json import loads
     google = setup_google()
-    google.parse()
+    data = google.parse()
     d = loads(google.__json__())
-    assert d == google.data
+    assert d == data + [google.header]
+    assert google.data == data
+    assert google.__json__() == google.__json__()
+    assert loads(google.__json__(compact=True)) == d
+    assert '\n' not in google.__json__(compact=True)
 
 def test_parse_args():
     signature = '(arg0, arg1)'
@@ -200,6 +204,49 @@ def test_parse_cpp_pep484():
     args = parse.parse_signature(signature)
     assert 'example' in args['args']
 
+def test_parse_signature():
+    signature = '(a, *args, b=", (", c: Dict[str, List[int]] = {}, ' \
+                '**kwargs) -> List[List[int]]'
+    args = parse.parse_signature(signature)
+    assert args['args'] == {'a': '', '*args': '', 'b': '=", ("',
+                            'c': 'Dict[str, List[int]] = {}', '**kwargs': ''}
+    assert args['return_annotation'] == 'List[List[int]]'
+
+    args = parse.parse_signature('(a, /, b, *, c=(1, 2), d=lambda x: x,)')
+    assert list(args['args']) == ['a', '/', 'b', '*', 'c', 'd']
+    assert args['args']['c'] == '=(1, 2)'
+    assert args['args']['d'] == '=lambda x: x'
+    assert parse.parse_signature('()') == {'args': {}, 'return_annotation': ''}
+
+    # `<` and `>` are comparison and shift operators outside of templates
+    assert parse.parse_signature('(a, b=1<2)')['args'] == {'a': '',
+                                                           'b': '=1<2'}
+    assert parse.parse_signature('(a: int = x<y, b: int)')['args'] == \
+        {'a': 'int = x<y', 'b': 'int'}
+    assert parse.parse_signature('(a=1<<2, b=x>>1, c=x<=y, d=x>y)') \
+        ['args'] == {'a': '=1<<2', 'b': '=x>>1', 'c': '=x<=y', 'd': '=x>y'}
+    args = parse.parse_signature('(a: std::vector<std::pair<int, int>>, '
+                                 'b: std::map<int, float> = {})')
+    assert args['args'] == {'a': 'std::vector<std::pair<int, int>>',
+                            'b': 'std::map<int, float> = {}'}
+
+    with pytest.raises(ValueError):
+        parse.parse_signature('no signature')
+    with pytest.raises(ValueError):
+        parse.parse_signature('(a, (b)')
+
+    # Results are cached, but each call returns a new dictionary
+    args['args']['a'] = 'modified'
+    assert parse.parse_signature('(a, /, b, *, c=(1, 2), d=lambda x: x,)') \
+           ['args']['a'] == ''
+
+def test_parse_signatures():
+    signatures = ['(a: int) -> int', 'no signature', '(a: int) -> int']
+    args = parse.parse_signatures(signatures)
+    assert args[0] == args[2] == parse.parse_signature(signatures[0])
+    assert args[0] is not args[2]
+    assert args[1] is None
+
 def test_parse_code():
     code = """
            Code block 1.
@@ -254,3 +301,134 @@ def test_get_config():
     with pytest.warns(UserWarning) : parse.get_config(default, {'unknown' : 0})
 
 
+
+def test_compiled_regex_cache():
+    docstring = 'Args:\n    arg1: Description.\n'
+    first = parse.GoogleDocString(docstring)
+    second = parse.GoogleDocString('Other docstring.')
+    assert first._re is second._re
+
+    extra = parse.GoogleDocString(docstring, config={'extra_headers': 'Usage'})
+    assert extra._re is not first._re
+    assert extra._re['header'].match('Usage:')
+    assert not first._re['header'].match('Usage:')
+    assert first.parse()[0]['args'][0]['field'] == 'arg1'
+
+def test_classify():
+    google = parse.GoogleDocString('')
+    lines = ['Args:', '    arg1 (int): Description.', '', '',
+             '        Continued.', 'Text']
+    table = google._classify(lines, args=True)
+    assert table['indent'][:6] == [0, 4, 0, 0, 8, 0]
+    assert table['header'][0] == 'Args'
+    assert table['arg'][1] == ('arg1', '(int)', 'Description.')
+    assert table['next'][1] == 4
+    assert table['next'][5] == len(lines)
+
+    docstring = '\n'.join(['Args:', '    arg1: Description.'] + [''] * 1000 +
+                          ['        Continued.', '    arg2: Description.'])
+    args = parse.GoogleDocString(docstring).parse()[0]['args']
+    assert [arg['field'] for arg in args] == ['arg1', 'arg2']
+    assert args[0]['description'].endswith('Continued.')
+
+def test_classify_skips_lines_without_delimiter():
+    searched = []
+
+    class Recorder(object):
+        def __init__(self, regex):
+            self.regex = regex
+
+        def search(self, line):
+            searched.append(line)
+            return self.regex.search(line)
+
+    google = parse.GoogleDocString('')
+    google._re = dict(google._re, arg=Recorder(google._re['arg']))
+    lines = ['Args:', '    arg1 (int): Description.', '        Continued.']
+    table = google._classify(lines, args=True)
+    assert table['arg'][1] == ('arg1', '(int)', 'Description.')
+    assert searched == ['    arg1 (int): Description.']
+
+    # A delimiter that is a regex cannot be used to skip lines
+    searched[:] = []
+    google = parse.GoogleDocString('', config={'arg_delimiter': ':+ '})
+    google._re = dict(google._re, arg=Recorder(google._re['arg']))
+    google._classify(lines, args=True)
+    assert sorted(searched) == sorted(lines)
+
+def test_parse_twice():
+    google = parse.GoogleDocString('\n'.join(get_docstring1()))
+    first = google.parse()
+    assert google.parse() == first
+    assert len(google._parsing['sections']) == 4
+
+def test_parser():
+    txt = '\n'.join(get_docstring1())
+    signature = parse.parse_signature('(arg1: int, arg2: int) -> bool')
+    parser = parse.Parser()
+    assert parser.parse(txt) == parse.GoogleDocString(txt).parse()
+    with pytest.warns(UserWarning):
+        assert parser.parse(txt, signature) == \
+               parse.GoogleDocString(txt, signature).parse()
+
+    docstrings = [txt, ('Summary.', signature)]
+    results = parser.parse_many(iter(docstrings))
+    assert not isinstance(results, list)
+    assert list(results) == [parser.parse(txt),
+                             parser.parse('Summary.', signature)]
+
+    with pytest.raises(NotImplementedError):
+        parse.Parser('Numpy')
+
+def test_parser_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    parser = parse.Parser(mark_code_blocks=True)
+    docstrings = ['Summary %d.\n\nArgs:\n    arg%d: Description.\n' % (i, i)
+                  for i in range(200)]
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(parser.parse, docstrings))
+    for i, data in enumerate(results):
+        assert data[1]['args'][0]['field'] == 'arg%d' % i
+
+def test_memo():
+    from mydocstring import cache
+    memo = cache.Memo()
+    txt = '\n'.join(get_docstring1())
+    expected = parse.GoogleDocString(txt).parse()
+
+    google = parse.GoogleDocString(txt, memo=memo)
+    data = google.parse()
+    data[1]['args'][0]['field'] = 'modified'
+    google.__json__()
+    assert parse.GoogleDocString(txt, memo=memo).parse() == expected
+    assert (memo.hits, memo.misses) == (1, 1)
+
+    parse.GoogleDocString(txt, memo=memo, config={'indent': 2}).parse()
+    parse.Parser(memo=memo, mark_code_blocks=True).parse(txt)
+    assert parse.Parser(memo=memo).parse(txt) == expected
+    assert (memo.hits, memo.misses) == (2, 3)
+
+def test_select_sections():
+    txt = '\n'.join(get_docstring1()).replace('Args:', 'Arguments:')
+    data = parse.GoogleDocString(txt).parse()
+    google = parse.GoogleDocString(txt)
+    assert google.parse(sections=['Args', 'Returns']) == data[1:3]
+    assert google.parse(sections=['']) == [data[0], data[3]]
+    assert google.parse(sections=[]) == []
+    assert parse.Parser().parse(txt, sections=['Returns']) == [data[2]]
+
+def test_lazy_sections():
+    txt = '\n'.join(get_docstring1())
+    data = parse.GoogleDocString(txt).parse()
+    google = parse.GoogleDocString(txt)
+    sections = google.sections
+    assert list(sections) == ['', 'Args', 'Returns']
+    assert not sections._parsed
+    assert sections['Arguments'] == data[1]
+    assert list(sections._parsed) == ['Args']
+    assert sections['Args'] is sections['Arguments']
+    assert 'Returns' in sections
+    assert 'Raises' not in sections
+    with pytest.raises(KeyError):
+        sections['Raises']
+    assert parse.Parser().sections(txt)[''] == data[0]
@@ -0,0 +1,49 @@
+import os
+import time
+from mako.template import Template
+from mydocstring import diagnostics
+from mydocstring import extract
+from mydocstring import parse
+from mydocstring import render
+
+example = 'fixtures/example.py'
+
+def render_all(template):
+    out = []
+    for name, matches in sorted(extract.extract_file(example).items()):
+        for match in matches if isinstance(matches, list) else [matches]:
+            parser = parse.GoogleDocString(
+                match['docstring'], diagnostics=diagnostics.Diagnostics())
+            parser.parse(mark_code_blocks=True)
+            out.append(template.render(header=match, sections=parser.data,
+                                       headers=[], h1='#', h2='##', h3='###'))
+    return out
+
+def test_markdown():
+    expected = render_all(Template(filename=render.default_template))
+    assert render_all(render.Markdown()) == expected
+    assert render_all(render.TemplateCache().get()) == expected
+
+def test_template_cache(tmpdir):
+    filename = str(tmpdir.join('template.md'))
+    with open(filename, 'w') as fh:
+        fh.write('${h1} ${header["function"]}\n')
+    templates = render.TemplateCache(str(tmpdir.join('modules')))
+    template = templates.get(filename)
+    assert templates.get(filename) is template
+    assert len(templates) == 1
+    assert template.render(header={'function': 'f'}, h1='#') == '# f\n'
+    assert os.listdir(str(tmpdir.join('modules')))
+
+    with open(filename, 'w') as fh:
+        fh.write('${h1}${h1} ${header["function"]}\n')
+    # Compiled modules are only reused if they are newer than the template
+    now = time.time() + 10
+    os.utime(filename, (now, now))
+    assert templates.get(filename) is not template
+    assert templates.get(filename).render(header={'function': 'f'},
+                                          h1='#') == '## f\n'
+
+    assert isinstance(templates.get(render.default_template), render.Markdown)
+    mako = render.TemplateCache(builtin=False).get()
+    assert isinstance(mako, Template)
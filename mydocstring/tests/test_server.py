@@ -0,0 +1,78 @@
+import io
+import json
+import os
+from mydocstring import extract
+from mydocstring import server
+
+example = 'fixtures/example.py'
+
+def request(method, ident=1, **params):
+    return {'jsonrpc': '2.0', 'id': ident, 'method': method,
+            'params': params}
+
+def test_handle():
+    app = server.Server()
+    match = extract.extract(example, 'function_with_docstring')
+    response = app.handle(request('extract', file=example,
+                                  name='function_with_docstring'))
+    assert response['result'] == dict(match)
+    assert app.handle(request('extract', file=example))['result'][''] == \
+        app.handle(request('extract', file=example, name='.'))['result']
+
+    parsed = app.handle(request('parse', file=example,
+                                name='function_with_docstring'))['result']
+    assert parsed[1]['header'] == 'Args'
+    app.handle(request('parse', file=example, name='function_with_docstring'))
+    assert app.memo.hits == 1
+
+    for fmt in ['markdown', 'text', 'json']:
+        response = app.handle(request('render', file=example, name='.',
+                                      format=fmt))
+        assert 'Module docstring' in response['result']
+    # The default template does not need to be compiled
+    assert app.stats()['templates'] == 0
+
+def test_errors():
+    app = server.Server()
+    assert app.handle('{')['error']['code'] == server.PARSE_ERROR
+    assert app.handle('[]')['error']['code'] == server.INVALID_REQUEST
+    response = app.handle(request('unknown', ident=7))
+    assert response['id'] == 7
+    assert response['error']['code'] == server.METHOD_NOT_FOUND
+    response = app.handle(request('parse', file=example))
+    assert response['error']['code'] == server.INVALID_PARAMS
+    response = app.handle(request('parse', file=example, name='missing'))
+    assert response['error']['code'] == server.SERVER_ERROR
+
+    notification = request('stats')
+    del notification['id']
+    assert app.handle(notification) is None
+
+    # A `TypeError` raised by the method itself is not a parameter error
+    def stats():
+        raise TypeError('Internal error')
+    app.methods['stats'] = stats
+    response = app.handle(request('stats'))
+    assert response['error']['code'] == server.SERVER_ERROR
+    response = app.handle(request('stats', unknown=1))
+    assert response['error']['code'] == server.INVALID_PARAMS
+
+def test_invalidate(tmpdir):
+    filename = str(tmpdir.join('module.py'))
+    with open(filename, 'w') as fh:
+        fh.write('"""\nOld docstring\n"""\n')
+    app = server.Server()
+    assert 'Old' in app.render(filename, '.', format='text')
+    with open(filename, 'w') as fh:
+        fh.write('"""\nNew docstring.\n"""\n')
+    os.utime(filename, (0, 0))
+    assert 'New' in app.render(filename, '.', format='text')
+
+def test_serve():
+    app = server.Server()
+    infile = io.StringIO('\n'.join([json.dumps(request('stats', ident=1)), '',
+                                    json.dumps(request('stats', ident=2))]))
+    outfile = io.StringIO()
+    app.serve(infile, outfile)
+    lines = outfile.getvalue().splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, 2]
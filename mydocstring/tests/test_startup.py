@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+example = 'fixtures/example.py'
+root = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+# Maximum time in milliseconds spent importing modules after the interpreter
+# has started
+budget = float(os.environ.get('MYDOCSTRING_STARTUP_BUDGET', 50))
+
+def importtime(*args):
+    """
+    Runs the command line interface and returns the modules imported after
+    `site`, and the total time spent importing them in milliseconds.
+    """
+    code = ('import sys; sys.argv = %r\n'
+            'from mydocstring import docstring; docstring.main()' %
+            (['mydocstring'] + list(args)))
+    env = dict(os.environ, PYTHONPATH=root)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          env=env, universal_newlines=True, check=True)
+    modules = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name == 'site':
+            modules = []
+            total = 0
+            continue
+        modules.append(name)
+        total += int(self_time)
+    return modules, 1e-3 * total
+
+def check(*args):
+    # The first run compiles the modules
+    importtime(*args)
+    modules, elapsed = min((importtime(*args) for _ in range(3)),
+                           key=lambda run: run[1])
+    assert not [module for module in modules
+                if module == 'docopt' or module.split('.')[0] == 'mako']
+    assert elapsed < budget, 'Startup took %.1f ms (budget %.1f ms)' % (
+        elapsed, budget)
+
+def test_startup_json():
+    check(example, 'function_with_docstring', '--json')
+
+def test_startup_text():
+    check(example, 'function_with_docstring', '--text')
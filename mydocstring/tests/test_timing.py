@@ -0,0 +1,47 @@
+import json
+from mydocstring import parse
+from mydocstring import timing
+
+
+def test_timed():
+    calls = []
+
+    @timing.timed('stage')
+    def func(a, b=1):
+        return a + b
+
+    assert func(1) == 2
+    hook = lambda stage, seconds: calls.append((stage, seconds))
+    timing.add_hook(hook)
+    try:
+        assert func(1, b=2) == 3
+    finally:
+        timing.remove_hook(hook)
+    assert func(2) == 3
+    assert len(calls) == 1
+    assert calls[0][0] == 'stage'
+    assert calls[0][1] >= 0
+
+
+def test_profile():
+    with timing.Profile() as profile:
+        parse.GoogleDocString('Summary.\n\nArgs:\n    a: A.\n\n'
+                              'Returns:\n    B.\n').parse()
+    assert not timing.hooks
+    stats = profile.stats()
+    assert stats['parse']['count'] == 1
+    assert stats['split']['count'] == 1
+    assert stats['sections']['count'] == 3
+    assert json.loads(profile.json()) == stats
+    table = profile.table().splitlines()
+    assert table[0].split()[:2] == ['stage', 'count']
+    assert table[1].split()[0] == 'parse'
+    assert len(table) == 4
+
+
+def test_percentile():
+    times = list(range(1, 101))
+    assert timing.percentile(times, 50) == 50
+    assert timing.percentile(times, 95) == 95
+    assert timing.percentile([3], 95) == 3
+    assert timing.percentile([], 50) == 0
@@ -0,0 +1,67 @@
+import os
+import pytest
+from mydocstring import parse
+from mydocstring import watch
+
+def source(docstring):
+    return '\n'.join(['def first():',
+                      '    """First function."""',
+                      '',
+                      'def second():',
+                      '    """%s"""' % docstring,
+                      ''])
+
+def test_poll(tmpdir):
+    module = tmpdir.join('module.py')
+    module.write(source('Second function.'))
+    rendered = []
+
+    def render(filename, name, docstring):
+        rendered.append(name)
+        return docstring['docstring'].strip()
+
+    watcher = watch.Watcher(str(tmpdir), render)
+    changes = watcher.poll()
+    assert [name for _, name, _ in changes] == ['first', 'second']
+    assert watcher.poll() == []
+
+    # Only the modified docstring is rendered again
+    module.write(source('Modified function.'))
+    os.utime(str(module), (0, 0))
+    assert watcher.poll() == [(str(module), 'second', 'Modified function.')]
+    assert rendered == ['first', 'second', 'second']
+    assert watcher.outputs[str(module)]['first'] == 'First function.'
+
+    # Docstrings that are only moved are not rendered again
+    module.write('\n' + source('Modified function.'))
+    os.utime(str(module), (1, 1))
+    assert watcher.poll() == []
+    assert len(rendered) == 3
+
+    module.remove()
+    changes = watcher.poll()
+    assert changes == [(str(module), 'first', None),
+                       (str(module), 'second', None)]
+    assert not watcher.docstrings
+
+def test_poll_render_error(tmpdir):
+    module = tmpdir.join('module.py')
+    module.write(source('Second function.'))
+
+    def render(filename, name, docstring):
+        parse.GoogleDocString(docstring['docstring']).parse()
+        return docstring['docstring'].strip()
+
+    watcher = watch.Watcher(str(tmpdir), render)
+    assert len(watcher.poll()) == 2
+
+    # The previous output is kept while the docstring cannot be rendered
+    module.write(source('Broken.\n\n    Args:\n    x: y\n    '))
+    os.utime(str(module), (0, 0))
+    with pytest.warns(UserWarning, match='Missing indent'):
+        assert watcher.poll() == []
+    assert watcher.outputs[str(module)]['second'] == 'Second function.'
+
+    module.write(source('Fixed function.'))
+    os.utime(str(module), (1, 1))
+    assert watcher.poll() == [(str(module), 'second', 'Fixed function.')]
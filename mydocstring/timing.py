@@ -0,0 +1,179 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module times the stages of extracting, parsing, and rendering docstrings.
+Functions that implement a stage are decorated with `timed`. Each time such a
+function returns, the hooks that have been added using `add_hook` are called
+with the name of the stage and the time spent in it. When no hooks have been
+added, the overhead of a stage is a single check.
+
+The stages are:
+  * `read` : Reading a source file.
+  * `lookup` : Looking up a docstring in an index of the source code
+    (including building the index).
+  * `extract_function`, `extract_class`, `extract_method`, `extract_module` :
+    Searching for a docstring using regular expressions (`PyExtract`).
+  * `signature` : Parsing a signature.
+  * `parse` : Parsing a docstring, including all stages below.
+  * `split` : Splitting a docstring into sections.
+  * `sections` : Parsing a section.
+  * `code_blocks` : Marking the code blocks of a section.
+  * `render` : Rendering a docstring using a template.
+
+Stages can be nested, so the time of a stage includes the time of the stages
+that it calls. Stages that run in other processes (e.g., when extracting a
+directory tree using several jobs) are not timed.
+"""
+import functools
+import time
+
+# The functions called as `hook(stage, seconds)` when a stage returns
+hooks = []
+
+clock = time.perf_counter
+
+
+def add_hook(hook):
+    """
+    Adds a function that is called as `hook(stage, seconds)` each time a stage
+    returns.
+    """
+    hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Removes a function added using `add_hook`.
+    """
+    hooks.remove(hook)
+
+
+def timed(stage):
+    """
+    Returns a decorator that times each call to a function as a stage.
+
+    Arguments:
+        stage: The name of the stage.
+
+    """
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not hooks:
+                return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                for hook in list(hooks):
+                    hook(stage, elapsed)
+
+        return wrapper
+
+    return decorator
+
+
+class Profile(object):
+    """
+    A hook that collects the times of all stages. Use as a context manager to
+    add and remove the hook:
+
+        ```python
+        with timing.Profile() as profile:
+            ...
+        print(profile.table())
+        ```
+
+    Attributes:
+        times : A dictionary that maps each stage to the list of times (in
+            seconds) spent in it.
+
+    """
+
+    def __init__(self):
+        self.times = {}
+
+    def __call__(self, stage, seconds):
+        times = self.times.get(stage)
+        if times is None:
+            times = self.times[stage] = []
+        times.append(seconds)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *args):
+        remove_hook(self)
+
+    def stats(self):
+        """
+        Returns a dictionary that maps each stage to its number of calls
+        (`count`), and the `total`, median (`p50`), and 95th percentile
+        (`p95`) of its times in seconds.
+        """
+        out = {}
+        for stage, times in self.times.items():
+            times = sorted(times)
+            out[stage] = {'count': len(times),
+                          'total': sum(times),
+                          'p50': percentile(times, 50),
+                          'p95': percentile(times, 95)}
+        return out
+
+    def table(self):
+        """
+        Returns the statistics as a table sorted by total time, with times in
+        milliseconds.
+        """
+        stats = self.stats()
+        lines = ['%-18s %9s %11s %10s %10s' % ('stage', 'count', 'total (ms)',
+                                               'p50 (ms)', 'p95 (ms)')]
+        for stage in sorted(stats, key=lambda stage: -stats[stage]['total']):
+            row = stats[stage]
+            lines.append('%-18s %9d %11.3f %10.4f %10.4f' % (
+                stage, row['count'], 1e3 * row['total'], 1e3 * row['p50'],
+                1e3 * row['p95']))
+        return '\n'.join(lines)
+
+    def json(self):
+        """
+        Returns the statistics as JSON data, with times in seconds.
+        """
+        import json
+        return json.dumps(self.stats(), sort_keys=True, indent=4,
+                          separators=(',', ': '))
+
+
+def percentile(times, percent):
+    """
+    Returns a percentile of a sorted list of times (using the nearest-rank
+    method), or `0` if the list is empty.
+    """
+    if not times:
+        return 0
+    rank = -(-percent * len(times) // 100)
+    return times[max(rank, 1) - 1]
@@ -0,0 +1,181 @@
+"""
+MIT License
+
+Copyright (c) 2018 Ossian O'Reilly
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""
+This module watches a directory tree for changes to Python source files. The
+extracted docstrings and their rendered output are kept in memory, and only the
+docstrings that are affected by a change are extracted and rendered again.
+"""
+import os
+import time
+import warnings
+
+
+class Watcher(object):
+    """
+    Keeps the docstrings of all Python source files in a directory tree, and
+    their rendered output, up to date.
+
+    Files are polled for changes by comparing their modification times and
+    sizes. Only files that have changed are extracted again, and only the
+    docstrings that have been added or modified are rendered again.
+
+    Attributes:
+        root : The directory tree that is watched.
+        render : A function `render(filename, name, docstring)` that returns
+            the rendered output of a docstring.
+        engine : The extraction engine (see `extract.extract`).
+        files : A dictionary that maps each file to its modification time and
+            size.
+        docstrings : A dictionary that maps each file to its docstrings keyed
+            by query.
+        outputs : A dictionary that maps each file to the rendered output of
+            its docstrings keyed by query.
+
+    """
+
+    def __init__(self, root, render, engine='regex'):
+        """
+        Initializer for Watcher. The directory tree is not read until the first
+        call to `poll`.
+        """
+        self.root = root
+        self.render = render
+        self.engine = engine
+        self.files = {}
+        self.docstrings = {}
+        self.outputs = {}
+
+    def poll(self):
+        """
+        Checks all files for changes and updates the docstrings of the files
+        that have changed.
+
+        Returns:
+            list: A list of tuples `(filename, name, output)` for each
+                docstring that has been added, modified, or removed. For
+                removed docstrings, `output` is `None`.
+
+        """
+        from . import extract
+
+        changes = []
+        found = set()
+        for filename in extract.find_files(self.root):
+            found.add(filename)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            state = (stat.st_mtime, stat.st_size)
+            if self.files.get(filename) == state:
+                continue
+            self.files[filename] = state
+            try:
+                docstrings = extract.extract_file(filename, self.engine)
+            except (IOError, SyntaxError, UnicodeDecodeError,
+                    ValueError) as err:
+                warnings.warn('Unable to extract docstrings from `%s`: %s' %
+                              (filename, err))
+                continue
+            changes += self.update(filename, docstrings)
+
+        for filename in sorted(self.files):
+            if filename not in found:
+                del self.files[filename]
+                changes += self.update(filename, {})
+        return changes
+
+    def update(self, filename, docstrings):
+        """
+        Replaces the docstrings of a file and renders the docstrings that have
+        changed. Docstrings that are only moved within the file are not
+        rendered again. If a docstring cannot be rendered, a warning is issued
+        and its previous output is kept.
+
+        Arguments:
+            filename: The file that the docstrings were extracted from.
+            docstrings: The docstrings keyed by query. Pass an empty
+                dictionary to remove the file.
+
+        Returns:
+            list: The changes (see `poll`).
+
+        """
+        old = self.docstrings.get(filename, {})
+        outputs = self.outputs.get(filename, {})
+        changes = []
+        for name in sorted(docstrings):
+            if name in old and \
+               _content(old[name]) == _content(docstrings[name]):
+                continue
+            try:
+                outputs[name] = self.render(filename, name, docstrings[name])
+            except (SyntaxError, ValueError) as err:
+                warnings.warn('Unable to render `%s:%s`: %s' %
+                              (filename, name or '.', err))
+                continue
+            changes.append((filename, name, outputs[name]))
+        for name in sorted(old):
+            if name not in docstrings and name in outputs:
+                del outputs[name]
+                changes.append((filename, name, None))
+
+        if docstrings:
+            self.docstrings[filename] = docstrings
+            self.outputs[filename] = outputs
+        else:
+            self.docstrings.pop(filename, None)
+            self.outputs.pop(filename, None)
+        return changes
+
+    def run(self, interval=1.0, callback=None, polls=None):
+        """
+        Polls for changes until interrupted.
+
+        Arguments:
+            interval(optional): The number of seconds to wait between polls.
+                Defaults to `1.0`.
+            callback(optional): A function that is called with the list of
+                changes after each poll that found changes.
+            polls(optional): Stop after this many polls. Defaults to `None`,
+                which polls forever.
+
+        """
+        count = 0
+        while polls is None or count < polls:
+            changes = self.poll()
+            if changes and callback:
+                callback(changes)
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(interval)
+
+
+def _content(docstrings):
+    # The properties of a docstring (or of each overload) that its output
+    # depends on, excluding its position in the file
+    if isinstance(docstrings, list):
+        return [_content(docstring) for docstring in docstrings]
+    return (docstrings['docstring'], docstrings.get('signature', ''),
+            docstrings.get('type', ''))